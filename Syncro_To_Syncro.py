@@ -1,14 +1,35 @@
 #from syncro_utils import syncro_api_call
 from pprint import pprint
 from typing import Any, Dict, List
+from datetime import datetime, timezone
+from urllib.parse import quote
+import argparse
+import contextvars
+import cProfile
+import pstats
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import hashlib
 import json
 import os
 import requests
 import time
+import threading
 
-from syncro_configs import get_logger
+from syncro_configs import get_logger, LogPayload, LOG_DIR, SYNCRO_POOL_WORKERS, DIFF_EXTERNAL_SORT, DIFF_MAX_RECORDS_IN_MEMORY, DIFF_WORK_DIR, CONTACT_MAP_PATH
+from syncro_configs import WEBHOOK_HOST, WEBHOOK_PORT, WEBHOOK_BACKSTOP_MINUTES, SYNCRO_API_CALL_DELAY, SNAPSHOT_DIR, DEAD_LETTER_PATH
+from syncro_utils import build_contact_index, normalize_contact_name, comment_body_digest
+from syncro_utils import enable_stage_timing, stage_timer, timed_stage, write_stage_timings
+from syncro_diff import sort_to_runs, diff_sorted_runs, diff_work_dir, iter_diff_result
+from syncro_watermarks import get_watermark, set_watermark, is_newer, latest_updated_at, parse_timestamp, hold_back_watermark
+from syncro_metrics import get_metrics_registry, tenant_label
+from syncro_tracing import enable_tracing, close_tracing, trace, traced, mark_trace_error, format_slowest_traces
+from syncro_http import request_json, get_idempotency_store
+from syncro_deadletter import dead_letter, get_dead_letter_store
+from syncro_progress import start_progress, stop_progress, progress_phase, progress_total, progress_advance
+from syncro_planner import average_latency, estimate_plan, format_plan, write_plan, save_plan_inputs, load_plan_inputs
+from syncro_snapshot import export_snapshot, SnapshotReader
 
-CONFIG_PATH = os.path.join(os.path.dirname(__file__), "syncro_tenants.json")
+CONFIG_PATH = os.environ.get("SYNCRO_TENANTS_CONFIG", os.path.join(os.path.dirname(__file__), "syncro_tenants.json"))
 
 
 def _prompt_for_value(label: str) -> str:
@@ -74,71 +95,117 @@ syncro_tenant_dest_base_url = config["destination"]["base_url"]
 
 logger = get_logger(__name__)
 logger.info("Starting Syncro to Syncro Migration Script...")
+
+_dry_run = False  # Global flag; when set, syncro_api_call refuses anything but GET
 logger.info(f"Source Tenant: {syncro_tenant_source_base_url}")
 logger.info(f"Destination Tenant: {syncro_tenant_dest_base_url}")   
 
-def syncro_api_call(api_key: str, base_url: str, endpoint: str, method: str = "GET", data: Any = None) -> Dict[str, Any]:
+def syncro_api_call(api_key: str, base_url: str, endpoint: str, method: str = "GET", data: Any = None, recover=None) -> Dict[str, Any]:
     """
     Make an API call to a Syncro tenant.
 
+    Retryable errors are retried with backoff (see syncro_http.request_json).
+
     Args:
         api_key (str): The API key for authorization.
         base_url (str): The base URL of the Syncro tenant.
         endpoint (str): The API endpoint to call.
         method (str): The HTTP method (GET, POST, etc.). Defaults to "GET".
         data (Any): The payload for POST/PUT requests. Defaults to None.
+        recover (Callable): For POSTs, looks up whether a failed attempt took effect before it is retried (optional).
 
     Returns:
         Dict[str, Any]: The JSON response from the API call.
     """
-    import requests
-    time.sleep(.5)
+    if _dry_run and method.upper() != "GET":
+        raise RuntimeError(f"Dry run: refusing to {method} {endpoint}")
+    time.sleep(SYNCRO_API_CALL_DELAY)
     url = f"{base_url}/{endpoint}"
     headers = {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json"
     }
-    response = requests.request(method, url, headers=headers, json=data)
-    response.raise_for_status()
-    return response.json()
+    return request_json(method, url, endpoint, _tenant_label(base_url), headers, data=data, recover=recover)
 
-def get_all_customers(api_key: str, base_url: str) -> List[Dict[str, Any]]:
+
+def _tenant_label(base_url: str) -> str:
+    """Label API metrics with the tenant's role in the migration."""
+    if base_url == syncro_tenant_source_base_url:
+        return "source"
+    if base_url == syncro_tenant_dest_base_url:
+        return "destination"
+    return tenant_label(base_url)
+
+def get_all_records(api_key: str, base_url: str, resource: str) -> List[Dict[str, Any]]:
     """
-    Retrieves all customers from Syncro API, handling pagination.
+    Retrieves all records of a resource (e.g. customers, contacts) from Syncro API, handling pagination.
 
     Args:
         api_key (str): The API key for authorization.
         base_url (str): The base URL of the Syncro tenant.
+        resource (str): The resource to fetch; also the key holding the records in each page.
 
     Returns:
-        List[Dict[str, Any]]: A list of all customer records.
+        List[Dict[str, Any]]: A list of all records.
     """
-    all_customers = []
+    all_records = []
     page = 1
 
     while True:
-        endpoint = f"/customers?page={page}"
+        endpoint = f"/{resource}?page={page}"
         response = syncro_api_call(api_key, base_url, endpoint)
 
-        if "customers" in response:
-            all_customers.extend(response["customers"])
+        if resource in response:
+            all_records.extend(response[resource])
 
         if "meta" in response and response["meta"]["page"] < response["meta"]["total_pages"]:
             page += 1
-            time.sleep(0.5)  # Respect rate limits
+            time.sleep(SYNCRO_API_CALL_DELAY)  # Respect rate limits
         else:
             break
 
-    return all_customers
+    return all_records
+
+def get_all_customers(api_key: str, base_url: str) -> List[Dict[str, Any]]:
+    """
+    Retrieves all customers from Syncro API, handling pagination.
+
+    Args:
+        api_key (str): The API key for authorization.
+        base_url (str): The base URL of the Syncro tenant.
+
+    Returns:
+        List[Dict[str, Any]]: A list of all customer records.
+    """
+    return get_all_records(api_key, base_url, "customers")
 
+def get_all_contacts(api_key: str, base_url: str) -> List[Dict[str, Any]]:
+    """
+    Retrieves all contacts from Syncro API, handling pagination.
 
-def gather_and_compare_customers():
+    Args:
+        api_key (str): The API key for authorization.
+        base_url (str): The base URL of the Syncro tenant.
+
+    Returns:
+        List[Dict[str, Any]]: A list of all contact records.
+    """
+    return get_all_records(api_key, base_url, "contacts")
+
+
+def gather_and_compare_customers(snapshot: SnapshotReader = None):
     """
     Gather and Compare Customer Lists
     If the newer Tenant is missing a match, creates a matching customer
+
+    Args:
+        snapshot (SnapshotReader): Read the source customers from this snapshot instead of the source API (optional).
     """
  # Fetch all customers for both tenants
-    source_customers_list = get_all_customers(syncro_tenant_source_api_key, syncro_tenant_source_base_url)
+    if snapshot:
+        source_customers_list = snapshot.records("customers")
+    else:
+        source_customers_list = get_all_customers(syncro_tenant_source_api_key, syncro_tenant_source_base_url)
     logger.info(f"Source Customers: {len(source_customers_list)}")
 
     dest_customers_list = get_all_customers(syncro_tenant_dest_api_key, syncro_tenant_dest_base_url)
@@ -157,14 +224,16 @@ def gather_and_compare_customers():
     ]
 
 
-    logger.info(f"Business Names in Source Tenant: {business_names_source}")
-    logger.info(f"Business Names in Destination Tenant: {business_names_dest}") 
+    logger.info("Business Names in Source Tenant: %s", LogPayload(business_names_source))
+    logger.info("Business Names in Destination Tenant: %s", LogPayload(business_names_dest))
+    logger.debug("All source business names: %s", business_names_source)
+    logger.debug("All destination business names: %s", business_names_dest)
 
     missing_businesses = [
         name for name in business_names_source if name not in business_names_dest
     ]
     
-    logger.warning(f"❌ Warning! Number of Mssing: {len(missing_businesses)} Missing businesses to be created: {missing_businesses}")
+    logger.warning("❌ Warning! Number of Mssing: %d Missing businesses to be created: %s", len(missing_businesses), LogPayload(missing_businesses))
 
     for business_name in missing_businesses:
         # Prepare data for creating a new business
@@ -177,32 +246,42 @@ def gather_and_compare_customers():
                 base_url=syncro_tenant_dest_base_url,
                 endpoint="customers",
                 method="POST",
-                data=new_business_data
+                data=new_business_data,
+                recover=lambda: _wrap("customer", find_dest_customer_record(business_name))
             )
             
-            logger.info(f"Created business: {business_name}, Response: {response}")
+            logger.info("Created business: %s, Response: %s", business_name, LogPayload(response))
+            if response.get("customer"):
+                dest_customers_list.append(response["customer"])
         except Exception as e:
             print(f"Failed to create business: {business_name}, Error: {e}")
             logger.error(f"Failed to create business: {business_name}, Error: {e}")
+            dead_letter("customer", new_business_data, e)
 
     return source_customers_list, dest_customers_list
 
 
 
 
-def syncro_create_dest_ticket(ticket: Dict[str, Any],dest_customer_id: int) -> None:
+@timed_stage()
+@traced("ticket", lambda ticket, *args, **kwargs: {"source_ticket_id": ticket.get("id"), "subject": ticket.get("subject")})
+def syncro_create_dest_ticket(ticket: Dict[str, Any],dest_customer_id: int, contact_map: Dict[int, int] = None,
+                              snapshot: SnapshotReader = None) -> Dict[str, Any]:
     """
     Creates a new ticket in the destination Syncro tenant.
 
     Args:
         ticket (Dict[str, Any]): The ticket details to be created.
+        dest_customer_id (int): The customer ID in the destination tenant.
+        contact_map (Dict[int, int]): Source contact ID to destination contact ID map (optional).
+        snapshot (SnapshotReader): Source snapshot to load missing comments from instead of the source API (optional).
 
     Returns:
-        None
+        Dict[str, Any]: The created destination ticket, or None if creating it or its comments failed.
     """
     logger.info(f"Creating ticket '{ticket['subject']}' in destination tenant...")
     # Fetch the corresponding customer ID in the destination tenant
-    customer_name = ticket.get("customer_business_then_name")
+    customer_name = ticket.get("customer_business_then_name") or ticket.get("customer_business")
 
     # Prepare the ticket data for creation
     ticket_payload = {
@@ -213,6 +292,11 @@ def syncro_create_dest_ticket(ticket: Dict[str, Any],dest_customer_id: int) -> N
         "priority": "2 Normal",  
         "comments_attributes": []
     }
+
+    # Link the ticket to the migrated contact, if there is one
+    dest_contact_id = (contact_map or {}).get(ticket.get("contact_id"))
+    if dest_contact_id:
+        ticket_payload["contact_id"] = dest_contact_id
     """
     # Handle ticket comments if available
     if ticket.get("comments"):
@@ -234,19 +318,40 @@ def syncro_create_dest_ticket(ticket: Dict[str, Any],dest_customer_id: int) -> N
     """
         
 
-    # Create the ticket in the destination tenant
+    # Create the ticket in the destination tenant, unless the idempotency store shows it already was
+    store = get_idempotency_store()
+    ticket_key = idempotency_key("ticket", ticket["id"])
     try:
-        response = syncro_api_call(
-            api_key=syncro_tenant_dest_api_key,
-            base_url=syncro_tenant_dest_base_url,
-            endpoint="tickets",
-            method="POST",
-            data=ticket_payload
-        )
-        logger.info(f"Created ticket '{ticket['subject']}' for customer '{customer_name}' in destination. Response: {response}")
+        dest_ticket = store.result(ticket_key)
+        if dest_ticket:
+            logger.info(f"Ticket '{ticket['subject']}' was already created as destination ticket {dest_ticket['id']}. Skipping create.")
+        else:
+            if store.get(ticket_key):
+                # An earlier attempt was interrupted after sending the create; check whether it landed
+                dest_ticket = find_dest_ticket(dest_customer_id, ticket["subject"])
+            if not dest_ticket:
+                store.begin(ticket_key)
+                response = syncro_api_call(
+                    api_key=syncro_tenant_dest_api_key,
+                    base_url=syncro_tenant_dest_base_url,
+                    endpoint="tickets",
+                    method="POST",
+                    data=ticket_payload,
+                    recover=lambda: _wrap("ticket", find_dest_ticket(dest_customer_id, ticket["subject"]))
+                )
+                dest_ticket = response["ticket"]
+                logger.info("Created ticket '%s' for customer '%s' in destination. Response: %s", ticket['subject'], customer_name, LogPayload(response))
+            store.complete(ticket_key, {"id": dest_ticket["id"], "number": dest_ticket.get("number")})
+
+        # Projected tickets carry no comments; load them from the source only now
+        comments = ticket.get("comments")
+        if comments is None and snapshot:
+            comments = (snapshot.get("tickets", ticket["id"]) or {}).get("comments") or []
+        elif comments is None:
+            comments = syncro_get_ticket_comments(syncro_tenant_source_api_key, syncro_tenant_source_base_url, ticket["id"])
 
         # Create ticket comments in the destination tenant
-        for comment in ticket.get("comments", []):
+        for comment in comments:
             comment_payload = {                 
                 "subject": comment.get("subject", "Imported Comment"),
                 "body": comment.get("body", ""),
@@ -256,25 +361,101 @@ def syncro_create_dest_ticket(ticket: Dict[str, Any],dest_customer_id: int) -> N
                 "created_at": comment["created_at"]
             }
 
-            syncro_create_ticket_comment(response["ticket"]["id"], comment_payload)
-                
-        logger.info(f"Created comments for ticket '{ticket['subject']}' in destination. Response: {response}")
+            comment_key = idempotency_key("comment", f"{ticket['id']}:{comment.get('id') or comment_body_digest(comment.get('body'))}")
+            if store.result(comment_key):
+                continue
+            existing = find_dest_comment(dest_ticket["id"], comment_payload["body"]) if store.get(comment_key) else None
+            if not existing:
+                store.begin(comment_key)
+                existing = (syncro_create_ticket_comment(dest_ticket["id"], comment_payload) or {}).get("comment")
+            store.complete(comment_key, {"id": (existing or {}).get("id"), "ticket_id": dest_ticket["id"]})
+            progress_advance("comments")
+
+        logger.info("Created %d comments for ticket '%s' in destination.", len(comments), ticket['subject'])
+        progress_advance("tickets")
+        return dest_ticket
 
     except Exception as e:
         logger.error(f"Failed to create ticket '{ticket['subject']}' for '{customer_name}': {e}")
+        mark_trace_error(str(e))
+        dead_letter("ticket", ticket, e, dest_customer_id=dest_customer_id)
+        return None
+
+
+def idempotency_key(kind: str, source_id) -> str:
+    """
+    Key of a create in the idempotency store, scoped to this source and destination tenant pair.
+
+    Args:
+        kind (str): Record type, e.g. 'ticket' or 'comment'.
+        source_id: The source record's ID (or another stable source identifier).
+
+    Returns:
+        str: e.g. 'ticket:source.syncromsp.com>dest.syncromsp.com:123'.
+    """
+    return f"{kind}:{tenant_label(syncro_tenant_source_base_url)}>{tenant_label(syncro_tenant_dest_base_url)}:{source_id}"
+
+
+def _wrap(key: str, record: Dict[str, Any]):
+    # Shape a looked-up record like the create response it stands in for
+    return {key: record} if record else None
+
+
+def find_dest_ticket(dest_customer_id: int, subject: str) -> Dict[str, Any]:
+    """
+    Look up a destination ticket of a customer by subject, e.g. to check whether an interrupted create landed.
+
+    Returns:
+        Dict[str, Any]: The ticket, or None if there is none with that subject.
+    """
+    tickets = syncro_get_customer_tickets(syncro_tenant_dest_api_key, syncro_tenant_dest_base_url, dest_customer_id).get("tickets", [])
+    return next((dest_ticket for dest_ticket in tickets if dest_ticket.get("subject") == subject), None)
+
+
+def find_dest_comment(dest_ticket_id: int, body: str) -> Dict[str, Any]:
+    """
+    Look up a comment on a destination ticket by body.
+
+    Returns:
+        Dict[str, Any]: The comment, or None if the ticket has no comment with that body.
+    """
+    digest = comment_body_digest(body)
+    comments = syncro_get_ticket_comments(syncro_tenant_dest_api_key, syncro_tenant_dest_base_url, dest_ticket_id)
+    return next((comment for comment in comments if comment_body_digest(comment.get("body")) == digest), None)
 
 
-def syncro_create_ticket_comment(ticket_id: int, comment_data: Dict[str, Any]):
+def syncro_create_ticket_comment(ticket_id: int, comment_data: Dict[str, Any]) -> Dict[str, Any]:
     endpoint = f"/tickets/{ticket_id}/comment"
-    response = syncro_api_call(
+    return syncro_api_call(
         api_key=syncro_tenant_dest_api_key,
         base_url=syncro_tenant_dest_base_url,
         endpoint=endpoint,
         method="POST",
-        data=comment_data
+        data=comment_data,
+        recover=lambda: _wrap("comment", find_dest_comment(ticket_id, comment_data.get("body")))
     )
 
 
+def syncro_get_ticket_comments(api_key: str, base_url: str, ticket_id: int) -> List[Dict[str, Any]]:
+    """
+    Fetch the comments of a single ticket in a Syncro tenant.
+
+    Args:
+        api_key (str): The API key for authorization.
+        base_url (str): The base URL of the Syncro tenant.
+        ticket_id (int): The ticket ID.
+
+    Returns:
+        List[Dict[str, Any]]: The ticket's comments.
+    """
+    response = syncro_api_call(
+        api_key=api_key,
+        base_url=base_url,
+        endpoint=f"tickets/{ticket_id}"
+    )
+    return response.get("ticket", {}).get("comments") or []
+
+
 def syncro_get_customer_tickets(api_key: str, base_url: str, customer_id: int) -> Dict[str, Any]:
     """
     Fetch all tickets for a specific customer in a Syncro tenant.
@@ -303,129 +484,355 @@ def syncro_lookup_dest_customer_id(customer_name: str,dest_customers):
         customer_name (str): The name of the customer to lookup.
 
     Returns:
-        int: The customer ID if found, otherwise None.
+        tuple: (customer ID, business name) if found, otherwise (None, None).
     """
     for customer in dest_customers:
         if customer.get("business_name") == customer_name:
             return customer.get("id"), customer.get("business_name")
-    return None
+    return None, None
+
+def myfunction(source_customers, dest_customers, tickets_to_create, contact_map: Dict[int, int] = None,
+               snapshot: SnapshotReader = None) -> List[Dict[str, Any]]:
+    """
+    Create the missing tickets of every source customer that exists in the destination tenant.
+
+    The tickets come from the projected diff of gather_and_compare_tickets, so no customer's tickets
+    are fetched again; comments are loaded per created ticket (from the snapshot, if there is one).
+
+    Args:
+        source_customers (List[Dict[str, Any]]): Customers in the source tenant.
+        dest_customers (List[Dict[str, Any]]): Customers in the destination tenant.
+        tickets_to_create (Iterable[Dict[str, Any]]): Projected source tickets missing from the destination.
+        contact_map (Dict[int, int]): Source contact ID to destination contact ID map (optional).
+        snapshot (SnapshotReader): Source snapshot to load comments from instead of the source API (optional).
 
-def myfunction(source_customers, dest_customers):
+    Returns:
+        List[Dict[str, Any]]: Source tickets that were not migrated: failed creates, and the
+        tickets of customers missing from the destination.
+    """
+    failed_tickets = []
+
+    tickets_by_customer: Dict[Any, List[Dict[str, Any]]] = {}
+    for ticket in tickets_to_create:
+        tickets_by_customer.setdefault(ticket.get("customer_id"), []).append(ticket)
 
     logger.info(f"in myfunction, Source Customers: {len(source_customers)}")
-    #print(f"sourc_customers: {source_customers[0]}")
-    #input("Press Enter to Continue...")
     for customer in source_customers:        
-        source_customer_name = customer.get("business_name")
-        source_customer_id = customer.get("id")
-        logger.info(f"Processing source customer: {customer.get('business_name')}, Source Customer ID: {source_customer_id}")
-        logger.info(f"Checking if customer '{source_customer_name}' exists in destination tenant...")
-        dest_customer_id, dest_customer_name = syncro_lookup_dest_customer_id(source_customer_name,dest_customers)
+        with stage_timer("myfunction.customer"), trace("customer", business_name=customer.get("business_name")):
+            source_customer_name = customer.get("business_name")
+            source_customer_id = customer.get("id")
+            source_customer_tickets = tickets_by_customer.pop(source_customer_id, [])
+            logger.info(f"Processing source customer: {customer.get('business_name')}, Source Customer ID: {source_customer_id}")
+            logger.info(f"Checking if customer '{source_customer_name}' exists in destination tenant...")
+            dest_customer_id, dest_customer_name = syncro_lookup_dest_customer_id(source_customer_name,dest_customers)
+
+            if dest_customer_id:
+                logger.info(f"Source Customer '{source_customer_name}' found in destination tenant. with ID: {dest_customer_id} and name: {dest_customer_name}. Creating {len(source_customer_tickets)} tickets...")
+                failed_tickets += create_dest_tickets(source_customer_tickets, dest_customer_id, contact_map, snapshot)
+            else:
+                # Usually a customer whose create failed; its tickets must stay in the next delta run
+                logger.warning(f"Customer '{source_customer_name}' is missing in the destination tenant. Skipping {len(source_customer_tickets)} tickets.")
+                failed_tickets += source_customer_tickets
+            progress_advance("customers")
+
+    for source_customer_id, tickets in tickets_by_customer.items():
+        logger.warning(f"No source customer with ID {source_customer_id}. Skipping {len(tickets)} tickets.")
+    return failed_tickets
+
+
+def sync_customer_tickets(source_tickets: List[Dict[str, Any]], dest_tickets: List[Dict[str, Any]], dest_customer_id: int, contact_map: Dict[int, int] = None, patch_changed: bool = False,
+                          snapshot: SnapshotReader = None, max_workers: int = SYNCRO_POOL_WORKERS) -> List[Dict[str, Any]]:
+    """
+    Create the source tickets of one customer that have no subject match among the destination tickets.
 
-        if dest_customer_id:
-            logger.info(f"Source Customer '{source_customer_name}' found in destination tenant. with ID: {dest_customer_id} and name: {dest_customer_name}. Fetching tickets...")
+    The missing tickets are created by create_dest_tickets.
 
-            dest_customer_tickets = syncro_get_customer_tickets(
-                api_key=syncro_tenant_dest_api_key,
-                base_url=syncro_tenant_dest_base_url,
-                customer_id=dest_customer_id
-            )
-            logger.info(f"dest_customer_name: '{dest_customer_name}' has {len(dest_customer_tickets.get('tickets', []))} tickets in destination tenant.")
-
-            source_customer_tickets = syncro_get_customer_tickets(
-                api_key=syncro_tenant_source_api_key,
-                base_url=syncro_tenant_source_base_url,
-                customer_id=source_customer_id
-            )            
-            logger.info(f"source_customer_name: '{source_customer_name}' has {len(source_customer_tickets.get('tickets', []))} tickets in source tenant.")
-
-            for source_ticket in source_customer_tickets.get("tickets", []):
-                source_ticket_subject = source_ticket.get("subject")
-                logger.info(f"Gathering ticket '{source_ticket_subject}' from source tenant...")
-
-                # Flag to track if a match is found
-                ticket_exists = False
-
-                for dest_ticket in dest_customer_tickets.get("tickets", []):
-                    dest_ticket_subject = dest_ticket.get("subject")
-                    logger.info(f"Checking ticket source '{source_ticket_subject}' in destination tenant... dest_ticket_subject: {dest_ticket_subject}")
-                    
-                    if source_ticket_subject == dest_ticket_subject:
-                        logger.info(f"Ticket '{source_ticket_subject}' already exists in destination tenant. Skipping...")
-                        ticket_exists = True
-                        break  # Stop checking further once a match is found
-                    # Ensure we only create a ticket if no match was found
-                if ticket_exists:
-                    continue  # Move to the next source ticket without creating one
-                # If no match was found, create the ticket
-                if not ticket_exists:
-                    logger.info(f"'{source_ticket_subject}' not found in destination tenant. Creating ticket...")
-                    logger.info(f"{source_ticket}")
-                    #pprint(source_ticket)
-                    #input("Press Enter to Continue...")
-                    syncro_create_dest_ticket(source_ticket, dest_customer_id)
-                 
-
-def gather_and_compare_tickets():
+    Args:
+        source_tickets (List[Dict[str, Any]]): The customer's tickets in the source tenant.
+        dest_tickets (List[Dict[str, Any]]): The customer's tickets in the destination tenant.
+        dest_customer_id (int): The customer ID in the destination tenant.
+        contact_map (Dict[int, int]): Source contact ID to destination contact ID map (optional).
+        patch_changed (bool): If True, matched tickets whose compared fields differ are patched.
+        snapshot (SnapshotReader): Source snapshot passed on to syncro_create_dest_ticket (optional).
+        max_workers (int): Tickets created at the same time.
+
+    Returns:
+        List[Dict[str, Any]]: The source tickets that could not be created or patched.
     """
-    Gather and compare ticket lists
-    If the newer tenant is missing tickets, create the ticket
-    Create a Contact if assigned Contact is not in the new account
-    Continues with a warning if things like ticket status, issue type, or custom type are not the same
+    tickets_to_create, failed = [], []
+    for source_ticket in source_tickets:
+        source_ticket_subject = source_ticket.get("subject")
+        logger.info(f"Gathering ticket '{source_ticket_subject}' from source tenant...")
+
+        # Flag to track if a match is found
+        ticket_exists = False
+
+        for dest_ticket in dest_tickets:
+            dest_ticket_subject = dest_ticket.get("subject")
+            logger.debug("Checking ticket source '%s' in destination tenant... dest_ticket_subject: %s", source_ticket_subject, dest_ticket_subject)
+            
+            if source_ticket_subject == dest_ticket_subject:
+                logger.info(f"Ticket '{source_ticket_subject}' already exists in destination tenant. Skipping...")
+                ticket_exists = True
+                changes = compute_ticket_patch(source_ticket, dest_ticket) if patch_changed else {}
+                if changes:
+                    try:
+                        syncro_patch_dest_ticket(dest_ticket["id"], changes)
+                    except Exception as e:
+                        logger.error(f"Failed to patch ticket '{source_ticket_subject}': {e}")
+                        dead_letter("ticket_patch", changes, e, dest_ticket_id=dest_ticket["id"], subject=source_ticket_subject)
+                        failed.append(source_ticket)
+                break  # Stop checking further once a match is found
+            # Ensure we only create a ticket if no match was found
+        if ticket_exists:
+            continue  # Move to the next source ticket without creating one
+        # If no match was found, create the ticket
+        if not ticket_exists:
+            logger.info(f"'{source_ticket_subject}' not found in destination tenant. Creating ticket...")
+            logger.debug("Source ticket: %s", source_ticket)
+            #pprint(source_ticket)
+            #input("Press Enter to Continue...")
+            tickets_to_create.append(source_ticket)
+
+    return failed + create_dest_tickets(tickets_to_create, dest_customer_id, contact_map, snapshot, max_workers)
+
+
+def create_dest_tickets(tickets: List[Dict[str, Any]], dest_customer_id: int, contact_map: Dict[int, int] = None,
+                        snapshot: SnapshotReader = None, max_workers: int = SYNCRO_POOL_WORKERS) -> List[Dict[str, Any]]:
     """
-    # Helper function to handle pagination
-    from typing import List, Dict, Any
-    def fetch_all_tickets(api_key: str, base_url: str) -> List[Dict[str, Any]]:
-        tickets = []
-        page = 1
-        while True:
-            response = syncro_api_call(
-                api_key=api_key,
-                base_url=base_url,
-                endpoint=f"tickets?page={page}"
-            )
-            ticket_data = response.get("tickets", [])
-            if not ticket_data:
-                break  # Exit loop if no more tickets
-            tickets.extend(ticket_data)
-            page += 1
-        return tickets
+    Create source tickets (each with its comments) for one destination customer through a worker pool,
+    so the destination's adaptive concurrency limit decides how many of their calls are in flight.
 
-    logger.info("Fetching number of tickets from both tenants. comparing tickets...")
-    # Fetch tickets from both tenants
-    source_tickets = fetch_all_tickets(syncro_tenant_source_api_key, syncro_tenant_source_base_url)    
-    dest_tickets = fetch_all_tickets(syncro_tenant_dest_api_key, syncro_tenant_dest_base_url)
-    
+    Args:
+        tickets (List[Dict[str, Any]]): Raw or projected source tickets to create.
+        dest_customer_id (int): The customer ID in the destination tenant.
+        contact_map (Dict[int, int]): Source contact ID to destination contact ID map (optional).
+        snapshot (SnapshotReader): Source snapshot passed on to syncro_create_dest_ticket (optional).
+        max_workers (int): Tickets created at the same time.
 
-    # Extract relevant ticket details for comparison
-    source_ticket_list = [{
-        "created_at": ticket.get("created_at"),
-        "id": ticket.get("id"),
-        "subject": ticket.get("subject"),
-        "customer_business": ticket.get("customer_business_then_name"),
-        "resolved_at": ticket.get("resolved_at"),
-        "status": ticket.get("status"),
-        "problem_type": ticket.get("problem_type"),
-        "comments": ticket.get("comments")        
-        } for ticket in source_tickets
-    ]
-    dest_ticket_list = [{
+    Returns:
+        List[Dict[str, Any]]: The source tickets that could not be created.
+    """
+    failed = []
+    if not tickets:
+        return failed
+    # Each ticket runs in a copy of this context, so its trace keeps the customer trace as parent
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tickets))) as executor:
+        futures = {
+            executor.submit(contextvars.copy_context().run, syncro_create_dest_ticket, source_ticket, dest_customer_id, contact_map, snapshot): source_ticket
+            for source_ticket in tickets
+        }
+        for future, source_ticket in futures.items():
+            if future.result() is None:
+                failed.append(source_ticket)
+    return failed
+         
+
+# Fields compared between tenants to detect a changed ticket
+TICKET_COMPARE_FIELDS = ("status", "resolved_at", "problem_type")
+
+
+def ticket_content_hash(ticket: Dict[str, Any]) -> str:
+    """
+    Hash the compared fields of a ticket so two tickets can be checked for changes cheaply.
+
+    Args:
+        ticket (Dict[str, Any]): A raw or projected ticket.
+
+    Returns:
+        str: A short hex digest of the ticket's compared fields.
+    """
+    values = json.dumps([ticket.get(field) for field in TICKET_COMPARE_FIELDS], default=str)
+    return hashlib.sha1(values.encode("utf-8")).hexdigest()[:16]
+
+
+def ticket_field_hashes(ticket: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Hash each compared field of a ticket separately.
+
+    Args:
+        ticket (Dict[str, Any]): A raw or projected ticket.
+
+    Returns:
+        Dict[str, str]: Field name to short hex digest of its value.
+    """
+    return {
+        field: hashlib.sha1(json.dumps(ticket.get(field), default=str).encode("utf-8")).hexdigest()[:12]
+        for field in TICKET_COMPARE_FIELDS
+    }
+
+
+def compute_ticket_patch(source_ticket: Dict[str, Any], dest_ticket: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Work out which compared fields differ between a source ticket and its destination copy.
+
+    Args:
+        source_ticket (Dict[str, Any]): The source ticket.
+        dest_ticket (Dict[str, Any]): The matching destination ticket.
+
+    Returns:
+        Dict[str, Any]: The changed fields with their source values; empty if nothing changed.
+    """
+    source_hashes = ticket_field_hashes(source_ticket)
+    dest_hashes = ticket_field_hashes(dest_ticket)
+    return {
+        field: source_ticket.get(field)
+        for field in TICKET_COMPARE_FIELDS
+        if source_hashes[field] != dest_hashes[field]
+    }
+
+
+def syncro_patch_dest_ticket(dest_ticket_id: int, changes: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Update only the changed fields of a ticket in the destination tenant.
+
+    Args:
+        dest_ticket_id (int): The ticket ID in the destination tenant.
+        changes (Dict[str, Any]): The fields to update.
+
+    Returns:
+        Dict[str, Any]: The JSON response from the API call.
+    """
+    logger.info(f"Patching destination ticket {dest_ticket_id} with changed fields: {sorted(changes)}")
+    return syncro_api_call(
+        api_key=syncro_tenant_dest_api_key,
+        base_url=syncro_tenant_dest_base_url,
+        endpoint=f"tickets/{dest_ticket_id}",
+        method="PUT",
+        data=changes
+    )
+
+
+def patch_changed_tickets(changed_pairs, max_workers: int = SYNCRO_POOL_WORKERS) -> int:
+    """
+    Issue one PUT per changed ticket, containing only the changed fields.
+
+    Args:
+        changed_pairs (Iterable[tuple]): (source ticket, destination ticket) pairs.
+        max_workers (int): Number of tickets to patch in parallel.
+
+    Returns:
+        int: Number of tickets patched.
+    """
+    patched = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for source_ticket, dest_ticket in changed_pairs:
+            changes = compute_ticket_patch(source_ticket, dest_ticket)
+            if changes:
+                futures[executor.submit(syncro_patch_dest_ticket, dest_ticket["id"], changes)] = (source_ticket, dest_ticket, changes)
+
+        for future in as_completed(futures):
+            source_ticket, dest_ticket, changes = futures[future]
+            try:
+                future.result()
+                patched += 1
+            except Exception as e:
+                logger.error(f"Failed to patch ticket '{source_ticket.get('subject')}': {e}")
+                dead_letter("ticket_patch", changes, e, dest_ticket_id=dest_ticket["id"], subject=source_ticket.get("subject"))
+
+    logger.info(f"Patched {patched} changed tickets in destination tenant.")
+    return patched
+
+
+def project_ticket(ticket: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce a ticket to the fields needed to compare and create it.
+    The comments are dropped; only their count is kept.
+
+    Args:
+        ticket (Dict[str, Any]): A ticket as returned by the Syncro API.
+
+    Returns:
+        Dict[str, Any]: The projected ticket.
+    """
+    return {
         "created_at": ticket.get("created_at"),
+        "updated_at": ticket.get("updated_at"),
         "id": ticket.get("id"),
         "subject": ticket.get("subject"),
+        "customer_id": ticket.get("customer_id"),
         "customer_business": ticket.get("customer_business_then_name"),
+        "contact_id": ticket.get("contact_id"),
         "resolved_at": ticket.get("resolved_at"),
         "status": ticket.get("status"),
         "problem_type": ticket.get("problem_type"),
-        "comments": ticket.get("comments")
-        } for ticket in dest_tickets
-    ]
+        "comment_count": len(ticket.get("comments") or []),
+        "content_hash": ticket_content_hash(ticket),
+    }
+
+
+def iter_projected_tickets(api_key: str, base_url: str):
+    """
+    Stream every ticket in a tenant page by page, keeping only the projected fields.
 
-    # Print ticket lists for verification
-    logger.info(f"Number Source Tenant Tickets: {len(source_ticket_list)}")
-    logger.info(f"Number Destination Tenant Tickets: {len(dest_ticket_list)}")
+    Args:
+        api_key (str): The API key for authorization.
+        base_url (str): The base URL of the Syncro tenant.
 
-    # Use tuples of (subject, created_at, customer_business) for comparison
+    Yields:
+        Dict[str, Any]: Projected tickets (see project_ticket).
+    """
+    page = 1
+    while True:
+        response = syncro_api_call(
+            api_key=api_key,
+            base_url=base_url,
+            endpoint=f"tickets?page={page}"
+        )
+        ticket_data = response.get("tickets", [])
+        if not ticket_data:
+            break  # Exit loop if no more tickets
+        for ticket in ticket_data:
+            yield project_ticket(ticket)
+        page += 1
+
+
+def fetch_projected_tickets(api_key: str, base_url: str) -> List[Dict[str, Any]]:
+    """
+    Fetch every ticket in a tenant, keeping only the projected fields of each page.
+
+    Args:
+        api_key (str): The API key for authorization.
+        base_url (str): The base URL of the Syncro tenant.
+
+    Returns:
+        List[Dict[str, Any]]: The projected tickets (see project_ticket).
+    """
+    return list(iter_projected_tickets(api_key, base_url))
+
+
+def fetch_projected_tickets_from_both_tenants(snapshot: SnapshotReader = None):
+    """
+    Fetch the projected tickets of the source and destination tenants at the same time.
+
+    Args:
+        snapshot (SnapshotReader): Project the source tickets from this snapshot instead of the source API (optional).
+
+    Returns:
+        tuple: (source tickets, destination tickets).
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        if snapshot:
+            source_future = executor.submit(lambda: [project_ticket(ticket) for ticket in snapshot.iter_records("tickets")])
+        else:
+            source_future = executor.submit(fetch_projected_tickets, syncro_tenant_source_api_key, syncro_tenant_source_base_url)
+        dest_future = executor.submit(fetch_projected_tickets, syncro_tenant_dest_api_key, syncro_tenant_dest_base_url)
+        return source_future.result(), dest_future.result()
+
+
+def diff_ticket_lists(source_ticket_list: List[Dict[str, Any]], dest_ticket_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Find the source tickets that have no (subject, customer_business) match in the destination.
+
+    Args:
+        source_ticket_list (List[Dict[str, Any]]): Projected source tickets.
+        dest_ticket_list (List[Dict[str, Any]]): Projected destination tickets.
+
+    Returns:
+        List[Dict[str, Any]]: The source tickets to be created.
+    """
+    # Use tuples of (subject, customer_business) for comparison
     dest_ticket_keys = {(ticket["subject"], ticket['customer_business']) for ticket in dest_ticket_list}
     tickets_to_create = []
 
@@ -435,15 +842,925 @@ def gather_and_compare_tickets():
             tickets_to_create.append(ticket)
             logger.info(f"Ticket to be created: {ticket['customer_business']}, {ticket['subject']}, {ticket['created_at']}")
 
-    logger.info(f"Number of Tickets to be created: {len(tickets_to_create)}")
+    return tickets_to_create
+
+
+def find_changed_tickets(source_ticket_list: List[Dict[str, Any]], dest_ticket_list: List[Dict[str, Any]]) -> List[tuple]:
+    """
+    Find source tickets whose destination match has different compared fields.
+
+    Args:
+        source_ticket_list (List[Dict[str, Any]]): Projected source tickets.
+        dest_ticket_list (List[Dict[str, Any]]): Projected destination tickets.
+
+    Returns:
+        List[tuple]: (source ticket, destination ticket) pairs that need a patch.
+    """
+    dest_tickets_by_key: Dict[tuple, List[Dict[str, Any]]] = {}
+    for ticket in dest_ticket_list:
+        dest_tickets_by_key.setdefault((ticket["subject"], ticket['customer_business']), []).append(ticket)
+
+    changed_pairs = []
+    for ticket in source_ticket_list:
+        matches = dest_tickets_by_key.get((ticket["subject"], ticket['customer_business']))
+        if matches and all(match["content_hash"] != ticket["content_hash"] for match in matches):
+            changed_pairs.append((ticket, matches[0]))
+
+    return changed_pairs
+
+
+def external_diff_tickets(work_dir: str = DIFF_WORK_DIR, max_records_in_memory: int = DIFF_MAX_RECORDS_IN_MEMORY,
+                          snapshot: SnapshotReader = None) -> Dict[str, Any]:
+    """
+    Diff the tickets of both tenants through sorted run files on disk.
+    Both tenants are streamed and sorted in parallel, then merge-joined.
+
+    Args:
+        work_dir (str): Directory for run and result files (temporary directory if None).
+        max_records_in_memory (int): Maximum number of records buffered per run.
+        snapshot (SnapshotReader): Stream the source tickets from this snapshot instead of the source API (optional).
+
+    Returns:
+        Dict[str, Any]: Result file paths and counts (see syncro_diff.external_diff). A temporary work
+        directory is in 'temp_dir'; call its cleanup() once the result files have been read.
+    """
+    work_dir, temp_dir = diff_work_dir(work_dir)
+    logger.info(f"Running external ticket diff in {work_dir}")
+
+    if snapshot:
+        source_tickets = (project_ticket(ticket) for ticket in snapshot.iter_records("tickets"))
+    else:
+        source_tickets = iter_projected_tickets(syncro_tenant_source_api_key, syncro_tenant_source_base_url)
+
+    try:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            source_future = executor.submit(
+                sort_to_runs,
+                source_tickets,
+                work_dir, "source", max_records_in_memory
+            )
+            dest_future = executor.submit(
+                sort_to_runs,
+                iter_projected_tickets(syncro_tenant_dest_api_key, syncro_tenant_dest_base_url),
+                work_dir, "dest", max_records_in_memory
+            )
+            source_runs, dest_runs = source_future.result(), dest_future.result()
+        result = diff_sorted_runs(source_runs, dest_runs, work_dir)
+    except BaseException:
+        if temp_dir:
+            temp_dir.cleanup()
+        raise
+    if temp_dir:
+        result["temp_dir"] = temp_dir
+    return result
+
+
+def gather_and_compare_tickets(external_sort: bool = DIFF_EXTERNAL_SORT, patch_changed: bool = False,
+                               snapshot: SnapshotReader = None):
+    """
+    Gather and compare ticket lists
+    If the newer tenant is missing tickets, create the ticket
+    Create a Contact if assigned Contact is not in the new account
+    Continues with a warning if things like ticket status, issue type, or custom type are not the same
+
+    Both tenants are fetched in parallel and only the projected comparison fields
+    are kept; comments are loaded later, only for tickets that get created.
+
+    Args:
+        external_sort (bool): If True, compare through sorted run files on disk instead of in memory.
+        patch_changed (bool): If True, update destination tickets whose status, resolved_at or
+                              problem_type changed in the source, with one PUT per ticket.
+        snapshot (SnapshotReader): Read the source tickets from this snapshot instead of the source API (optional).
+
+    Returns:
+        List[Dict[str, Any]]: The projected source tickets to be created. With external_sort they are
+        read from the to_create result file before a temporary work directory is removed.
+    """
+    logger.info("Fetching number of tickets from both tenants. comparing tickets...")
+
+    if external_sort:
+        diff_result = external_diff_tickets(snapshot=snapshot)
+        try:
+            logger.info(f"Number of Tickets to be created: {diff_result['counts']['to_create']}")
+            logger.info(f"Number of changed Tickets: {diff_result['counts']['changed']}")
+            if patch_changed:
+                patch_changed_tickets((pair["source"], pair["dest"]) for pair in iter_diff_result(diff_result, "changed"))
+            # Only the projected tickets to create are loaded; the runs of both tenants stay on disk
+            tickets_to_create = list(iter_diff_result(diff_result, "to_create"))
+        finally:
+            if diff_result.get("temp_dir"):
+                diff_result["temp_dir"].cleanup()
+    else:
+        source_ticket_list, dest_ticket_list = fetch_projected_tickets_from_both_tenants(snapshot)
+
+        # Print ticket lists for verification
+        logger.info(f"Number Source Tenant Tickets: {len(source_ticket_list)}")
+        logger.info(f"Number Destination Tenant Tickets: {len(dest_ticket_list)}")
+
+        tickets_to_create = diff_ticket_lists(source_ticket_list, dest_ticket_list)
+
+        logger.info(f"Number of Tickets to be created: {len(tickets_to_create)}")
+        if patch_changed:
+            changed_pairs = find_changed_tickets(source_ticket_list, dest_ticket_list)
+            logger.info(f"Number of changed Tickets: {len(changed_pairs)}")
+            patch_changed_tickets(changed_pairs)
+
+    progress_total("tickets", len(tickets_to_create))
+    progress_total("comments", sum(ticket.get("comment_count", 0) for ticket in tickets_to_create))
     #input("Review the Logs and Press Enter to Continue...")
+    return tickets_to_create
+
+
+CONTACT_FIELDS = ("name", "email", "phone", "mobile", "address1", "address2", "city", "state", "zip", "notes")
+
+
+def check_if_contact_exists(contact: Dict[str, Any], dest_customer_id: int, dest_contact_index: dict):
+    """
+    Check whether a source contact already exists under a destination customer.
+
+    Matches on email first, then on normalized name, using the hash indexes
+    built by build_contact_index.
+
+    Args:
+        contact (Dict[str, Any]): The source contact.
+        dest_customer_id (int): The matching customer ID in the destination tenant.
+        dest_contact_index (dict): Index of the destination tenant's contacts.
+
+    Returns:
+        int: The destination contact ID if found, otherwise None.
+    """
+    customer_key = str(dest_customer_id)
+
+    email = str(contact.get("email") or "").strip().lower()
+    if email and (customer_key, email) in dest_contact_index["by_email"]:
+        return dest_contact_index["by_email"][(customer_key, email)]
+
+    name = normalize_contact_name(contact.get("name"))
+    if name and (customer_key, name) in dest_contact_index["by_name"]:
+        return dest_contact_index["by_name"][(customer_key, name)]
+
+    return None
+
+
+def syncro_create_dest_contact(contact: Dict[str, Any], dest_customer_id: int) -> Dict[str, Any]:
+    """
+    Creates a copy of a source contact in the destination Syncro tenant.
+
+    Args:
+        contact (Dict[str, Any]): The source contact.
+        dest_customer_id (int): The customer ID in the destination tenant.
+
+    Returns:
+        Dict[str, Any]: The created contact.
+    """
+    contact_payload = {field: contact[field] for field in CONTACT_FIELDS if contact.get(field)}
+    contact_payload["customer_id"] = dest_customer_id
+
+    response = syncro_api_call(
+        api_key=syncro_tenant_dest_api_key,
+        base_url=syncro_tenant_dest_base_url,
+        endpoint="contacts",
+        method="POST",
+        data=contact_payload,
+        recover=lambda: _wrap("contact", find_dest_contact(contact, dest_customer_id))
+    )
+    return response.get("contact") or dict(contact_payload, id=response.get("id"))
+
+
+def find_dest_contact(contact: Dict[str, Any], dest_customer_id: int) -> Dict[str, Any]:
+    """
+    Look up a source contact among a destination customer's contacts, by email or normalized name.
+
+    Returns:
+        Dict[str, Any]: {'id': destination contact ID}, or None if it is not there.
+    """
+    response = syncro_api_call(
+        api_key=syncro_tenant_dest_api_key,
+        base_url=syncro_tenant_dest_base_url,
+        endpoint=f"contacts?customer_id={dest_customer_id}"
+    )
+    dest_contact_id = check_if_contact_exists(contact, dest_customer_id, build_contact_index(response.get("contacts", [])))
+    return {"id": dest_contact_id} if dest_contact_id else None
+
+
+def match_contacts(source_contacts: List[Dict[str, Any]], dest_contacts: List[Dict[str, Any]],
+                   customer_map: Dict[int, Any]) -> tuple:
+    """
+    Match source contacts to destination contacts by email and normalized name within the matching customer.
+
+    Args:
+        source_contacts (List[Dict[str, Any]]): Contacts in the source tenant.
+        dest_contacts (List[Dict[str, Any]]): Contacts in the destination tenant.
+        customer_map (Dict[int, Any]): Source customer ID to destination customer ID.
+
+    Returns:
+        tuple: (source contact ID to destination contact ID map, missing contacts grouped by
+        (destination customer ID, match key) so duplicates within the source are only created once).
+    """
+    dest_contact_index = build_contact_index(dest_contacts)
+    contact_map: Dict[int, int] = {}
+    contacts_to_create: Dict[tuple, List[Dict[str, Any]]] = {}
+
+    for contact in source_contacts:
+        dest_customer_id = customer_map.get(contact.get("customer_id"))
+        if not dest_customer_id:
+            logger.warning(f"No destination customer for contact '{contact.get('name')}' (source customer ID {contact.get('customer_id')}). Skipping...")
+            continue
+
+        dest_contact_id = check_if_contact_exists(contact, dest_customer_id, dest_contact_index)
+        if dest_contact_id:
+            contact_map[contact.get("id")] = dest_contact_id
+            continue
+
+        # Contacts with neither email nor name can't be told apart, so each one is created on its own
+        match_key = (dest_customer_id, str(contact.get("email") or "").strip().lower() or normalize_contact_name(contact.get("name"))
+                     or ("source_id", contact.get("id")))
+        contacts_to_create.setdefault(match_key, []).append(contact)
 
+    return contact_map, contacts_to_create
 
-def check_if_contact_exists():
-    pass
+
+def gather_and_compare_contacts(source_customers, dest_customers, max_workers: int = SYNCRO_POOL_WORKERS,
+                                snapshot: SnapshotReader = None) -> Dict[int, int]:
+    """
+    Gather and Compare Contact Lists
+    Fetches the contacts of both tenants once, matches them by email and normalized name
+    within the matching customer, and creates the missing contacts in the destination tenant.
+
+    Args:
+        source_customers (list): Customers in the source tenant.
+        dest_customers (list): Customers in the destination tenant.
+        max_workers (int): Number of contacts to create in parallel.
+        snapshot (SnapshotReader): Read the source contacts from this snapshot instead of the source API (optional).
+
+    Returns:
+        Dict[int, int]: Source contact ID to destination contact ID map.
+    """
+    dest_customer_ids = {customer.get("business_name"): customer.get("id") for customer in dest_customers}
+    customer_map = {
+        customer.get("id"): dest_customer_ids.get(customer.get("business_name"))
+        for customer in source_customers
+    }
+
+    # Fetch the contacts of both tenants at the same time
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        if snapshot:
+            source_future = executor.submit(snapshot.records, "contacts")
+        else:
+            source_future = executor.submit(get_all_contacts, syncro_tenant_source_api_key, syncro_tenant_source_base_url)
+        dest_future = executor.submit(get_all_contacts, syncro_tenant_dest_api_key, syncro_tenant_dest_base_url)
+        source_contacts = source_future.result()
+        dest_contacts = dest_future.result()
+
+    logger.info(f"Source Contacts: {len(source_contacts)}")
+    logger.info(f"Destination Contacts: {len(dest_contacts)}")
+
+    contact_map, contacts_to_create = match_contacts(source_contacts, dest_contacts, customer_map)
+    logger.info(f"Matched {len(contact_map)} contacts. Number of Contacts to be created: {len(contacts_to_create)}")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures, futures_keys = {}, {}
+        for match_key, contacts in contacts_to_create.items():
+            future = executor.submit(syncro_create_dest_contact, contacts[0], match_key[0])
+            futures[future], futures_keys[future] = contacts, match_key[0]
+        for future in as_completed(futures):
+            contacts = futures[future]
+            try:
+                created = future.result()
+                for contact in contacts:
+                    contact_map[contact.get("id")] = created.get("id")
+                logger.info(f"Created contact: {contacts[0].get('name')} with destination ID {created.get('id')}")
+            except Exception as e:
+                logger.error(f"Failed to create contact: {contacts[0].get('name')}, Error: {e}")
+                dead_letter("contact", contacts[0], e, dest_customer_id=futures_keys[future],
+                            source_contact_ids=[contact.get("id") for contact in contacts])
+
+    return contact_map
+
+
+def save_contact_map(contact_map: Dict[int, int], path: str = CONTACT_MAP_PATH) -> None:
+    """Save the source to destination contact map so delta runs can link contacts without refetching them."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({str(source_id): dest_id for source_id, dest_id in contact_map.items()}, f)
+
+
+def load_contact_map(path: str = CONTACT_MAP_PATH) -> Dict[int, int]:
+    """Load the contact map saved by the last full run, or an empty map if there is none."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return {int(source_id): dest_id for source_id, dest_id in json.load(f).items()}
+    except (OSError, ValueError) as e:
+        logger.error(f"Failed to load contact map from {path}: {e}")
+        return {}
+
+
+def iter_changed_customers(api_key: str, base_url: str, since: str):
+    """
+    Stream the customers updated after a watermark.
+
+    Customers are requested newest first. Once a page that is ordered by
+    updated_at reaches records older than the watermark, paging stops; if the
+    tenant ignores the sort order every page is read and filtered locally.
+
+    Args:
+        api_key (str): The API key for authorization.
+        base_url (str): The base URL of the Syncro tenant.
+        since (str): The customers watermark, or None for all customers.
+
+    Yields:
+        Dict[str, Any]: Customers changed since the watermark.
+    """
+    page = 1
+    while True:
+        response = syncro_api_call(api_key, base_url, f"/customers?page={page}&sort={quote('updated_at DESC')}")
+        customers = response.get("customers", [])
+        changed = [customer for customer in customers if is_newer(customer, since)]
+        yield from changed
+
+        timestamps = [parse_timestamp(customer.get("updated_at")) for customer in customers]
+        sorted_newest_first = all(a and b and a >= b for a, b in zip(timestamps, timestamps[1:]))
+        if since and customers and sorted_newest_first and len(changed) < len(customers):
+            break
+
+        if "meta" in response and response["meta"]["page"] < response["meta"]["total_pages"]:
+            page += 1
+        else:
+            break
+
+
+def iter_changed_tickets(api_key: str, base_url: str, since: str):
+    """
+    Stream the tickets updated after a watermark.
+    The watermark is sent as since_updated_at and also applied locally.
+
+    Args:
+        api_key (str): The API key for authorization.
+        base_url (str): The base URL of the Syncro tenant.
+        since (str): The tickets watermark, or None for all tickets.
+
+    Yields:
+        Dict[str, Any]: Tickets changed since the watermark.
+    """
+    page = 1
+    while True:
+        endpoint = f"tickets?page={page}"
+        if since:
+            endpoint += f"&since_updated_at={quote(since)}"
+        response = syncro_api_call(api_key=api_key, base_url=base_url, endpoint=endpoint)
+        ticket_data = response.get("tickets", [])
+        if not ticket_data:
+            break
+        for ticket in ticket_data:
+            if is_newer(ticket, since):
+                yield ticket
+        page += 1
+
+
+def find_dest_customer_record(business_name: str) -> Dict[str, Any]:
+    """
+    Look up a customer in the destination tenant by business name.
+
+    Args:
+        business_name (str): The business name to look for.
+
+    Returns:
+        Dict[str, Any]: The destination customer, or None if there is no exact match.
+    """
+    response = syncro_api_call(
+        api_key=syncro_tenant_dest_api_key,
+        base_url=syncro_tenant_dest_base_url,
+        endpoint=f"customers?business_name={quote(business_name or '')}"
+    )
+    for customer in response.get("customers", []):
+        if customer.get("business_name") == business_name:
+            return customer
+    return None
+
+
+def syncro_find_dest_customer(business_name: str):
+    """
+    Look up a customer in the destination tenant by business name.
+
+    Args:
+        business_name (str): The business name to look for.
+
+    Returns:
+        int: The destination customer ID, or None if there is no exact match.
+    """
+    customer = find_dest_customer_record(business_name)
+    return customer.get("id") if customer else None
+
+
+def resolve_dest_customer(business_name: str, dest_customer_ids: Dict[str, int] = None):
+    """
+    Find a customer in the destination tenant by business name, creating it if it is missing.
+
+    Args:
+        business_name (str): The business name of the source customer.
+        dest_customer_ids (Dict[str, int]): Cache of resolved names, updated in place (optional).
+
+    Returns:
+        int: The destination customer ID, or None if it could not be found or created.
+    """
+    if not business_name:
+        return None
+    if dest_customer_ids is not None and business_name in dest_customer_ids:
+        return dest_customer_ids[business_name]
+
+    dest_customer_id = syncro_find_dest_customer(business_name)
+    if not dest_customer_id:
+        try:
+            response = syncro_api_call(
+                api_key=syncro_tenant_dest_api_key,
+                base_url=syncro_tenant_dest_base_url,
+                endpoint="customers",
+                method="POST",
+                data={"business_name": business_name},
+                recover=lambda: _wrap("customer", find_dest_customer_record(business_name))
+            )
+            dest_customer_id = response.get("customer", {}).get("id")
+            logger.info("Created business: %s, Response: %s", business_name, LogPayload(response))
+        except Exception as e:
+            logger.error(f"Failed to create business: {business_name}, Error: {e}")
+            dead_letter("customer", {"business_name": business_name}, e)
+
+    if dest_customer_ids is not None:
+        dest_customer_ids[business_name] = dest_customer_id
+    return dest_customer_id
+
+
+@traced("replicate_ticket", lambda ticket_id, *args, **kwargs: {"source_ticket_id": ticket_id})
+def replicate_source_ticket(ticket_id: int, contact_map: Dict[int, int] = None, patch_changed: bool = False) -> None:
+    """
+    Replicate one source ticket into the destination tenant.
+
+    Creates the ticket if it has no subject match under the destination customer.
+    Otherwise creates the comments the destination copy is missing and, with
+    patch_changed, updates its changed fields.
+
+    Args:
+        ticket_id (int): The ticket ID in the source tenant.
+        contact_map (Dict[int, int]): Source contact ID to destination contact ID map.
+                                      Defaults to the map saved by the last full run.
+        patch_changed (bool): If True, an existing destination ticket with changed fields is patched.
+    """
+    source_ticket = syncro_api_call(
+        api_key=syncro_tenant_source_api_key,
+        base_url=syncro_tenant_source_base_url,
+        endpoint=f"tickets/{ticket_id}"
+    ).get("ticket")
+    if not source_ticket:
+        logger.warning(f"Source ticket {ticket_id} not found. Skipping replication.")
+        return
+
+    business_name = source_ticket.get("customer_business_then_name")
+    dest_customer_id = resolve_dest_customer(business_name)
+    if not dest_customer_id:
+        logger.warning(f"No destination customer for '{business_name}'. Skipping ticket {ticket_id}.")
+        return
+
+    dest_tickets = syncro_get_customer_tickets(
+        api_key=syncro_tenant_dest_api_key,
+        base_url=syncro_tenant_dest_base_url,
+        customer_id=dest_customer_id
+    ).get("tickets", [])
+    dest_ticket = next((t for t in dest_tickets if t.get("subject") == source_ticket.get("subject")), None)
+
+    if dest_ticket is None:
+        contact_map = load_contact_map() if contact_map is None else contact_map
+        syncro_create_dest_ticket(source_ticket, dest_customer_id, contact_map)
+        return
+
+    existing_digests = {comment_body_digest(comment.get("body")) for comment in dest_ticket.get("comments") or []}
+    for comment in source_ticket.get("comments") or []:
+        if comment_body_digest(comment.get("body")) in existing_digests:
+            continue
+        syncro_create_ticket_comment(dest_ticket["id"], {
+            "subject": comment.get("subject", "Imported Comment"),
+            "body": comment.get("body", ""),
+            "hidden": comment.get("hidden", False),
+            "do_not_email": comment.get("do_not_email", True),
+            "tech": comment.get("tech", "None"),
+            "created_at": comment["created_at"]
+        })
+        logger.info(f"Replicated new comment on ticket '{source_ticket.get('subject')}'")
+
+    changes = compute_ticket_patch(source_ticket, dest_ticket) if patch_changed else {}
+    if changes:
+        syncro_patch_dest_ticket(dest_ticket["id"], changes)
+
+
+def run_webhook_sync(host: str = WEBHOOK_HOST, port: int = WEBHOOK_PORT, patch_changed: bool = False,
+                     backstop_minutes: float = WEBHOOK_BACKSTOP_MINUTES) -> None:
+    """
+    Run continuous sync: replicate tickets as webhooks arrive, with a periodic delta sync as backstop.
+
+    Args:
+        host (str): Interface for the webhook receiver.
+        port (int): Port for the webhook receiver.
+        patch_changed (bool): If True, changed destination tickets are patched.
+        backstop_minutes (float): Minutes between backstop delta syncs.
+    """
+    from syncro_webhook import WebhookSync
+
+    contact_map = load_contact_map()
+    webhook_sync = WebhookSync(
+        replicate=lambda ticket_id: replicate_source_ticket(ticket_id, contact_map, patch_changed),
+        backstop=lambda: run_delta_sync(contact_map, patch_changed),
+        backstop_interval=backstop_minutes * 60
+    )
+    webhook_sync.run_forever(host, port)
+
+
+def run_delta_sync(contact_map: Dict[int, int] = None, patch_changed: bool = False) -> None:
+    """
+    Sync only the customers and tickets changed in the source tenant since the last run.
+
+    Uses the per-tenant, per-resource watermarks from syncro_watermarks. Destination
+    customers are looked up by name and destination tickets fetched only for the
+    customers that have changed tickets, so the run scales with the change volume.
+
+    Args:
+        contact_map (Dict[int, int]): Source contact ID to destination contact ID map.
+                                      Defaults to the map saved by the last full run.
+        patch_changed (bool): If True, existing destination tickets with changed fields are patched.
+    """
+    tenant = syncro_tenant_source_base_url
+    customers_since = get_watermark(tenant, "customers")
+    tickets_since = get_watermark(tenant, "tickets")
+    contact_map = load_contact_map() if contact_map is None else contact_map
+    logger.info(f"Starting delta sync. Customers since: {customers_since}, Tickets since: {tickets_since}")
+
+    dest_customer_ids: Dict[str, int] = {}
+
+    changed_customers = list(iter_changed_customers(syncro_tenant_source_api_key, syncro_tenant_source_base_url, customers_since))
+    logger.info(f"Changed source customers: {len(changed_customers)}")
+    for customer in changed_customers:
+        resolve_dest_customer(customer.get("business_name"), dest_customer_ids)
+
+    changed_tickets = list(iter_changed_tickets(syncro_tenant_source_api_key, syncro_tenant_source_base_url, tickets_since))
+    logger.info(f"Changed source tickets: {len(changed_tickets)}")
+
+    tickets_by_customer: Dict[str, List[Dict[str, Any]]] = {}
+    for ticket in changed_tickets:
+        tickets_by_customer.setdefault(ticket.get("customer_business_then_name"), []).append(ticket)
+
+    # Changed tickets may already exist in the destination, so progress is counted per customer
+    progress_phase("migrate_tickets")
+    progress_total("customers", len(tickets_by_customer))
+    failed_tickets = []
+    for business_name, source_tickets in tickets_by_customer.items():
+        dest_customer_id = resolve_dest_customer(business_name, dest_customer_ids)
+        if not dest_customer_id:
+            logger.warning(f"No destination customer for '{business_name}'. Skipping {len(source_tickets)} tickets.")
+            failed_tickets.extend(source_tickets)
+            progress_advance("customers")
+            continue
+
+        dest_tickets = syncro_get_customer_tickets(
+            api_key=syncro_tenant_dest_api_key,
+            base_url=syncro_tenant_dest_base_url,
+            customer_id=dest_customer_id
+        ).get("tickets", [])
+        failed_tickets += sync_customer_tickets(source_tickets, dest_tickets, dest_customer_id, contact_map, patch_changed)
+        progress_advance("customers")
+
+    # Failed tickets stay newer than the watermark, so the next delta run retries them
+    set_watermark(tenant, "customers", latest_updated_at(changed_customers, customers_since))
+    set_watermark(tenant, "tickets", hold_back_watermark(latest_updated_at(changed_tickets, tickets_since), failed_tickets))
+    logger.info("Delta sync complete.")
+
+
+def write_profile(profiler: cProfile.Profile, directory: str = LOG_DIR) -> List[str]:
+    """
+    Write a --profile run's cProfile stats and stage timings to the log directory.
+
+    cProfile only sees the main thread; work done in worker threads shows up in
+    the stage timings instead.
+
+    Args:
+        profiler (cProfile.Profile): The stopped profiler.
+        directory (str): Output directory.
+
+    Returns:
+        List[str]: The written files: raw stats (for pstats/snakeviz), a cumulative-time
+        summary and the stage timings JSON.
+    """
+    stem = os.path.join(directory, f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    profiler.dump_stats(f"{stem}.prof")
+    with open(f"{stem}.txt", "w", encoding="utf-8") as f:
+        pstats.Stats(profiler, stream=f).sort_stats("cumulative").print_stats(50)
+    write_stage_timings(f"{stem}_stages.json")
+    return [f"{stem}.prof", f"{stem}.txt", f"{stem}_stages.json"]
+
+
+def run_full_sync(patch_changed: bool = False, snapshot: SnapshotReader = None,
+                  external_sort: bool = DIFF_EXTERNAL_SORT) -> None:
+    """
+    Compare and migrate every customer, contact and ticket, then store watermarks
+    so the next delta sync starts from this run.
+
+    Args:
+        patch_changed (bool): If True, existing destination tickets with changed fields are patched.
+        snapshot (SnapshotReader): Read the source tenant from this snapshot; only the destination API is
+                                   called, and the watermarks are set to when the snapshot was started.
+        external_sort (bool): If True, compare tickets through sorted run files on disk instead of in memory.
+    """
+    run_started_at = snapshot.manifest["started_at"] if snapshot else datetime.now(timezone.utc).isoformat()
+
+    progress_phase("customers")
+    with stage_timer("run.customers"):
+        source_customers, dest_customers = gather_and_compare_customers(snapshot)
+        progress_total("customers", len(source_customers))
+    progress_phase("contacts")
+    with stage_timer("run.contacts"):
+        contact_map = gather_and_compare_contacts(source_customers, dest_customers, snapshot=snapshot)
+        save_contact_map(contact_map)
+    progress_phase("compare_tickets")
+    with stage_timer("run.compare_tickets"):
+        tickets_to_create = gather_and_compare_tickets(external_sort, patch_changed, snapshot)
+    progress_phase("migrate_tickets")
+    with stage_timer("run.migrate_tickets"):
+        failed_tickets = myfunction(source_customers, dest_customers, tickets_to_create, contact_map, snapshot)
+
+    # Failed tickets stay newer than the watermark, so the next delta run retries them
+    set_watermark(syncro_tenant_source_base_url, "customers", run_started_at)
+    set_watermark(syncro_tenant_source_base_url, "tickets", hold_back_watermark(run_started_at, failed_tickets))
+
+
+def fetch_plan_inputs(snapshot: SnapshotReader = None) -> Dict[str, Any]:
+    """
+    Read everything a migration plan needs from both tenants: customers, contacts and projected tickets.
+
+    Args:
+        snapshot (SnapshotReader): Read the source tenant from this snapshot instead of the source API (optional).
+
+    Returns:
+        Dict[str, Any]: The fetched records, with the read calls made per tenant and their average latency.
+    """
+    registry = get_metrics_registry()
+    calls_before = registry.calls_by_tenant()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        if snapshot:
+            source_future = executor.submit(lambda: (snapshot.records("customers"), snapshot.records("contacts"),
+                                                     [project_ticket(ticket) for ticket in snapshot.iter_records("tickets")]))
+        else:
+            source_future = executor.submit(lambda: (get_all_customers(syncro_tenant_source_api_key, syncro_tenant_source_base_url),
+                                                     get_all_contacts(syncro_tenant_source_api_key, syncro_tenant_source_base_url),
+                                                     fetch_projected_tickets(syncro_tenant_source_api_key, syncro_tenant_source_base_url)))
+        dest_future = executor.submit(lambda: (get_all_customers(syncro_tenant_dest_api_key, syncro_tenant_dest_base_url),
+                                               get_all_contacts(syncro_tenant_dest_api_key, syncro_tenant_dest_base_url),
+                                               fetch_projected_tickets(syncro_tenant_dest_api_key, syncro_tenant_dest_base_url)))
+        source_customers, source_contacts, source_tickets = source_future.result()
+        dest_customers, dest_contacts, dest_tickets = dest_future.result()
+
+    calls_after = registry.calls_by_tenant()
+    return {
+        "fetched_at": datetime.now(timezone.utc).isoformat(),
+        "source_base_url": syncro_tenant_source_base_url,
+        "dest_base_url": syncro_tenant_dest_base_url,
+        "read_calls": {tenant: calls_after.get(tenant, 0) - calls_before.get(tenant, 0) for tenant in ("source", "destination")},
+        "avg_latency_s": average_latency(registry.snapshot()),
+        "source_customers": source_customers,
+        "dest_customers": dest_customers,
+        "source_contacts": source_contacts,
+        "dest_contacts": dest_contacts,
+        "source_tickets": source_tickets,
+        "dest_tickets": dest_tickets,
+    }
+
+
+def build_migration_plan(inputs: Dict[str, Any], patch_changed: bool = False, from_snapshot: bool = False) -> Dict[str, Any]:
+    """
+    Work out what run_full_sync would do with the given tenant data, without writing anything.
+
+    Customers, contacts and tickets are matched with the same functions as the real run.
+    Contacts of customers that are still to be created count as contacts to create.
+
+    Args:
+        inputs (Dict[str, Any]): Tenant data from fetch_plan_inputs or a cached copy.
+        patch_changed (bool): If True, also plan the PUTs for changed tickets.
+        from_snapshot (bool): If True, plan a run that reads the source tenant from a snapshot.
+
+    Returns:
+        Dict[str, Any]: The plan with its counts, per-stage API calls and time estimate.
+    """
+    source_customers, dest_customers = inputs["source_customers"], inputs["dest_customers"]
+    dest_business_names = {customer.get("business_name", "Unknown") for customer in dest_customers}
+    customers_to_create = sorted({
+        customer.get("business_name", "Unknown") for customer in source_customers
+        if customer.get("business_name", "Unknown") not in dest_business_names
+    })
+
+    # Customers still to be created get placeholder IDs, so all of their contacts are planned as new
+    dest_customer_ids = {customer.get("business_name"): customer.get("id") for customer in dest_customers}
+    dest_customer_ids.update({name: f"new:{name}" for name in customers_to_create})
+    customer_map = {customer.get("id"): dest_customer_ids.get(customer.get("business_name")) for customer in source_customers}
+    contact_map, contacts_to_create = match_contacts(inputs["source_contacts"], inputs["dest_contacts"], customer_map)
+
+    tickets_to_create = diff_ticket_lists(inputs["source_tickets"], inputs["dest_tickets"])
+    comments_to_create = sum(ticket.get("comment_count", 0) for ticket in tickets_to_create)
+    tickets_to_patch = len(find_changed_tickets(inputs["source_tickets"], inputs["dest_tickets"])) if patch_changed else None
+
+    # API calls of each run_full_sync stage, as the code makes them
+    read_calls = inputs["read_calls"]
+    stages = {
+        "read": {"calls": dict(read_calls), "tenants_in_parallel": True},
+        "customers": {"calls": {"destination": len(customers_to_create)}},
+        "contacts": {"calls": {"destination": len(contacts_to_create)}, "parallel": True},
+    }
+    if patch_changed:
+        stages["patch"] = {"calls": {"destination": tickets_to_patch}, "parallel": True}
+    # Tickets come from the projected diff; each created ticket loads its comments from the source.
+    # Each customer's tickets are created by the worker pool
+    stages["migrate_tickets"] = {"calls": {
+        "source": 0 if from_snapshot else len(tickets_to_create),
+        "destination": len(tickets_to_create) + comments_to_create,
+    }, "parallel": True}
+
+    plan = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "inputs_fetched_at": inputs.get("fetched_at"),
+        "source": inputs.get("source_base_url"),
+        "destination": inputs.get("dest_base_url"),
+        "counts": {
+            "source_customers": len(source_customers),
+            "customers_to_create": len(customers_to_create),
+            "source_contacts": len(inputs["source_contacts"]),
+            "contacts_matched": len(contact_map),
+            "contacts_to_create": len(contacts_to_create),
+            "source_tickets": len(inputs["source_tickets"]),
+            "tickets_to_create": len(tickets_to_create),
+            "tickets_to_skip": len(inputs["source_tickets"]) - len(tickets_to_create),
+            "comments_to_create": comments_to_create,
+            "tickets_to_patch": tickets_to_patch,
+        },
+        "customers_to_create": customers_to_create,
+        "stages": stages,
+    }
+    return estimate_plan(plan, inputs.get("avg_latency_s") or 0.0, workers=SYNCRO_POOL_WORKERS)
+
+
+def run_dry_run(cache_path: str = None, patch_changed: bool = False, snapshot: SnapshotReader = None) -> Dict[str, Any]:
+    """
+    Plan a full migration with reads only, print it and write it to the log directory.
+
+    Args:
+        cache_path (str): Optional plan input cache; read instead of the tenants if it exists, written otherwise.
+        patch_changed (bool): If True, also plan the PUTs for changed tickets.
+        snapshot (SnapshotReader): Plan from this source snapshot, as run_full_sync would migrate from it (optional).
+
+    Returns:
+        Dict[str, Any]: The plan.
+    """
+    global _dry_run
+    _dry_run = True
+    inputs = load_plan_inputs(cache_path) if cache_path else None
+    if inputs is None:
+        inputs = fetch_plan_inputs(snapshot)
+        if cache_path:
+            save_plan_inputs(inputs, cache_path)
+
+    plan = build_migration_plan(inputs, patch_changed, from_snapshot=snapshot is not None)
+    print(format_plan(plan))
+    print(f"Plan written to {write_plan(plan)}")
+    return plan
+
+
+def export_source_snapshot(snapshot_dir: str = SNAPSHOT_DIR) -> Dict[str, Any]:
+    """
+    Export the source tenant to a snapshot archive, resuming an earlier interrupted export.
+
+    Args:
+        snapshot_dir (str): Snapshot directory.
+
+    Returns:
+        Dict[str, Any]: The snapshot manifest.
+    """
+    progress_phase("snapshot")
+    return export_snapshot(
+        lambda endpoint: syncro_api_call(syncro_tenant_source_api_key, syncro_tenant_source_base_url, endpoint),
+        snapshot_dir,
+        source=syncro_tenant_source_base_url,
+    )
+
+
+def replay_dead_letters(max_workers: int = SYNCRO_POOL_WORKERS) -> Dict[str, int]:
+    """
+    Retry only the records saved in the dead-letter store, concurrently, through the normal write paths.
+
+    Customers are replayed first, then contacts (which are added to the saved contact map), then
+    tickets and ticket patches, so the records they depend on exist by the time they are retried.
+
+    Args:
+        max_workers (int): Records retried at the same time.
+
+    Returns:
+        Dict[str, int]: Counts of 'resolved', 'failed' and 'skipped' (unknown kind) entries.
+    """
+    from syncro_write import syncro_create_ticket, syncro_create_comment
+
+    store = get_dead_letter_store()
+    contact_map = load_contact_map()
+    contact_map_lock = threading.Lock()
+
+    def replay_contact(entry):
+        created = syncro_create_dest_contact(entry["payload"], entry["context"]["dest_customer_id"])
+        with contact_map_lock:
+            for source_contact_id in entry["context"].get("source_contact_ids") or [entry["payload"].get("id")]:
+                contact_map[source_contact_id] = created.get("id")
+
+    stages = [
+        {"customer": lambda entry: resolve_dest_customer(entry["payload"]["business_name"])},
+        {"contact": replay_contact},
+        {
+            "ticket": lambda entry: syncro_create_dest_ticket(entry["payload"], entry["context"]["dest_customer_id"], contact_map),
+            "ticket_patch": lambda entry: syncro_patch_dest_ticket(entry["context"]["dest_ticket_id"], entry["payload"]),
+            "csv_ticket": lambda entry: syncro_create_ticket(entry["payload"]),
+        },
+        {"csv_comment": lambda entry: syncro_create_comment(entry["payload"])},
+    ]
+    known_kinds = {kind for handlers in stages for kind in handlers}
+    summary = {"resolved": 0, "failed": 0, "skipped": len([e for e in store.pending() if e["kind"] not in known_kinds])}
+    for handlers in stages:
+        result = store.replay(handlers, max_workers)
+        summary["resolved"] += result["resolved"]
+        summary["failed"] += result["failed"]
+        if "contact" in handlers and result["resolved"]:
+            save_contact_map(contact_map)
+    return summary
 
 
 if __name__ == "__main__":
-    source_customers, dest_customers = gather_and_compare_customers()
-    gather_and_compare_tickets()
-    myfunction(source_customers, dest_customers)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Migrate customers, contacts and tickets between Syncro tenants.")
+    parser.add_argument("--delta", action="store_true", help="Only sync records changed in the source since the last run.")
+    parser.add_argument("--patch", action="store_true", help="Update existing destination tickets whose status, resolved_at or problem_type changed.")
+    parser.add_argument("--external-sort", action="store_true", default=DIFF_EXTERNAL_SORT,
+                        help="Compare tickets through sorted run files on disk instead of in memory (for very large tenants).")
+    parser.add_argument("--webhook", action="store_true", help="Run continuously, replicating tickets from webhook events with a delta sync as backstop.")
+    parser.add_argument("--host", default=WEBHOOK_HOST, help="Webhook receiver interface.")
+    parser.add_argument("--port", type=int, default=WEBHOOK_PORT, help="Webhook receiver port.")
+    parser.add_argument("--backstop-minutes", type=float, default=WEBHOOK_BACKSTOP_MINUTES, help="Minutes between backstop delta syncs in webhook mode.")
+    parser.add_argument("--profile", action="store_true", help="Record cProfile output and per-stage wall/CPU times in the log directory.")
+    parser.add_argument("--trace", action="store_true", help="Record a trace per customer and ticket with a span per API call, and print the slowest tickets.")
+    parser.add_argument("--no-progress", action="store_true", help="Do not print progress or write the status file.")
+    parser.add_argument("--dry-run", action="store_true", help="Only read both tenants and print the migration plan with API call and time estimates.")
+    parser.add_argument("--export-snapshot", nargs="?", const=SNAPSHOT_DIR, metavar="DIR",
+                        help="Export the source tenant to a compressed, indexed snapshot archive (rerun to resume).")
+    parser.add_argument("--snapshot", metavar="DIR",
+                        help="Read the source tenant from a snapshot archive instead of its API (full sync and --dry-run).")
+    parser.add_argument("--plan-cache", help="With --dry-run, plan from this cached copy of the tenant data, or create it if missing.")
+    parser.add_argument("--replay-dead-letters", action="store_true",
+                        help=f"Retry only the records that failed in earlier runs, as saved in {DEAD_LETTER_PATH}.")
+    args = parser.parse_args()
+    if args.snapshot and (args.delta or args.webhook or args.replay_dead_letters):
+        parser.error("--snapshot only applies to a full sync or --dry-run, not --delta, --webhook or --replay-dead-letters")
+
+    if args.trace:
+        print(f"Writing traces to {enable_tracing()}")
+
+    profiler = None
+    if args.profile:
+        enable_stage_timing()
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    snapshot = None
+    if args.snapshot:
+        snapshot = SnapshotReader(args.snapshot, source=syncro_tenant_source_base_url)
+        print(f"Reading the source tenant from snapshot {args.snapshot} taken at {snapshot.manifest['started_at']}")
+
+    # Progress needs known totals, so it is reported for one-off full and delta runs only
+    if not args.no_progress and not args.webhook and not args.dry_run and not args.replay_dead_letters:
+        start_progress()
+
+    try:
+        if args.export_snapshot:
+            manifest = export_source_snapshot(args.export_snapshot)
+            print(f"Snapshot written to {args.export_snapshot}: "
+                  f"{ {name: state['records'] for name, state in manifest['resources'].items()} }")
+        elif args.replay_dead_letters:
+            print(f"Dead letter replay: {replay_dead_letters()}")
+        elif args.dry_run:
+            run_dry_run(args.plan_cache, patch_changed=args.patch, snapshot=snapshot)
+        elif args.webhook:
+            run_webhook_sync(args.host, args.port, args.patch, args.backstop_minutes)
+        elif args.delta:
+            run_delta_sync(patch_changed=args.patch)
+        else:
+            run_full_sync(patch_changed=args.patch, snapshot=snapshot, external_sort=args.external_sort)
+    finally:
+        stop_progress()
+        if snapshot:
+            snapshot.close()
+        metrics_paths = get_metrics_registry().dump()
+        print(f"API metrics written to {', '.join(metrics_paths)}")
+        if profiler:
+            profiler.disable()
+            print(f"Profile written to {', '.join(write_profile(profiler))}")
+        if args.trace:
+            close_tracing()
+            print(format_slowest_traces("replicate_ticket" if args.webhook else "ticket"))
\ No newline at end of file
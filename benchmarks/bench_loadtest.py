@@ -0,0 +1,174 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+'''
+Concurrency sweep against local mock Syncro tenants.
+
+At each concurrency level, a fresh source/destination pair of mock tenants is
+started with the given latency and rate limit, and the same batch of source
+tickets is created in the destination through syncro_create_dest_ticket
+(ticket POST, source comment GET and one POST per comment) by that many
+worker threads, as sync_customer_tickets does with its worker pool. Each level
+reports throughput, p50/p99 ticket latency, failures and the share of requests
+answered with 429, and the sweep recommends a SYNCRO_MAX_WORKERS value for that
+rate limit. SYNCRO_MAX_WORKERS sizes every bulk worker pool (ticket creation,
+contacts, patches, dead-letter replay) when SYNCRO_ADAPTIVE_CONCURRENCY=0; with
+adaptive concurrency on, it is only each tenant's starting limit.
+
+    python benchmarks/bench_loadtest.py --levels 1 2 4 8 16 --rate-limit 180 --latency 0.1
+
+The rate limit applies per rolling --rate-window seconds (60 by default, like
+Syncro's per-minute limit). A shorter window with a proportionally lower limit
+reaches the same steady state in less time, e.g. --rate-limit 30 --rate-window 10.
+
+The fixed levels run with adaptive concurrency switched off. --adaptive adds a
+final 'auto' level: HTTP_CONCURRENCY_MAX workers whose calls in flight are
+set by the per-tenant AIMD limiter, to compare against the best fixed level.
+'''
+
+# Add parent directory to sys.path for imports
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from bench_migration import import_migration
+from mock_syncro_server import MockSyncroServer, MockSyncroTenant, build_seed
+
+
+def percentile(values: list, percent: float) -> float:
+    """Nearest-rank percentile of values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, round(percent / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def run_level(migration, seed_data: dict, workers: int, latency: float, rate_limit: int,
+              rate_window: float, label=None) -> dict:
+    """
+    Create every seeded source ticket in a fresh destination tenant with the given number of workers.
+
+    Returns:
+        dict: Throughput, latency percentiles, failures and 429 rate for this level.
+    """
+    source = MockSyncroServer(MockSyncroTenant(seed_data), api_key="source-key", latency=latency,
+                              rate_limit_requests=rate_limit, rate_limit_window=rate_window)
+    dest = MockSyncroServer(MockSyncroTenant({"customers": seed_data["customers"]}), api_key="dest-key",
+                            latency=latency, rate_limit_requests=rate_limit, rate_limit_window=rate_window)
+    migration.syncro_tenant_source_base_url = source.start()
+    migration.syncro_tenant_dest_base_url = dest.start()
+
+    # Projected like gather_and_compare_tickets does, so comments are fetched from the source per ticket
+    tickets = [(migration.project_ticket(ticket), ticket["customer_id"]) for ticket in seed_data["tickets"]]
+    source.reset_stats()
+
+    def create(ticket_and_customer):
+        started = time.perf_counter()
+        created = migration.syncro_create_dest_ticket(*ticket_and_customer)
+        return created is not None, time.perf_counter() - started
+
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(create, tickets))
+        elapsed = time.perf_counter() - started
+    finally:
+        source.stop()
+        dest.stop()
+
+    latencies = [duration for ok, duration in outcomes if ok]
+    requests_made = source.stats["requests"] + dest.stats["requests"]
+    throttled = source.stats["throttled"] + dest.stats["throttled"]
+    return {
+        "workers": label or workers,
+        "tickets": len(tickets),
+        "created": len(latencies),
+        "failed": len(outcomes) - len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "tickets_per_second": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "p50_latency_s": round(percentile(latencies, 50), 4) if latencies else None,
+        "p99_latency_s": round(percentile(latencies, 99), 4) if latencies else None,
+        "requests": requests_made,
+        "throttled": throttled,
+        "throttle_rate": round(throttled / requests_made, 4) if requests_made else 0.0,
+    }
+
+
+def recommend_workers(levels: list, max_throttle_rate: float = 0.01, tolerance: float = 0.05):
+    """
+    Pick the smallest worker count within tolerance of the best throughput among levels
+    that stay under max_throttle_rate and lose no tickets.
+
+    Returns:
+        int: The recommended worker count, or None if no level qualifies.
+    """
+    eligible = [level for level in levels
+                if level["failed"] == 0 and level["throttle_rate"] <= max_throttle_rate and level["tickets_per_second"]]
+    eligible = [level for level in eligible if isinstance(level["workers"], int)]
+    if not eligible:
+        return None
+    best = max(level["tickets_per_second"] for level in eligible)
+    return min(level["workers"] for level in eligible if level["tickets_per_second"] >= best * (1 - tolerance))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep worker counts against rate-limited mock Syncro tenants.")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="Worker counts to test.")
+    parser.add_argument("--tickets", type=int, default=60, help="Tickets created at each level.")
+    parser.add_argument("--comments-per-ticket", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every mock response.")
+    parser.add_argument("--rate-limit", type=int, default=None, help="Requests per window per tenant before 429s.")
+    parser.add_argument("--rate-window", type=float, default=60.0, help="Rate limit window in seconds.")
+    parser.add_argument("--max-throttle-rate", type=float, default=0.01, help="Highest acceptable share of 429s.")
+    parser.add_argument("--adaptive", action="store_true", help="Also run a level with adaptive concurrency.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    customers = max(1, args.tickets // 10)
+    seed_data = build_seed(customers=customers, contacts_per_customer=0,
+                           tickets_per_customer=-(-args.tickets // customers),
+                           comments_per_ticket=args.comments_per_ticket)
+    seed_data["tickets"] = seed_data["tickets"][:args.tickets]
+
+    # Placeholder tenants; each level repoints the module at its own mock servers
+    migration = import_migration({
+        "source": {"api_key": "source-key", "base_url": "http://127.0.0.1:9/api/v1"},
+        "destination": {"api_key": "dest-key", "base_url": "http://127.0.0.1:9/api/v1"},
+    })
+
+    import syncro_http
+    from syncro_configs import HTTP_CONCURRENCY_MAX
+    from syncro_metrics import get_metrics_registry
+
+    levels = [(workers, False) for workers in args.levels] + ([(HTTP_CONCURRENCY_MAX, True)] if args.adaptive else [])
+    results = []
+    print(f"{'workers':>7} {'tickets/s':>9} {'p50 s':>7} {'p99 s':>7} {'failed':>6} {'429 rate':>8}")
+    for workers, adaptive in levels:
+        # Start each level without the breaker state, concurrency limits and metrics of the one before
+        with syncro_http._breakers_lock:
+            syncro_http._breakers.clear()
+        with syncro_http._limiters_lock:
+            syncro_http._limiters.clear()
+        get_metrics_registry().reset()
+        syncro_http.HTTP_ADAPTIVE_CONCURRENCY = adaptive
+        level = run_level(migration, seed_data, workers, args.latency, args.rate_limit, args.rate_window,
+                          label="auto" if adaptive else None)
+        results.append(level)
+        print(f"{level['workers']:>7} {level['tickets_per_second'] or 0:>9} {level['p50_latency_s'] or 0:>7} "
+              f"{level['p99_latency_s'] or 0:>7} {level['failed']:>6} {level['throttle_rate']:>8.2%}")
+
+    recommended = recommend_workers(results, args.max_throttle_rate)
+    if recommended is None:
+        print("No level stayed under the throttle limit without failures; lower the worker count or the request rate.")
+    else:
+        print(f"Recommended SYNCRO_MAX_WORKERS = {recommended} (worker pool size with SYNCRO_ADAPTIVE_CONCURRENCY=0)")
+        if args.rate_limit:
+            print(f"(for {args.rate_limit} requests per {args.rate_window:g}s and {args.latency}s latency)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"settings": vars(args), "levels": results, "recommended_workers": recommended}, f, indent=2)
@@ -0,0 +1,249 @@
+import argparse
+import gc
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import requests
+
+'''
+Peak-memory benchmark for full-tenant fetch and compare.
+
+For each synthetic size, a source tenant (all tickets) and a destination tenant
+(the first half of them) are served by mock_syncro_server.py in separate
+processes, so only this process's allocations are traced. Each stage is run
+under tracemalloc and reports its peak and retained memory, in total and per
+record:
+    customer_fetch  get_all_customers on the source
+    ticket_fetch    fetch_projected_tickets on both tenants
+    diff            diff_ticket_lists + find_changed_tickets
+    diff_external   external_diff_tickets (sorted runs on disk)
+    temp_cache_load load_or_fetch_temp_data from the temp data file
+
+    python benchmarks/bench_memory.py --sizes 1000 10000 50000 --output memory.json
+    python benchmarks/bench_memory.py --sizes 1000 10000 --compare memory.json
+'''
+
+# Add parent directory to sys.path for imports
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from bench_migration import import_migration
+from synthetic_tenant import SyntheticTenant, write_tenant
+
+MOCK_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_syncro_server.py")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_mock_process(seed_dir: str, per_page: int):
+    """
+    Serve a seed directory from a separate mock_syncro_server.py process.
+
+    Returns:
+        tuple: (process, base_url).
+    """
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, MOCK_SERVER, "--port", str(port), "--seed-dir", seed_dir, "--per-page", str(per_page)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}/api/v1"
+    for _ in range(600):
+        try:
+            requests.get(f"http://127.0.0.1:{port}/_stats", timeout=1)
+            return process, base_url
+        except requests.ConnectionError:
+            if process.poll() is not None:
+                raise RuntimeError(f"Mock server for {seed_dir} exited with code {process.returncode}")
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"Mock server for {seed_dir} did not start")
+
+
+def write_seed_dirs(tickets: int, work_dir: str, seed: int = 0):
+    """
+    Write a synthetic source tenant and a destination holding the first half of its tickets.
+
+    Returns:
+        tuple: (source seed dir, destination seed dir, generator).
+    """
+    tenant = SyntheticTenant(tickets=tickets, customers=max(10, tickets // 20), seed=seed)
+    source_dir = os.path.join(work_dir, "source")
+    dest_dir = os.path.join(work_dir, "dest")
+    write_tenant(tenant, source_dir, write_csv=False)
+
+    os.makedirs(dest_dir, exist_ok=True)
+    for resource in ("customers", "contacts", "users"):
+        shutil.copy(os.path.join(source_dir, f"{resource}.jsonl"), dest_dir)
+    with open(os.path.join(source_dir, "tickets.jsonl"), "r", encoding="utf-8") as source_file, \
+            open(os.path.join(dest_dir, "tickets.jsonl"), "w", encoding="utf-8") as dest_file:
+        for index, line in enumerate(source_file):
+            if index >= tickets // 2:
+                break
+            dest_file.write(line)
+    return source_dir, dest_dir, tenant
+
+
+def measure_stage(func, records: int) -> dict:
+    """
+    Run func under tracemalloc.
+
+    Peak is the highest traced memory during the call, and retained is what is still
+    allocated while the result is alive, both relative to the memory before the call.
+
+    Returns:
+        dict: Peak and retained bytes, per-record bytes and elapsed seconds.
+    """
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    peak_bytes, retained_bytes = peak - baseline, current - baseline
+    return {
+        "records": records,
+        "elapsed_s": round(elapsed, 3),
+        "peak_bytes": peak_bytes,
+        "retained_bytes": retained_bytes,
+        "peak_bytes_per_record": round(peak_bytes / records, 1) if records else None,
+        "retained_bytes_per_record": round(retained_bytes / records, 1) if records else None,
+    }
+
+
+def run_size(migration, tickets: int, per_page: int, seed: int = 0) -> dict:
+    """Measure every stage for one synthetic size."""
+    import syncro_utils
+
+    work_dir = tempfile.mkdtemp(prefix="syncro_bench_memory_")
+    processes = []
+    try:
+        source_dir, dest_dir, tenant = write_seed_dirs(tickets, work_dir, seed)
+        source_process, source_url = start_mock_process(source_dir, per_page)
+        processes.append(source_process)
+        dest_process, dest_url = start_mock_process(dest_dir, per_page)
+        processes.append(dest_process)
+
+        migration.syncro_tenant_source_base_url = source_url
+        migration.syncro_tenant_dest_base_url = dest_url
+        source_key = migration.syncro_tenant_source_api_key
+        dest_key = migration.syncro_tenant_dest_api_key
+
+        stages = {}
+        stages["customer_fetch"] = measure_stage(
+            lambda: migration.get_all_customers(source_key, source_url), len(tenant.customers))
+
+        fetched = {}
+
+        def fetch_tickets():
+            fetched["source"] = migration.fetch_projected_tickets(source_key, source_url)
+            fetched["dest"] = migration.fetch_projected_tickets(dest_key, dest_url)
+            return fetched
+
+        # Measured before the fetched lists are retained by the diff stage below
+        stages["ticket_fetch"] = measure_stage(fetch_tickets, tickets + tickets // 2)
+        stages["diff"] = measure_stage(
+            lambda: (migration.diff_ticket_lists(fetched["source"], fetched["dest"]),
+                     migration.find_changed_tickets(fetched["source"], fetched["dest"])),
+            tickets + tickets // 2)
+        fetched.clear()
+
+        diff_dir = os.path.join(work_dir, "diff")
+        stages["diff_external"] = measure_stage(
+            lambda: migration.external_diff_tickets(diff_dir, max_records_in_memory=max(1000, tickets // 10)),
+            tickets + tickets // 2)
+
+        temp_file = os.path.join(work_dir, "temp_data.json")
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump({"techs": tenant.users, "issue_types": [], "customers": tenant.customers,
+                       "contacts": tenant.contacts, "statuses": []}, f)
+        original_temp_path, original_cache = syncro_utils.TEMP_FILE_PATH, syncro_utils._temp_data_cache
+        syncro_utils.TEMP_FILE_PATH, syncro_utils._temp_data_cache = temp_file, None
+        try:
+            stages["temp_cache_load"] = measure_stage(
+                lambda: syncro_utils.load_or_fetch_temp_data(syncro_utils.logger),
+                len(tenant.users) + len(tenant.customers) + len(tenant.contacts))
+        finally:
+            syncro_utils.TEMP_FILE_PATH, syncro_utils._temp_data_cache = original_temp_path, original_cache
+
+        return stages
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait(timeout=10)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def compare_results(current: dict, previous: dict, threshold: float) -> list:
+    """
+    Compare peak bytes per record with an earlier run.
+
+    Returns:
+        list: '<size>/<stage>' entries whose peak bytes per record grew by more than threshold percent.
+    """
+    regressions = []
+    for size, stages in current.items():
+        for stage, result in stages.items():
+            before = previous.get(size, {}).get(stage)
+            if not before or not before.get("peak_bytes_per_record") or result.get("peak_bytes_per_record") is None:
+                continue
+            change = (result["peak_bytes_per_record"] - before["peak_bytes_per_record"]) / before["peak_bytes_per_record"] * 100
+            flag = ""
+            if change > threshold:
+                regressions.append(f"{size}/{stage}")
+                flag = "  <-- regression"
+            print(f"{size}/{stage}: {before['peak_bytes_per_record']} -> {result['peak_bytes_per_record']} "
+                  f"peak bytes/record ({change:+.1f}%){flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure peak and retained memory of the fetch and compare stages.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000], help="Source tickets per run.")
+    parser.add_argument("--per-page", type=int, default=100, help="Mock API page size.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results as JSON to this file.")
+    parser.add_argument("--compare", help="Compare against a previous results JSON file.")
+    parser.add_argument("--threshold", type=float, default=15.0, help="Growth in percent reported as a regression.")
+    args = parser.parse_args()
+
+    # Placeholder tenants; each size repoints the module at its own mock servers
+    migration = import_migration({
+        "source": {"api_key": "source-key", "base_url": "http://127.0.0.1:9/api/v1"},
+        "destination": {"api_key": "dest-key", "base_url": "http://127.0.0.1:9/api/v1"},
+    })
+
+    results = {}
+    for size in args.sizes:
+        results[str(size)] = run_size(migration, size, args.per_page, args.seed)
+        for stage, result in results[str(size)].items():
+            print(f"{size:>9} {stage:<16} peak {result['peak_bytes'] / 1048576:8.1f} MiB "
+                  f"({result['peak_bytes_per_record']} B/record), retained {result['retained_bytes'] / 1048576:8.1f} MiB "
+                  f"({result['retained_bytes_per_record']} B/record)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"sizes": args.sizes, "per_page": args.per_page, "results": results}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        regressions = compare_results(results, previous.get("results", {}), args.threshold)
+        if regressions:
+            print(f"Regressions: {regressions}")
+            sys.exit(1)
@@ -0,0 +1,131 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+'''
+End-to-end migration benchmark against local mock Syncro tenants.
+
+Starts a seeded source tenant and an empty destination tenant
+(see mock_syncro_server.py), points Syncro_To_Syncro at them, runs
+gather_and_compare_customers -> gather_and_compare_tickets -> myfunction
+and reports records per second and API calls per migrated ticket.
+
+    python benchmarks/bench_migration.py --customers 20 --tickets-per-customer 10 --latency 0.02
+'''
+
+# Add parent directory to sys.path for imports
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+from mock_syncro_server import MockSyncroServer, MockSyncroTenant, build_seed
+
+
+def start_mock_tenants(seed_data: dict, latency: float = 0.0, rate_limit: int = None, per_page: int = 25):
+    """
+    Start a source tenant seeded with seed_data and an empty destination tenant.
+
+    Returns:
+        tuple: (source server, destination server, tenant config dict for Syncro_To_Syncro).
+    """
+    source = MockSyncroServer(MockSyncroTenant(seed_data, per_page=per_page), api_key="source-key",
+                              latency=latency, rate_limit_requests=rate_limit)
+    dest = MockSyncroServer(MockSyncroTenant({}, per_page=per_page), api_key="dest-key",
+                            latency=latency, rate_limit_requests=rate_limit)
+    tenant_config = {
+        "source": {"api_key": "source-key", "base_url": source.start()},
+        "destination": {"api_key": "dest-key", "base_url": dest.start()},
+    }
+    return source, dest, tenant_config
+
+
+def import_migration(tenant_config: dict):
+    """
+    Import Syncro_To_Syncro configured for the given tenants, without the fixed per-call delay.
+
+    The tenant config is written to a temporary file and passed through the
+    SYNCRO_TENANTS_CONFIG environment variable, so no prompts are shown.
+    """
+    config_file = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False)
+    json.dump(tenant_config, config_file)
+    config_file.close()
+    os.environ["SYNCRO_TENANTS_CONFIG"] = config_file.name
+    os.environ.setdefault("SYNCRO_API_CALL_DELAY", "0")
+    # Keep the create ID map and dead letters of benchmark runs out of the working directory
+    work_dir = tempfile.mkdtemp(prefix="syncro_bench_")
+    os.environ.setdefault("SYNCRO_IDEMPOTENCY_PATH", os.path.join(work_dir, "idempotency.jsonl"))
+    os.environ.setdefault("SYNCRO_DEAD_LETTER_PATH", os.path.join(work_dir, "dead_letters.jsonl"))
+
+    import Syncro_To_Syncro
+    return Syncro_To_Syncro
+
+
+def run_benchmark(customers: int = 20, contacts_per_customer: int = 3, tickets_per_customer: int = 10,
+                  comments_per_ticket: int = 3, latency: float = 0.0, rate_limit: int = None) -> dict:
+    """
+    Run one end-to-end migration against fresh mock tenants.
+
+    Returns:
+        dict: Elapsed time, migrated record counts, throughput and API call counts.
+    """
+    seed_data = build_seed(customers, contacts_per_customer, tickets_per_customer, comments_per_ticket)
+    source, dest, tenant_config = start_mock_tenants(seed_data, latency, rate_limit)
+    try:
+        migration = import_migration(tenant_config)
+
+        started = time.perf_counter()
+        source_customers, dest_customers = migration.gather_and_compare_customers()
+        tickets_to_create = migration.gather_and_compare_tickets()
+        migration.myfunction(source_customers, dest_customers, tickets_to_create)
+        elapsed = time.perf_counter() - started
+
+        tickets_migrated = len(dest.tenant.tickets)
+        comments_migrated = sum(len(ticket.get("comments") or []) for ticket in dest.tenant.tickets.values())
+        records_migrated = len(dest.tenant.customers) + tickets_migrated + comments_migrated
+        api_calls = source.stats["requests"] + dest.stats["requests"]
+
+        return {
+            "customers": customers,
+            "tickets_per_customer": tickets_per_customer,
+            "comments_per_ticket": comments_per_ticket,
+            "latency": latency,
+            "elapsed_seconds": round(elapsed, 3),
+            "customers_migrated": len(dest.tenant.customers),
+            "tickets_migrated": tickets_migrated,
+            "comments_migrated": comments_migrated,
+            "records_per_second": round(records_migrated / elapsed, 2) if elapsed else None,
+            "tickets_per_second": round(tickets_migrated / elapsed, 2) if elapsed else None,
+            "api_calls": {"source": source.stats["requests"], "destination": dest.stats["requests"], "total": api_calls},
+            "api_calls_per_ticket": round(api_calls / tickets_migrated, 2) if tickets_migrated else None,
+            "throttled": source.stats["throttled"] + dest.stats["throttled"],
+            "by_endpoint": {"source": source.stats["by_endpoint"], "destination": dest.stats["by_endpoint"]},
+        }
+    finally:
+        source.stop()
+        dest.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark a full migration against local mock Syncro tenants.")
+    parser.add_argument("--customers", type=int, default=20)
+    parser.add_argument("--contacts-per-customer", type=int, default=3)
+    parser.add_argument("--tickets-per-customer", type=int, default=10)
+    parser.add_argument("--comments-per-ticket", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every mock response.")
+    parser.add_argument("--rate-limit", type=int, default=None, help="Mock requests per minute before 429s.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.customers, args.contacts_per_customer, args.tickets_per_customer,
+                            args.comments_per_ticket, args.latency, args.rate_limit)
+
+    print(f"Migrated {results['customers_migrated']} customers, {results['tickets_migrated']} tickets, "
+          f"{results['comments_migrated']} comments in {results['elapsed_seconds']}s")
+    print(f"Records per second: {results['records_per_second']}")
+    print(f"API calls: {results['api_calls']['total']} ({results['api_calls_per_ticket']} per migrated ticket)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
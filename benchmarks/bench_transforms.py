@@ -0,0 +1,231 @@
+import argparse
+import csv
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+'''
+Microbenchmarks for the syncro_utils transform hot path.
+
+Times syncro_prepare_ticket_json, get_syncro_created_date,
+get_syncro_customer_contact, load_csv and get_syncro_tech over the tickets in
+"Test Data CSV/" and over scaled-up synthetic inputs. The temp data cache is
+primed with synthetic techs, customers and contacts, so no API calls are made.
+
+    python benchmarks/bench_transforms.py --scales 1 10 --output transforms.json
+    python benchmarks/bench_transforms.py --compare transforms.json
+'''
+
+# Add parent directory to sys.path for imports
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+import syncro_utils
+
+CSV_DIR = os.path.join(parent_dir, "Test Data CSV")
+PRIORITIES = ["Urgent", "High", "Normal", "Low"]
+ISSUE_TYPES = ["Hardware", "Software", "Network", "Email", "Printer", "Other"]
+
+
+def load_test_tickets(csv_path: str) -> list:
+    """
+    Turn a 'Test Data CSV' conversation export into importer-shaped ticket rows.
+
+    The conversation rows are grouped by ticket number; the first user message
+    becomes the initial issue, and customer, tech and contact names are derived
+    from the ticket number so they resolve against the primed temp data.
+    """
+    tickets = {}
+    with open(csv_path, mode="r", encoding="utf-8") as csvfile:
+        for row in csv.DictReader(csvfile):
+            number = row["Ticket Number"]
+            ticket = tickets.get(number)
+            if ticket is None:
+                index = int(number)
+                ticket = tickets[number] = {
+                    "ticket customer": f"Customer {index % 50}",
+                    "ticket number": f"T-{number}",
+                    "ticket subject": row["Ticket Title"],
+                    "tech": f"Tech {index % 10}",
+                    "ticket initial issue": row["User Message"] or row["Ticket Title"],
+                    "ticket status": "Resolved",
+                    "ticket issue type": ISSUE_TYPES[index % len(ISSUE_TYPES)],
+                    "ticket created": row["Timestamp"],
+                    "ticket contact": f"contact {index % 50}-{index % 3}",
+                    "ticket priority": PRIORITIES[index % len(PRIORITIES)],
+                }
+    return list(tickets.values())
+
+
+def scale_tickets(tickets: list, scale: int) -> list:
+    """Repeat the tickets scale times, spreading them over scale times as many customers, techs and contacts."""
+    scaled = []
+    for copy_index in range(scale):
+        for ticket in tickets:
+            index = int(ticket["ticket number"][2:]) + copy_index * len(tickets)
+            scaled.append(dict(
+                ticket,
+                **{
+                    "ticket customer": f"Customer {index % (50 * scale)}",
+                    "ticket number": f"T-{index}",
+                    "tech": f"Tech {index % (10 * scale)}",
+                    "ticket contact": f"contact {index % (50 * scale)}-{index % 3}",
+                }
+            ))
+    return scaled
+
+
+def build_temp_data(scale: int) -> dict:
+    """Build temp data with 10*scale techs, 50*scale customers and 3 contacts per customer."""
+    customers = [{"id": 1000 + i, "business_name": f"Customer {i}"} for i in range(50 * scale)]
+    contacts = [
+        {"id": 50000 + i * 3 + j, "customer_id": 1000 + i, "name": f"Contact {i}-{j}"}
+        for i in range(50 * scale) for j in range(3)
+    ]
+    return {
+        "techs": [{"id": 100 + i, "name": f"Tech {i}"} for i in range(10 * scale)],
+        "issue_types": ISSUE_TYPES,
+        "customers": customers,
+        "contacts": contacts,
+        "statuses": ["New", "In Progress", "Resolved"],
+    }
+
+
+def time_callable(func, repeat: int, warmup: int = 1) -> list:
+    """Run func warmup + repeat times and return the wall times of the measured runs."""
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def summarize(timings: list, items: int) -> dict:
+    """Summarize the timings of a benchmark that processes items records per run."""
+    median = statistics.median(timings)
+    return {
+        "items": items,
+        "runs": len(timings),
+        "median_s": median,
+        "min_s": min(timings),
+        "stdev_s": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "ops_per_sec": items / median if median else None,
+    }
+
+
+def run_suite(scales: list, repeat: int) -> dict:
+    """
+    Run every transform benchmark at every scale.
+
+    Returns:
+        dict: Results keyed by '<benchmark>[x<scale>]'.
+    """
+    results = {}
+    csv_paths = sorted(glob.glob(os.path.join(CSV_DIR, "*.csv")))
+    base_tickets = load_test_tickets(csv_paths[0])
+
+    for csv_path in csv_paths:
+        with open(csv_path, encoding="utf-8") as f:
+            rows = sum(1 for _ in f) - 1
+        name = f"load_csv[{os.path.basename(csv_path)}]"
+        results[name] = summarize(time_callable(lambda: syncro_utils.load_csv(csv_path), repeat), rows)
+
+    for scale in scales:
+        tickets = scale_tickets(base_tickets, scale)
+        syncro_utils._temp_data_cache = build_temp_data(scale)
+        customer_ids = {c["business_name"]: c["id"] for c in syncro_utils._temp_data_cache["customers"]}
+        contact_lookups = [(customer_ids.get(t["ticket customer"]), t["ticket contact"]) for t in tickets]
+
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, newline="", encoding="utf-8") as scaled_csv:
+            writer = csv.DictWriter(scaled_csv, fieldnames=list(tickets[0]))
+            writer.writeheader()
+            writer.writerows(tickets)
+
+        suite = {
+            "load_csv": (lambda: syncro_utils.load_csv(scaled_csv.name), len(tickets)),
+            "get_syncro_created_date": (lambda: [syncro_utils.get_syncro_created_date(t["ticket created"]) for t in tickets], len(tickets)),
+            "get_syncro_tech": (lambda: [syncro_utils.get_syncro_tech(t["tech"]) for t in tickets], len(tickets)),
+            "get_syncro_customer_contact": (lambda: [syncro_utils.get_syncro_customer_contact(c, n) for c, n in contact_lookups], len(tickets)),
+            "syncro_prepare_ticket_json": (lambda: [syncro_utils.syncro_prepare_ticket_json(t) for t in tickets], len(tickets)),
+        }
+        for name, (func, items) in suite.items():
+            results[f"{name}[x{scale}]"] = summarize(time_callable(func, repeat), items)
+            print(f"{name}[x{scale}]: {results[f'{name}[x{scale}]']['ops_per_sec']:.0f} ops/s")
+
+        os.remove(scaled_csv.name)
+
+    return results
+
+
+def compare_results(current: dict, previous: dict, threshold: float) -> list:
+    """
+    Compare two result sets by ops/sec.
+
+    Returns:
+        list: Names of benchmarks that slowed down by more than threshold percent.
+    """
+    regressions = []
+    for name, result in current.items():
+        before = previous.get(name)
+        if not before or not before.get("ops_per_sec") or not result.get("ops_per_sec"):
+            continue
+        change = (result["ops_per_sec"] - before["ops_per_sec"]) / before["ops_per_sec"] * 100
+        flag = ""
+        if change < -threshold:
+            regressions.append(name)
+            flag = "  <-- regression"
+        print(f"{name}: {before['ops_per_sec']:.0f} -> {result['ops_per_sec']:.0f} ops/s ({change:+.1f}%){flag}")
+    return regressions
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=parent_dir,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the syncro_utils transform layer.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10], help="Input scale factors (1 = the 1,000-ticket CSV).")
+    parser.add_argument("--repeat", type=int, default=5, help="Measured runs per benchmark.")
+    parser.add_argument("--output", help="Write results as JSON to this file.")
+    parser.add_argument("--compare", help="Compare against a previous results JSON file.")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Slowdown in percent reported as a regression.")
+    args = parser.parse_args()
+
+    results = run_suite(args.scales, args.repeat)
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scales": args.scales,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        regressions = compare_results(results, previous.get("results", {}), args.threshold)
+        if regressions:
+            print(f"Regressions: {regressions}")
+            sys.exit(1)
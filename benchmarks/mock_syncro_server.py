@@ -0,0 +1,405 @@
+import argparse
+import copy
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+from urllib.parse import parse_qs, urlparse
+
+'''
+Local stand-in for the Syncro API, for benchmarks and load tests.
+
+Implements the endpoints this project calls (/customers, /contacts, /tickets,
+/tickets/{id}, /tickets/{id}/comment, /users, /settings, /tickets/settings)
+with Syncro-style pagination meta. Latency, a per-minute rate limit with 429
+responses, and page size are configurable. GET /_stats returns request counters.
+
+Run standalone with:
+    python benchmarks/mock_syncro_server.py --port 8900 --customers 50 --tickets-per-customer 20
+    python benchmarks/mock_syncro_server.py --port 8900 --seed-dir synthetic_tenant
+'''
+
+PROBLEM_TYPES = ["Hardware", "Software", "Network", "Email", "Printer", "Other"]
+TICKET_STATUSES = ["New", "In Progress", "Waiting on Customer", "Scheduled", "Resolved"]
+
+
+def _timestamp(moment: datetime) -> str:
+    return moment.astimezone(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _parse_timestamp(value: str) -> datetime:
+    if not value:
+        return datetime.min.replace(tzinfo=timezone.utc)
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def build_seed(customers: int = 20, contacts_per_customer: int = 3, tickets_per_customer: int = 10,
+               comments_per_ticket: int = 3, techs: int = 5, seed: int = 0) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Build a small synthetic tenant.
+
+    Args:
+        customers (int): Number of customers.
+        contacts_per_customer (int): Contacts per customer.
+        tickets_per_customer (int): Tickets per customer.
+        comments_per_ticket (int): Comments per ticket.
+        techs (int): Number of users (techs).
+        seed (int): Random seed, so the same arguments always produce the same tenant.
+
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: Records keyed by resource ('customers', 'contacts', 'tickets', 'users').
+    """
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    data = {"customers": [], "contacts": [], "tickets": [], "users": []}
+
+    for tech_id in range(1, techs + 1):
+        data["users"].append({"id": tech_id, "full_name": f"Tech {tech_id}", "name": f"Tech {tech_id}"})
+
+    ticket_number = 1000
+    for customer_index in range(1, customers + 1):
+        customer_id = customer_index
+        business_name = f"Customer {customer_index:05d} LLC"
+        updated_at = _timestamp(start + timedelta(hours=customer_index))
+        data["customers"].append({"id": customer_id, "business_name": business_name, "updated_at": updated_at})
+
+        contact_ids = []
+        for contact_index in range(contacts_per_customer):
+            contact_id = len(data["contacts"]) + 1
+            contact_ids.append(contact_id)
+            data["contacts"].append({
+                "id": contact_id,
+                "customer_id": customer_id,
+                "name": f"Contact {customer_index}-{contact_index}",
+                "email": f"contact{customer_index}_{contact_index}@example.com",
+                "updated_at": updated_at,
+            })
+
+        for _ in range(tickets_per_customer):
+            ticket_number += 1
+            created = start + timedelta(minutes=ticket_number * 7)
+            comments = [{
+                "id": ticket_number * 100 + comment_index,
+                "subject": "Update",
+                "body": f"Comment {comment_index} on ticket {ticket_number}: {rng.choice(PROBLEM_TYPES)} follow-up.",
+                "tech": f"Tech {rng.randint(1, max(techs, 1))}",
+                "hidden": False,
+                "do_not_email": True,
+                "created_at": _timestamp(created + timedelta(minutes=5 * (comment_index + 1))),
+            } for comment_index in range(comments_per_ticket)]
+            data["tickets"].append({
+                "id": ticket_number,
+                "number": ticket_number,
+                "subject": f"{rng.choice(PROBLEM_TYPES)} issue #{ticket_number}",
+                "customer_id": customer_id,
+                "customer_business_then_name": business_name,
+                "contact_id": rng.choice(contact_ids) if contact_ids else None,
+                "status": rng.choice(TICKET_STATUSES),
+                "problem_type": rng.choice(PROBLEM_TYPES),
+                "created_at": _timestamp(created),
+                "updated_at": _timestamp(created + timedelta(hours=1)),
+                "resolved_at": None,
+                "comments": comments,
+            })
+
+    return data
+
+
+class MockSyncroTenant:
+    """
+    In-memory Syncro tenant that answers API requests.
+
+    Args:
+        seed_data (dict): Records keyed by resource, e.g. from build_seed.
+        per_page (int): Records per page in list responses.
+    """
+
+    def __init__(self, seed_data: Dict[str, List[Dict[str, Any]]] = None, per_page: int = 25):
+        seed_data = copy.deepcopy(seed_data or {})
+        self.per_page = per_page
+        self.customers = {c["id"]: c for c in seed_data.get("customers", [])}
+        self.contacts = {c["id"]: c for c in seed_data.get("contacts", [])}
+        self.tickets = {t["id"]: t for t in seed_data.get("tickets", [])}
+        self.users = list(seed_data.get("users", []))
+        self._lock = threading.Lock()
+        self._next_id = max([0, *self.customers, *self.contacts, *self.tickets]) + 1
+        self._next_number = max([1000, *(int(t.get("number") or 0) for t in self.tickets.values())]) + 1
+
+    def _new_id(self) -> int:
+        new_id = self._next_id
+        self._next_id += 1
+        return new_id
+
+    def _page(self, key: str, records: List[Dict[str, Any]], query: Dict[str, str]):
+        page = max(int(query.get("page") or 1), 1)
+        total_pages = max((len(records) + self.per_page - 1) // self.per_page, 1)
+        page_records = records[(page - 1) * self.per_page: page * self.per_page]
+        return 200, {
+            key: page_records,
+            "meta": {
+                "total_pages": total_pages,
+                "total_entries": len(records),
+                "per_page": self.per_page,
+                "page": page,
+                "next_page": page + 1 if page < total_pages else None,
+                "prev_page": page - 1 if page > 1 else None,
+            },
+        }
+
+    def handle(self, method: str, path: str, query: Dict[str, str], body: Dict[str, Any]):
+        """
+        Answer one API request.
+
+        Args:
+            method (str): HTTP method.
+            path (str): Request path without the /api/v1 prefix, e.g. '/tickets/12/comment'.
+            query (Dict[str, str]): Query parameters.
+            body (Dict[str, Any]): Decoded JSON body.
+
+        Returns:
+            tuple: (HTTP status, JSON response body as a string).
+        """
+        with self._lock:
+            # Serialize while holding the lock so concurrent writes can't change the records mid-dump
+            status, payload = self._route(method, path, query, body)
+            return status, json.dumps(payload)
+
+    def _route(self, method: str, path: str, query: Dict[str, str], body: Dict[str, Any]):
+        now = _timestamp(datetime.now(timezone.utc))
+        if path == "/customers" and method == "GET":
+            records = list(self.customers.values())
+            if query.get("business_name"):
+                records = [c for c in records if c.get("business_name") == query["business_name"]]
+            if query.get("sort", "").lower().startswith("updated_at"):
+                records.sort(key=lambda c: c.get("updated_at") or "", reverse=query["sort"].lower().endswith("desc"))
+            return self._page("customers", records, query)
+        if path == "/customers" and method == "POST":
+            customer = dict(body, id=self._new_id(), updated_at=now)
+            self.customers[customer["id"]] = customer
+            return 200, {"customer": customer}
+
+        if path == "/contacts" and method == "GET":
+            records = list(self.contacts.values())
+            if query.get("customer_id"):
+                records = [c for c in records if str(c.get("customer_id")) == query["customer_id"]]
+            return self._page("contacts", records, query)
+        if path == "/contacts" and method == "POST":
+            contact = dict(body, id=self._new_id(), updated_at=now)
+            self.contacts[contact["id"]] = contact
+            return 200, {"contact": contact}
+
+        if path == "/users" and method == "GET":
+            return self._page("users", self.users, query)
+        if path == "/settings" and method == "GET":
+            return 200, {"ticket": {"problem_types": PROBLEM_TYPES}}
+        if path == "/tickets/settings" and method == "GET":
+            return 200, {"ticket_status_list": TICKET_STATUSES}
+
+        if path == "/tickets" and method == "GET":
+            records = list(self.tickets.values())
+            if query.get("customer_id"):
+                records = [t for t in records if str(t.get("customer_id")) == query["customer_id"]]
+            if query.get("number"):
+                records = [t for t in records if str(t.get("number")) == query["number"]]
+            if query.get("since_updated_at"):
+                since = _parse_timestamp(query["since_updated_at"])
+                records = [t for t in records if _parse_timestamp(t.get("updated_at")) > since]
+            return self._page("tickets", records, query)
+        if path == "/tickets" and method == "POST":
+            ticket_id = self._new_id()
+            number = body.get("number") or self._next_number
+            self._next_number = max(self._next_number, int(number) + 1) if str(number).isdigit() else self._next_number
+            customer = self.customers.get(body.get("customer_id"), {})
+            comments = [dict(c, id=self._new_id()) for c in body.get("comments_attributes") or []]
+            ticket = {k: v for k, v in body.items() if k != "comments_attributes"}
+            ticket.update(id=ticket_id, number=number, comments=comments, updated_at=now,
+                          customer_business_then_name=customer.get("business_name"))
+            self.tickets[ticket_id] = ticket
+            return 200, {"ticket": ticket}
+
+        match = re.fullmatch(r"/tickets/(\d+)(/comment)?", path)
+        if match:
+            ticket = self.tickets.get(int(match.group(1)))
+            if ticket is None:
+                return 404, {"error": "Ticket not found"}
+            if match.group(2) and method == "POST":
+                comment = dict(body, id=self._new_id())
+                ticket["comments"].append(comment)
+                ticket["updated_at"] = now
+                return 200, {"comment": comment}
+            if not match.group(2) and method == "GET":
+                return 200, {"ticket": ticket}
+            if not match.group(2) and method == "PUT":
+                ticket.update(body, updated_at=now)
+                return 200, {"ticket": ticket}
+
+        return 404, {"error": f"No route for {method} {path}"}
+
+
+class MockSyncroServer:
+    """
+    HTTP server exposing a MockSyncroTenant.
+
+    Args:
+        tenant (MockSyncroTenant): The tenant to serve.
+        api_key (str): Expected bearer token; requests with another token get 401. None disables the check.
+        latency (float): Seconds added to every response.
+        latency_jitter (float): Extra random latency of up to this many seconds.
+        rate_limit_requests (int): Requests allowed per rolling window before 429s; None disables the limit.
+        rate_limit_window (float): Length of the rolling window in seconds. Shorter windows let load
+            tests reach the limit without running for minutes.
+    """
+
+    def __init__(self, tenant: MockSyncroTenant, api_key: str = None, latency: float = 0.0,
+                 latency_jitter: float = 0.0, rate_limit_requests: int = None, rate_limit_window: float = 60.0):
+        self.tenant = tenant
+        self.api_key = api_key
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.rate_limit_requests = rate_limit_requests
+        self.rate_limit_window = rate_limit_window
+        self.stats = {"requests": 0, "throttled": 0, "by_endpoint": {}}
+        self._request_times: List[float] = []
+        self._stats_lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def _throttled(self):
+        """Return the seconds until the oldest request leaves the window if throttled, else None."""
+        if not self.rate_limit_requests:
+            return None
+        now = time.monotonic()
+        with self._stats_lock:
+            self._request_times = [t for t in self._request_times if now - t < self.rate_limit_window]
+            if len(self._request_times) >= self.rate_limit_requests:
+                self.stats["throttled"] += 1
+                return max(1, round(self.rate_limit_window - (now - self._request_times[0])))
+            self._request_times.append(now)
+            return None
+
+    def _count(self, method: str, path: str) -> None:
+        endpoint = method + " " + re.sub(r"/\d+", "/{id}", path)
+        with self._stats_lock:
+            self.stats["requests"] += 1
+            self.stats["by_endpoint"][endpoint] = self.stats["by_endpoint"].get(endpoint, 0) + 1
+
+    def _make_handler(self):
+        server = self
+
+        class MockSyncroHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _respond(self, status: int, payload, headers: Dict[str, str] = None):
+                body = (payload if isinstance(payload, str) else json.dumps(payload)).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _handle(self, method: str):
+                parsed = urlparse(self.path)
+                path = re.sub(r"/+", "/", parsed.path)
+                path = re.sub(r"^/api/v1", "", path).rstrip("/") or "/"
+                query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+                length = int(self.headers.get("Content-Length") or 0)
+                raw_body = self.rfile.read(length) if length else b""
+
+                if path == "/_stats":
+                    with server._stats_lock:
+                        return self._respond(200, copy.deepcopy(server.stats))
+
+                server._count(method, path)
+                if server.api_key and self.headers.get("Authorization") != f"Bearer {server.api_key}":
+                    return self._respond(401, {"error": "Unauthorized"})
+                retry_after = server._throttled()
+                if retry_after is not None:
+                    return self._respond(429, {"error": "Rate limit exceeded"}, {"Retry-After": str(retry_after)})
+
+                delay = server.latency + (random.uniform(0, server.latency_jitter) if server.latency_jitter else 0)
+                if delay:
+                    time.sleep(delay)
+
+                try:
+                    body = json.loads(raw_body) if raw_body else {}
+                except json.JSONDecodeError:
+                    return self._respond(400, {"error": "Invalid JSON"})
+                status, payload = server.tenant.handle(method, path, query, body)
+                self._respond(status, payload)
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def do_PUT(self):
+                self._handle("PUT")
+
+            def log_message(self, format, *args):
+                pass  # Keep benchmark output clean
+
+        return MockSyncroHandler
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Start serving in a background thread.
+
+        Returns:
+            str: The base URL to use as a tenant base_url, e.g. 'http://127.0.0.1:8900/api/v1'.
+        """
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return f"http://{host}:{self._server.server_address[1]}/api/v1"
+
+    def stop(self) -> None:
+        """Stop the server."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def reset_stats(self) -> None:
+        """Clear the request counters."""
+        with self._stats_lock:
+            self.stats = {"requests": 0, "throttled": 0, "by_endpoint": {}}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local stand-in Syncro API server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--api-key", default=None, help="Require this bearer token.")
+    parser.add_argument("--customers", type=int, default=20)
+    parser.add_argument("--contacts-per-customer", type=int, default=3)
+    parser.add_argument("--tickets-per-customer", type=int, default=10)
+    parser.add_argument("--comments-per-ticket", type=int, default=3)
+    parser.add_argument("--empty", action="store_true", help="Start with an empty tenant (e.g. a destination).")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response.")
+    parser.add_argument("--rate-limit", type=int, default=None, help="Requests per minute before 429s.")
+    parser.add_argument("--per-page", type=int, default=25)
+    parser.add_argument("--seed-dir", default=None, help="Load records from synthetic_tenant.py seed files instead.")
+    args = parser.parse_args()
+
+    if args.seed_dir:
+        from synthetic_tenant import load_seed_files
+        seed_data = load_seed_files(args.seed_dir)
+    else:
+        seed_data = {} if args.empty else build_seed(args.customers, args.contacts_per_customer,
+                                                     args.tickets_per_customer, args.comments_per_ticket)
+    mock_server = MockSyncroServer(MockSyncroTenant(seed_data, per_page=args.per_page), api_key=args.api_key,
+                                   latency=args.latency, rate_limit_requests=args.rate_limit)
+    print(f"Mock Syncro API at {mock_server.start(args.host, args.port)}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        mock_server.stop()
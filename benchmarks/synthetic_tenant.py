@@ -0,0 +1,434 @@
+import argparse
+import bisect
+import csv
+import json
+import os
+import random
+import statistics
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List
+
+'''
+Deterministic synthetic tenant generator for scale testing.
+
+Builds tenant-shaped datasets (customers, contacts, techs, tickets with comment
+threads) at any scale from a seed. Subjects, conversation threads and their
+pacing are sampled from the 'Test Data CSV' files; duplicate tickets and
+contacts and name variants (case, spacing, "Last, First", "Inc." vs "Inc")
+are injected at configurable rates to exercise the matching and dedupe paths.
+
+Tickets are generated and written one at a time, so millions of tickets can be
+produced without holding them in memory. Output goes to:
+    - tickets.csv / ticket_comments.csv in the importer format (syncro_get_all_tickets_from_csv)
+    - customers.jsonl / contacts.jsonl / users.jsonl / tickets.jsonl seed files for
+      mock_syncro_server.py (--seed-dir)
+
+    python benchmarks/synthetic_tenant.py --tickets 1000000 --customers 5000 --out-dir synthetic_1m
+'''
+
+CSV_DIR = os.path.join(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')), "Test Data CSV")
+DEFAULT_PROFILE_CSV = os.path.join(CSV_DIR, "Thousand_Helpdesk_Tickets(1).csv")
+CSV_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+START_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+TICKET_CSV_FIELDS = ["ticket customer", "ticket number", "ticket subject", "tech", "ticket initial issue",
+                     "ticket status", "ticket issue type", "ticket created", "ticket contact", "ticket priority"]
+COMMENT_CSV_FIELDS = ["ticket customer", "ticket number", "ticket subject", "ticket comment",
+                      "comment contact", "comment created"]
+SEED_RESOURCES = ("customers", "contacts", "users", "tickets")
+
+# Historical tickets are mostly closed out
+STATUS_WEIGHTS = {"Resolved": 80, "In Progress": 8, "Waiting on Customer": 5, "New": 4, "Scheduled": 3}
+PRIORITIES = {"Normal": 60, "Low": 20, "High": 15, "Urgent": 5}
+PROBLEM_TYPE_KEYWORDS = {"printer": "Printer", "email": "Email", "internet": "Network", "vpn": "Network",
+                         "boot": "Hardware", "disk": "Hardware", "password": "Software", "antivirus": "Software",
+                         "software": "Software", "onboarding": "Other"}
+
+FIRST_NAMES = ["James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+               "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Carlos", "Karen",
+               "Daniel", "Nancy", "Matthew", "Lisa", "Anthony", "Sandra", "Mark", "Ashley", "Steven", "Emily"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+              "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+              "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson"]
+COMPANY_WORDS = ["Acme", "Summit", "Harbor", "Pinnacle", "Cedar", "Northwind", "Bluebird", "Granite", "Riverside",
+                 "Lakeside", "Keystone", "Beacon", "Evergreen", "Silverline", "Redwood", "Ironclad", "Oakmont",
+                 "Brightway", "Sterling", "Frontier"]
+COMPANY_KINDS = ["Dental", "Law Group", "Accounting", "Construction", "Medical", "Realty", "Logistics", "Insurance",
+                 "Consulting", "Manufacturing", "Veterinary", "Architects"]
+COMPANY_SUFFIXES = ["LLC", "Inc.", "Co.", "Group", "Partners", "Ltd."]
+
+
+def load_csv_profile(csv_path: str = DEFAULT_PROFILE_CSV) -> Dict[str, Any]:
+    """
+    Derive subject weights, conversation threads and pacing from a 'Test Data CSV' export.
+
+    Args:
+        csv_path (str): Path to a CSV with Ticket Number, Ticket Title, Timestamp,
+            Conversation Step, User Message and Tech Message columns.
+
+    Returns:
+        Dict[str, Any]: {'titles': {title: weight}, 'threads': {title: [thread, ...]},
+            'step_minutes': float, 'ticket_gap_minutes': float}, where a thread is a list of
+            (conversation step, message) pairs.
+    """
+    tickets = defaultdict(list)
+    with open(csv_path, mode="r", encoding="utf-8") as csvfile:
+        for row in csv.DictReader(csvfile):
+            tickets[row["Ticket Number"]].append(row)
+
+    titles = defaultdict(int)
+    threads = defaultdict(set)
+    step_gaps, ticket_starts = [], []
+    for rows in tickets.values():
+        title = rows[0]["Ticket Title"]
+        titles[title] += 1
+        threads[title].add(tuple(
+            (row["Conversation Step"], row["User Message"] or row["Tech Message"]) for row in rows
+        ))
+        times = [datetime.strptime(row["Timestamp"], CSV_TIMESTAMP_FORMAT) for row in rows]
+        ticket_starts.append(times[0])
+        step_gaps.extend((later - earlier).total_seconds() / 60 for earlier, later in zip(times, times[1:]))
+
+    ticket_starts.sort()
+    ticket_gaps = [(later - earlier).total_seconds() / 60 for earlier, later in zip(ticket_starts, ticket_starts[1:])]
+    return {
+        "titles": dict(titles),
+        # Sorted so the profile, and therefore the output, doesn't depend on set ordering
+        "threads": {title: sorted(thread_set) for title, thread_set in threads.items()},
+        "step_minutes": statistics.median(step_gaps) if step_gaps else 5,
+        "ticket_gap_minutes": statistics.median(ticket_gaps) if ticket_gaps else 10,
+    }
+
+
+def _timestamp(moment: datetime) -> str:
+    return moment.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _problem_type(title: str) -> str:
+    lowered = title.lower()
+    for keyword, problem_type in PROBLEM_TYPE_KEYWORDS.items():
+        if keyword in lowered:
+            return problem_type
+    return "Other"
+
+
+def _cumulative(weighted: Dict[str, float]):
+    names = sorted(weighted)
+    cum_weights, total = [], 0
+    for name in names:
+        total += weighted[name]
+        cum_weights.append(total)
+    return cum_weights, names
+
+
+def name_variant(name: str, rng: random.Random, person: bool = False) -> str:
+    """
+    Return a spelling variant of a customer or contact name, as found in real exports.
+
+    Args:
+        name (str): The canonical name.
+        rng (random.Random): Random source.
+        person (bool): True for contact names, which also get "Last, First" and initial variants.
+
+    Returns:
+        str: The variant.
+    """
+    variants = [name.lower(), name.upper(), f" {name} ", name.replace(" ", "  ", 1)]
+    parts = name.split()
+    if person and len(parts) >= 2:
+        first, last = parts[0], " ".join(parts[1:])
+        variants += [f"{last}, {first}", f"{first[0]}. {last}"]
+    if not person:
+        variants += [name.replace(".", ""), name.replace(" LLC", ", LLC")]
+    return rng.choice(variants)
+
+
+class SyntheticTenant:
+    """
+    Seeded generator for one synthetic tenant.
+
+    The same arguments always produce the same records. Customers, contacts and techs
+    are built up front; tickets are produced lazily by iter_tickets().
+
+    Args:
+        tickets (int): Number of unique tickets.
+        customers (int): Number of customers.
+        contacts_per_customer (int): Average contacts per customer.
+        techs (int): Number of techs (users).
+        seed (int): Random seed.
+        profile (Dict[str, Any]): Distributions from load_csv_profile().
+        duplicate_ticket_rate (float): Share of tickets that appear twice in the importer CSV.
+        duplicate_contact_rate (float): Share of contacts that exist twice in the tenant under a name variant.
+        name_variant_rate (float): Share of tickets whose customer/contact name is a spelling variant.
+        comments_scale (float): Multiplier applied to the number of comments per thread.
+    """
+
+    def __init__(self, tickets: int = 1000, customers: int = 50, contacts_per_customer: int = 3, techs: int = 10,
+                 seed: int = 0, profile: Dict[str, Any] = None, duplicate_ticket_rate: float = 0.02,
+                 duplicate_contact_rate: float = 0.05, name_variant_rate: float = 0.1, comments_scale: float = 1.0):
+        self.ticket_count = tickets
+        self.seed = seed
+        self.profile = profile or load_csv_profile()
+        self.duplicate_ticket_rate = duplicate_ticket_rate
+        self.duplicate_contact_rate = duplicate_contact_rate
+        self.name_variant_rate = name_variant_rate
+        self.comments_scale = comments_scale
+
+        rng = random.Random(f"{seed}:directory")
+        self.users = [{"id": tech_id, "name": self._person_name(rng), "email": f"tech{tech_id}@msp.example.com"}
+                      for tech_id in range(1, techs + 1)]
+        for user in self.users:
+            user["full_name"] = user["name"]
+
+        self.customers = []
+        self.contacts = []
+        self.contacts_by_customer = defaultdict(list)
+        for customer_id in range(1, customers + 1):
+            business_name = (f"{rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_KINDS)} "
+                             f"{customer_id} {rng.choice(COMPANY_SUFFIXES)}")
+            self.customers.append({
+                "id": customer_id,
+                "business_name": business_name,
+                "updated_at": _timestamp(START_TIME + timedelta(hours=customer_id)),
+            })
+            for _ in range(max(1, round(rng.gauss(contacts_per_customer, contacts_per_customer / 3)))):
+                self._add_contact(rng, customer_id, self._person_name(rng))
+                if rng.random() < duplicate_contact_rate:
+                    # Same person entered twice, e.g. by different techs
+                    self._add_contact(rng, customer_id, name_variant(self.contacts[-1]["name"], rng, person=True),
+                                      email=self.contacts[-1]["email"])
+
+        # A few customers raise most tickets
+        weights = [1 / (rank + 1) ** 0.8 for rank in range(customers)]
+        rng.shuffle(weights)
+        total = 0.0
+        self._customer_weights = ([], self.customers)
+        for weight in weights:
+            total += weight
+            self._customer_weights[0].append(total)
+
+        self._titles = _cumulative(self.profile["titles"])
+        self._statuses = _cumulative(STATUS_WEIGHTS)
+        self._priorities = _cumulative(PRIORITIES)
+
+    @staticmethod
+    def _person_name(rng: random.Random) -> str:
+        return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+    def _add_contact(self, rng: random.Random, customer_id: int, name: str, email: str = None) -> None:
+        contact_id = len(self.contacts) + 1
+        contact = {
+            "id": contact_id,
+            "customer_id": customer_id,
+            "name": name,
+            "email": email or f"{name.lower().replace(' ', '.')}.{contact_id}@example.com",
+            "updated_at": _timestamp(START_TIME + timedelta(hours=customer_id, minutes=rng.randint(0, 59))),
+        }
+        self.contacts.append(contact)
+        self.contacts_by_customer[customer_id].append(contact)
+
+    def _pick(self, rng: random.Random, cum_weights: List[float], items: List[Any]):
+        return items[bisect.bisect_right(cum_weights, rng.random() * cum_weights[-1])]
+
+    def iter_tickets(self) -> Iterator[Dict[str, Any]]:
+        """
+        Generate tickets in Syncro API shape, one at a time.
+
+        Each ticket carries its comment thread under 'comments', the importer-facing
+        name spellings under '_csv' and whether it is repeated in the importer CSV
+        under '_duplicate'. Both underscore keys are stripped from the seed files.
+
+        Yields:
+            Dict[str, Any]: One ticket.
+        """
+        rng = random.Random(f"{self.seed}:tickets")
+        step = timedelta(minutes=self.profile["step_minutes"])
+        gap_minutes = self.profile["ticket_gap_minutes"]
+        created = START_TIME
+        comment_id = 0
+
+        for index in range(self.ticket_count):
+            ticket_id = index + 1
+            number = 1000 + ticket_id
+            created += timedelta(seconds=round(rng.expovariate(1 / gap_minutes) * 60))
+            customer = self._pick(rng, *self._customer_weights)
+            contact = rng.choice(self.contacts_by_customer[customer["id"]])
+            tech = rng.choice(self.users)
+            title = self._pick(rng, *self._titles)
+            thread = rng.choice(self.profile["threads"][title])
+            if self.comments_scale != 1.0:
+                length = max(1, round(len(thread) * self.comments_scale))
+                thread = [thread[i % len(thread)] for i in range(length)]
+
+            comments = []
+            for position, (conversation_step, message) in enumerate(thread):
+                comment_id += 1
+                from_tech = conversation_step == "Tech Response"
+                comments.append({
+                    "id": comment_id,
+                    "subject": conversation_step,
+                    "body": message,
+                    "tech": tech["name"] if from_tech else contact["name"],
+                    "hidden": False,
+                    "do_not_email": True,
+                    "created_at": _timestamp(created + step * position),
+                })
+
+            status = self._pick(rng, *self._statuses)
+            updated = created + step * len(thread)
+            variant = rng.random() < self.name_variant_rate
+            yield {
+                "id": ticket_id,
+                "number": number,
+                "subject": title,
+                "customer_id": customer["id"],
+                "customer_business_then_name": customer["business_name"],
+                "contact_id": contact["id"],
+                "user_id": tech["id"],
+                "status": status,
+                "problem_type": _problem_type(title),
+                "priority": self._pick(rng, *self._priorities),
+                "created_at": _timestamp(created),
+                "updated_at": _timestamp(updated),
+                "resolved_at": _timestamp(updated) if status == "Resolved" else None,
+                "comments": comments,
+                "_csv": {
+                    "customer": name_variant(customer["business_name"], rng) if variant else customer["business_name"],
+                    "contact": name_variant(contact["name"], rng, person=True) if variant else contact["name"],
+                    "tech": tech["name"],
+                },
+                "_duplicate": rng.random() < self.duplicate_ticket_rate,
+            }
+
+def ticket_to_csv_rows(ticket: Dict[str, Any]):
+    """
+    Convert a generated ticket into importer CSV rows.
+
+    The first comment of the thread becomes 'ticket initial issue'; the rest become comment rows.
+
+    Returns:
+        tuple: (ticket row dict, list of comment row dicts).
+    """
+    names = ticket["_csv"]
+    created = datetime.fromisoformat(ticket["created_at"].replace("Z", "+00:00"))
+    first, *rest = ticket["comments"]
+    ticket_row = {
+        "ticket customer": names["customer"],
+        "ticket number": f"T-{ticket['number']}",
+        "ticket subject": ticket["subject"],
+        "tech": names["tech"],
+        "ticket initial issue": first["body"],
+        "ticket status": ticket["status"],
+        "ticket issue type": ticket["problem_type"],
+        "ticket created": created.strftime(CSV_TIMESTAMP_FORMAT),
+        "ticket contact": names["contact"],
+        "ticket priority": ticket["priority"],
+    }
+    comment_rows = [{
+        "ticket customer": names["customer"],
+        "ticket number": f"T-{ticket['number']}",
+        "ticket subject": ticket["subject"],
+        "ticket comment": comment["body"],
+        "comment contact": comment["tech"],
+        "comment created": datetime.fromisoformat(comment["created_at"].replace("Z", "+00:00")).strftime(CSV_TIMESTAMP_FORMAT),
+    } for comment in rest]
+    return ticket_row, comment_rows
+
+
+def write_tenant(tenant: SyntheticTenant, out_dir: str, write_csv: bool = True, write_seed: bool = True) -> Dict[str, int]:
+    """
+    Write a synthetic tenant to importer CSVs and/or mock seed files in a single pass.
+
+    Args:
+        tenant (SyntheticTenant): The generator.
+        out_dir (str): Output directory (created if needed).
+        write_csv (bool): Write tickets.csv and ticket_comments.csv.
+        write_seed (bool): Write <resource>.jsonl seed files.
+
+    Returns:
+        Dict[str, int]: Counts of written records.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    counts = {"customers": len(tenant.customers), "contacts": len(tenant.contacts), "users": len(tenant.users),
+              "tickets": 0, "comments": 0, "csv_ticket_rows": 0, "csv_comment_rows": 0}
+
+    if write_seed:
+        for resource in ("customers", "contacts", "users"):
+            with open(os.path.join(out_dir, f"{resource}.jsonl"), "w", encoding="utf-8") as f:
+                for record in getattr(tenant, resource):
+                    f.write(json.dumps(record) + "\n")
+
+    files = []
+    try:
+        if write_csv:
+            tickets_file = open(os.path.join(out_dir, "tickets.csv"), "w", newline="", encoding="utf-8")
+            comments_file = open(os.path.join(out_dir, "ticket_comments.csv"), "w", newline="", encoding="utf-8")
+            files += [tickets_file, comments_file]
+            ticket_writer = csv.DictWriter(tickets_file, fieldnames=TICKET_CSV_FIELDS)
+            comment_writer = csv.DictWriter(comments_file, fieldnames=COMMENT_CSV_FIELDS)
+            ticket_writer.writeheader()
+            comment_writer.writeheader()
+        if write_seed:
+            seed_file = open(os.path.join(out_dir, "tickets.jsonl"), "w", encoding="utf-8")
+            files.append(seed_file)
+
+        for ticket in tenant.iter_tickets():
+            counts["tickets"] += 1
+            counts["comments"] += len(ticket["comments"])
+            if write_csv:
+                ticket_row, comment_rows = ticket_to_csv_rows(ticket)
+                repeats = 2 if ticket["_duplicate"] else 1
+                for _ in range(repeats):
+                    ticket_writer.writerow(ticket_row)
+                    comment_writer.writerows(comment_rows)
+                counts["csv_ticket_rows"] += repeats
+                counts["csv_comment_rows"] += repeats * len(comment_rows)
+            if write_seed:
+                record = {key: value for key, value in ticket.items() if not key.startswith("_")}
+                seed_file.write(json.dumps(record) + "\n")
+    finally:
+        for f in files:
+            f.close()
+
+    return counts
+
+
+def load_seed_files(seed_dir: str) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Load <resource>.jsonl seed files written by write_tenant.
+
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: Records keyed by resource, as accepted by MockSyncroTenant.
+    """
+    seed_data = {}
+    for resource in SEED_RESOURCES:
+        path = os.path.join(seed_dir, f"{resource}.jsonl")
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                seed_data[resource] = [json.loads(line) for line in f if line.strip()]
+    return seed_data
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic Syncro tenant.")
+    parser.add_argument("--tickets", type=int, default=1000)
+    parser.add_argument("--customers", type=int, default=50)
+    parser.add_argument("--contacts-per-customer", type=int, default=3)
+    parser.add_argument("--techs", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--profile-csv", default=DEFAULT_PROFILE_CSV, help="CSV the distributions are modeled on.")
+    parser.add_argument("--duplicate-ticket-rate", type=float, default=0.02)
+    parser.add_argument("--duplicate-contact-rate", type=float, default=0.05)
+    parser.add_argument("--name-variant-rate", type=float, default=0.1)
+    parser.add_argument("--comments-scale", type=float, default=1.0, help="Multiplier for comments per ticket.")
+    parser.add_argument("--format", choices=["csv", "seed", "both"], default="both")
+    parser.add_argument("--out-dir", default="synthetic_tenant")
+    args = parser.parse_args()
+
+    tenant = SyntheticTenant(args.tickets, args.customers, args.contacts_per_customer, args.techs, args.seed,
+                             load_csv_profile(args.profile_csv), args.duplicate_ticket_rate,
+                             args.duplicate_contact_rate, args.name_variant_rate, args.comments_scale)
+    counts = write_tenant(tenant, args.out_dir, write_csv=args.format in ("csv", "both"),
+                          write_seed=args.format in ("seed", "both"))
+    print(json.dumps(counts, indent=2))
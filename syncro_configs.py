@@ -1,49 +1,195 @@
 import os
+import atexit
 import logging
+import queue
+import reprlib
+import threading
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 
 # syncro_configs.py
 SYNCRO_TIMEZONE = "America/New_York"
 TICKETS_CSV_PATH = "tickets.csv"
 COMMENTS_CSV_PATH = "ticket_comments.csv"
 TEMP_FILE_PATH = "syncro_temp_data.json"
+WATERMARKS_PATH = "syncro_watermarks.json"
+CONTACT_MAP_PATH = "syncro_contact_map.json"
+IDEMPOTENCY_PATH = os.environ.get("SYNCRO_IDEMPOTENCY_PATH", "syncro_idempotency.jsonl")
+DEAD_LETTER_PATH = os.environ.get("SYNCRO_DEAD_LETTER_PATH", "syncro_dead_letters.jsonl")
+
+# Source tenant snapshot archive: directory, and size at which a new segment file is started
+SNAPSHOT_DIR = "syncro_snapshot"
+SNAPSHOT_SEGMENT_BYTES = 64 * 1024 * 1024
 
 # Syncro API Configuration
 SYNCRO_SUBDOMAIN = ""
 SYNCRO_API_KEY = ""
 
-SYNCRO_API_BASE_URL = f"https://{SYNCRO_SUBDOMAIN}.syncromsp.com/api/v1"
+SYNCRO_API_BASE_URL = os.environ.get("SYNCRO_API_BASE_URL", f"https://{SYNCRO_SUBDOMAIN}.syncromsp.com/api/v1")
+
+# Delay in seconds after each API call, to stay under the Syncro rate limit
+SYNCRO_API_CALL_DELAY = float(os.environ.get("SYNCRO_API_CALL_DELAY", "0.5"))
+
+# Number of parallel workers used for bulk create stages
+SYNCRO_MAX_WORKERS = 4
+
+# Syncro API requests allowed per tenant per minute (used for the remaining budget and estimates)
+SYNCRO_RATE_LIMIT_PER_MINUTE = int(os.environ.get("SYNCRO_RATE_LIMIT_PER_MINUTE", "180"))
+
+# HTTP retries: attempts after the first, exponential backoff base and cap (seconds), request timeout
+HTTP_MAX_RETRIES = int(os.environ.get("SYNCRO_HTTP_MAX_RETRIES", "5"))
+HTTP_BACKOFF_BASE = 1.0
+HTTP_BACKOFF_MAX = 60.0
+HTTP_TIMEOUT_SECONDS = 60
+
+# Per-tenant circuit breaker: consecutive failed calls before opening, seconds before a trial call
+HTTP_CIRCUIT_FAILURE_THRESHOLD = 5
+HTTP_CIRCUIT_RESET_SECONDS = 30.0
+
+# Adaptive (AIMD) concurrency per tenant: API calls in flight start at SYNCRO_MAX_WORKERS, grow by one per
+# round of healthy responses up to HTTP_CONCURRENCY_MAX, and halve on a 429 or a response slower than
+# HTTP_LATENCY_SPIKE_FACTOR times the usual latency of that endpoint
+HTTP_ADAPTIVE_CONCURRENCY = os.environ.get("SYNCRO_ADAPTIVE_CONCURRENCY", "1") == "1"
+HTTP_CONCURRENCY_MAX = int(os.environ.get("SYNCRO_HTTP_CONCURRENCY_MAX", "16"))
+HTTP_LATENCY_SPIKE_FACTOR = 3.0
+
+# Worker pool size of the bulk stages; with adaptive concurrency the pools are sized for the ceiling
+# and the per-tenant limiter decides how many of their calls are in flight
+SYNCRO_POOL_WORKERS = HTTP_CONCURRENCY_MAX if HTTP_ADAPTIVE_CONCURRENCY else SYNCRO_MAX_WORKERS
+
+# Ticket diff configuration
+# With DIFF_EXTERNAL_SORT enabled, tickets are compared through sorted run files on disk
+# holding at most DIFF_MAX_RECORDS_IN_MEMORY records in memory at a time.
+DIFF_EXTERNAL_SORT = False
+DIFF_MAX_RECORDS_IN_MEMORY = 100_000
+# Sorted runs merged at once; more runs are first merged into larger runs, this many at a time,
+# so the number of open files stays bounded
+DIFF_MAX_MERGE_FAN_IN = 64
+DIFF_WORK_DIR = None  # Temporary directory when None
+
+# Webhook receiver configuration (continuous sync mode)
+WEBHOOK_HOST = "127.0.0.1"
+WEBHOOK_PORT = 8765
+WEBHOOK_COALESCE_SECONDS = 5
+WEBHOOK_BACKSTOP_MINUTES = 60
 
 # Logging Configuration
 LOG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "logs"))
 os.makedirs(LOG_DIR, exist_ok=True)
 
-def get_logger(name):
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
+# INFO logs summaries with truncated payloads; DEBUG adds full payload dumps
+LOG_LEVEL = os.environ.get("SYNCRO_LOG_LEVEL", "INFO").upper()
+LOG_PAYLOAD_MAX_CHARS = int(os.environ.get("SYNCRO_LOG_PAYLOAD_MAX_CHARS", "500"))
+
+# Progress reporting: seconds between updates and the machine-readable status file
+PROGRESS_INTERVAL_SECONDS = float(os.environ.get("SYNCRO_PROGRESS_INTERVAL", "2"))
+PROGRESS_STATUS_PATH = os.path.join(LOG_DIR, "status.json")
+
+# One log file per run, shared by every module
+RUN_LOG_FILE = os.path.join(LOG_DIR, f"app_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
+
+
+
+class _DeferredFormatQueueHandler(QueueHandler):
+    """
+    QueueHandler that enqueues records as they are, with their args intact.
+
+    The stock prepare() formats the message in the logging thread; here the
+    listener's formatter renders it (including LogPayload) in the background
+    thread, so the calling thread only pays for creating the record. Payloads
+    logged this way should not be mutated afterwards.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
 
-    # Create a new log file with the current date and time
-    log_file_name = f"app_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-    log_file_path = os.path.join(LOG_DIR, log_file_name)
 
-    # File handler with UTF-8 encoding
-    file_handler = logging.FileHandler(log_file_path, encoding="utf-8")
-    file_handler.setLevel(logging.INFO)
+_log_queue = queue.SimpleQueue()
+_queue_handler = _DeferredFormatQueueHandler(_log_queue)
+_log_listener = None
+_log_listener_lock = threading.Lock()
 
-    # Log format
-    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-    file_handler.setFormatter(formatter)
+
+def _start_log_listener():
+    """Start the background thread that writes queued log records to the run log file."""
+    global _log_listener
+    with _log_listener_lock:
+        if _log_listener is not None:
+            return
+
+        # File handler with UTF-8 encoding
+        file_handler = logging.FileHandler(RUN_LOG_FILE, encoding="utf-8")
+        file_handler.setLevel(LOG_LEVEL)
+
+        # Log format
+        formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+        file_handler.setFormatter(formatter)
+
+        _log_listener = QueueListener(_log_queue, file_handler, respect_handler_level=True)
+        _log_listener.start()
+        atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Flush queued log records and stop the background log writer."""
+    global _log_listener
+    with _log_listener_lock:
+        if _log_listener is not None:
+            _log_listener.stop()
+            for handler in _log_listener.handlers:
+                handler.close()
+            _log_listener = None
+
+
+def get_logger(name):
+    logger = logging.getLogger(name)
+    logger.setLevel(LOG_LEVEL)
+
+    # Records are queued here and written to RUN_LOG_FILE by a background thread
+    _start_log_listener()
 
     # Remove other handlers to prevent duplicate logs
     if logger.hasHandlers():
         logger.handlers.clear()
 
-    logger.addHandler(file_handler)
+    logger.addHandler(_queue_handler)
 
     # Prevent logs from propagating to the root logger
     logger.propagate = False
 
     return logger
 
+
+_payload_repr = reprlib.Repr()
+_payload_repr.maxlevel = 3
+_payload_repr.maxdict = 10
+_payload_repr.maxlist = 10
+_payload_repr.maxstring = 120
+_payload_repr.maxother = 120
+
+
+class LogPayload:
+    """
+    Size-capped, lazily rendered view of a payload for log messages.
+
+    Use with %-style arguments, e.g. logger.info("Payload: %s", LogPayload(payload)),
+    so nothing is rendered unless the record is emitted, and rendering is bounded
+    no matter how large the payload is. Log the payload itself at DEBUG for a full dump.
+    """
+
+    __slots__ = ("payload", "max_chars")
+
+    def __init__(self, payload, max_chars: int = LOG_PAYLOAD_MAX_CHARS):
+        self.payload = payload
+        self.max_chars = max_chars
+
+    def __str__(self) -> str:
+        text = _payload_repr.repr(self.payload)
+        if len(text) > self.max_chars:
+            text = text[:self.max_chars] + "..."
+        if isinstance(self.payload, (list, tuple, set, dict)):
+            text += f" ({len(self.payload)} items)"
+        return text
+
 # Reset root logger to prevent console logging
 logging.getLogger().handlers.clear()
@@ -0,0 +1,167 @@
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+from syncro_configs import get_logger, DEAD_LETTER_PATH, SYNCRO_POOL_WORKERS
+
+'''
+Dead-letter store for records that failed to migrate or import.
+
+Failure paths call dead_letter() with the record's payload, the error and the
+context needed to retry it (e.g. the destination customer ID). Entries are
+appended to a JSONL file; a later replay retries only the pending entries,
+concurrently, and marks each one resolved or failed again.
+
+While a replay handler runs, failures it reports through dead_letter() are
+attached to the entry being replayed instead of creating a new one.
+'''
+
+logger = get_logger(__name__)
+
+_replaying: ContextVar = ContextVar("syncro_dead_letter_replay", default=None)
+
+
+class DeadLetterStore:
+    """
+    Append-only JSONL store of failed records; the last line per entry ID is its current state.
+
+    Args:
+        path (str): The JSONL file.
+    """
+
+    def __init__(self, path: str = DEAD_LETTER_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Partly written last line
+                    self._entries[entry["id"]] = entry
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[entry["id"]] = entry
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+
+    def add(self, kind: str, payload: Any, error: str, context: Dict[str, Any] = None) -> str:
+        """
+        Save a failed record.
+
+        Args:
+            kind (str): Record type, which selects the replay handler, e.g. 'ticket'.
+            payload (Any): The record as it was being written.
+            error (str): The error message.
+            context (Dict[str, Any]): Anything else the replay needs.
+
+        Returns:
+            str: The entry ID.
+        """
+        entry = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "state": "pending",
+            "payload": payload,
+            "context": context or {},
+            "error": error,
+            "attempts": 1,
+            "failed_at": datetime.now(timezone.utc).isoformat(),
+        }
+        self._append(entry)
+        return entry["id"]
+
+    def pending(self, kinds: List[str] = None) -> List[Dict[str, Any]]:
+        """Get the unresolved entries, optionally only of the given kinds."""
+        with self._lock:
+            return [entry for entry in self._entries.values()
+                    if entry["state"] == "pending" and (kinds is None or entry["kind"] in kinds)]
+
+    def resolve(self, entry: Dict[str, Any]) -> None:
+        """Mark an entry as successfully replayed."""
+        self._append(dict(entry, state="resolved", resolved_at=datetime.now(timezone.utc).isoformat()))
+
+    def fail_again(self, entry: Dict[str, Any], error: str) -> None:
+        """Record another failed attempt of an entry."""
+        self._append(dict(entry, error=error, attempts=entry["attempts"] + 1,
+                          failed_at=datetime.now(timezone.utc).isoformat()))
+
+    def replay(self, handlers: Dict[str, Callable[[Dict[str, Any]], Any]], max_workers: int = SYNCRO_POOL_WORKERS) -> Dict[str, int]:
+        """
+        Retry the pending entries that have a handler, concurrently.
+
+        A handler gets the entry and retries it through the normal write path. The entry
+        is resolved unless the handler raises or reports a failure through dead_letter().
+
+        Args:
+            handlers (Dict[str, Callable]): Entry kind to replay function.
+            max_workers (int): Entries replayed at the same time.
+
+        Returns:
+            Dict[str, int]: Counts of 'resolved', 'failed' and 'skipped' (no handler) entries.
+        """
+        entries = self.pending(list(handlers))
+        summary = {"resolved": 0, "failed": 0, "skipped": len(self.pending()) - len(entries)}
+        logger.info(f"Replaying {len(entries)} dead letters with {max_workers} workers "
+                    f"({summary['skipped']} pending entries have no handler)")
+
+        def replay_entry(entry: Dict[str, Any]):
+            failures: List[str] = []
+            token = _replaying.set(failures)
+            try:
+                handlers[entry["kind"]](entry)
+            except Exception as e:
+                failures.append(f"{type(e).__name__}: {e}")
+            finally:
+                _replaying.reset(token)
+            return failures
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(replay_entry, entry): entry for entry in entries}
+            for future in as_completed(futures):
+                entry, failures = futures[future], future.result()
+                if failures:
+                    self.fail_again(entry, "; ".join(failures))
+                    summary["failed"] += 1
+                    logger.warning(f"Dead letter {entry['id']} ({entry['kind']}) failed again: {failures[-1]}")
+                else:
+                    self.resolve(entry)
+                    summary["resolved"] += 1
+
+        logger.info(f"Dead letter replay: {summary}")
+        return summary
+
+
+_store = None  # Global store, opened on first use
+_store_lock = threading.Lock()
+
+
+def get_dead_letter_store() -> DeadLetterStore:
+    """Get the process-wide dead-letter store at DEAD_LETTER_PATH."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = DeadLetterStore()
+        return _store
+
+
+def dead_letter(kind: str, payload: Any, error, **context) -> None:
+    """
+    Save a failed record to the process-wide dead-letter store (see DeadLetterStore.add).
+
+    During a replay, the failure is attached to the entry being replayed instead.
+    """
+    failures = _replaying.get()
+    if failures is not None:
+        failures.append(str(error))
+        return
+    entry_id = get_dead_letter_store().add(kind, payload, str(error), context)
+    logger.info(f"Saved failed {kind} as dead letter {entry_id}")
@@ -0,0 +1,272 @@
+import hashlib
+import heapq
+import json
+import os
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, List
+
+from syncro_configs import get_logger, DIFF_MAX_RECORDS_IN_MEMORY, DIFF_MAX_MERGE_FAN_IN
+
+'''
+External-sort diff engine for comparing tenants that are too large to hold in memory.
+
+Each tenant's projected tickets are hashed on their comparison key, written to
+sorted run files of at most DIFF_MAX_RECORDS_IN_MEMORY records, and the runs
+are merge-joined (at most DIFF_MAX_MERGE_FAN_IN at a time). Results are streamed to to_create / already_present / changed
+JSONL files, so memory use is capped by the run size rather than by tenant size.
+'''
+
+logger = get_logger(__name__)
+
+
+def ticket_compare_key(ticket: Dict[str, Any]) -> str:
+    """
+    Hash the (subject, customer_business) comparison key of a projected ticket.
+
+    Args:
+        ticket (Dict[str, Any]): A projected ticket.
+
+    Returns:
+        str: Hex SHA-1 digest of the comparison key.
+    """
+    key = json.dumps([ticket.get("subject"), ticket.get("customer_business")], default=str)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def iter_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream records from a JSONL file.
+
+    Args:
+        path (str): Path to the JSONL file.
+
+    Yields:
+        Dict[str, Any]: One record per line.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _write_run(records: List[Dict[str, Any]], work_dir: str, name: str, run_number: int) -> str:
+    records.sort(key=lambda record: record["key"])
+    run_path = os.path.join(work_dir, f"{name}_run_{run_number:05d}.jsonl")
+    with open(run_path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, default=str))
+            f.write("\n")
+    return run_path
+
+
+def sort_to_runs(records: Iterable[Dict[str, Any]], work_dir: str, name: str,
+                 max_records_in_memory: int = DIFF_MAX_RECORDS_IN_MEMORY) -> List[str]:
+    """
+    Tag each record with its comparison key and write them to sorted run files.
+
+    Args:
+        records (Iterable[Dict[str, Any]]): Projected tickets, typically streamed page by page.
+        work_dir (str): Directory for the run files.
+        name (str): Prefix for the run files (e.g. 'source', 'dest').
+        max_records_in_memory (int): Maximum number of records buffered before a run is written.
+
+    Returns:
+        List[str]: Paths of the sorted run files.
+    """
+    run_paths = []
+    buffer = []
+    total = 0
+
+    for record in records:
+        buffer.append(dict(record, key=ticket_compare_key(record)))
+        total += 1
+        if len(buffer) >= max_records_in_memory:
+            run_paths.append(_write_run(buffer, work_dir, name, len(run_paths)))
+            buffer = []
+
+    if buffer or not run_paths:
+        run_paths.append(_write_run(buffer, work_dir, name, len(run_paths)))
+
+    logger.info(f"Wrote {total} {name} records to {len(run_paths)} sorted runs.")
+    return run_paths
+
+
+def merge_runs(run_paths: List[str], work_dir: str, name: str,
+               max_fan_in: int = DIFF_MAX_MERGE_FAN_IN) -> List[str]:
+    """
+    Merge sorted runs into larger sorted runs until at most max_fan_in are left,
+    so no merge opens more than max_fan_in files at once.
+
+    Merged input runs are deleted.
+
+    Args:
+        run_paths (List[str]): Sorted run files.
+        work_dir (str): Directory for the merged run files.
+        name (str): Prefix of the runs (e.g. 'source', 'dest').
+        max_fan_in (int): Maximum number of runs merged at once (at least 2).
+
+    Returns:
+        List[str]: Paths of the remaining sorted run files.
+    """
+    max_fan_in = max(max_fan_in, 2)
+    merge_pass = 0
+    while len(run_paths) > max_fan_in:
+        merged_paths = []
+        for batch_start in range(0, len(run_paths), max_fan_in):
+            batch = run_paths[batch_start:batch_start + max_fan_in]
+            if len(batch) == 1:
+                merged_paths.append(batch[0])
+                continue
+            merged_path = os.path.join(work_dir, f"{name}_merge_{merge_pass:02d}_{len(merged_paths):05d}.jsonl")
+            with open(merged_path, "w", encoding="utf-8") as f:
+                for record in _merge(batch):
+                    f.write(json.dumps(record, default=str))
+                    f.write("\n")
+            for path in batch:
+                os.remove(path)
+            merged_paths.append(merged_path)
+        logger.info(f"Merged {len(run_paths)} {name} runs into {len(merged_paths)}.")
+        run_paths = merged_paths
+        merge_pass += 1
+    return run_paths
+
+
+def _merge(run_paths: List[str]) -> Iterator[Dict[str, Any]]:
+    return heapq.merge(*(iter_jsonl(path) for path in run_paths), key=lambda record: record["key"])
+
+
+def _iter_groups(run_paths: List[str]) -> Iterator[tuple]:
+    """Merge sorted runs and yield (key, [records]) groups in key order."""
+    merged = _merge(run_paths)
+    group_key = None
+    group = []
+    for record in merged:
+        if record["key"] != group_key:
+            if group:
+                yield group_key, group
+            group_key, group = record["key"], []
+        group.append(record)
+    if group:
+        yield group_key, group
+
+
+def merge_join(source_runs: List[str], dest_runs: List[str]) -> Iterator[tuple]:
+    """
+    Merge-join sorted source and destination runs on the comparison key.
+
+    Args:
+        source_runs (List[str]): Sorted run files of the source tenant.
+        dest_runs (List[str]): Sorted run files of the destination tenant.
+
+    Yields:
+        tuple: (status, source record, destination record) where status is 'to_create'
+               (destination record is None), 'already_present' or 'changed'.
+    """
+    dest_groups = _iter_groups(dest_runs)
+    dest_key, dest_group = next(dest_groups, (None, []))
+
+    for source_key, source_group in _iter_groups(source_runs):
+        while dest_key is not None and dest_key < source_key:
+            dest_key, dest_group = next(dest_groups, (None, []))
+
+        matches = dest_group if dest_key == source_key else []
+        for source_record in source_group:
+            if not matches:
+                yield "to_create", source_record, None
+                continue
+            same_content = next((d for d in matches if d.get("content_hash") == source_record.get("content_hash")), None)
+            if same_content is not None:
+                yield "already_present", source_record, same_content
+            else:
+                yield "changed", source_record, matches[0]
+
+
+def diff_sorted_runs(source_runs: List[str], dest_runs: List[str], work_dir: str,
+                     max_fan_in: int = DIFF_MAX_MERGE_FAN_IN) -> Dict[str, Any]:
+    """
+    Merge-join sorted runs and stream the results to JSONL files.
+
+    Args:
+        source_runs (List[str]): Sorted run files of the source tenant.
+        dest_runs (List[str]): Sorted run files of the destination tenant.
+        work_dir (str): Directory for the result files.
+        max_fan_in (int): Maximum number of runs per tenant merged at once (see merge_runs).
+
+    Returns:
+        Dict[str, Any]: Paths of the 'to_create', 'already_present' and 'changed' files, plus 'counts'.
+                        'changed' lines hold {"source": ..., "dest": ...} pairs.
+    """
+    source_runs = merge_runs(source_runs, work_dir, "source", max_fan_in)
+    dest_runs = merge_runs(dest_runs, work_dir, "dest", max_fan_in)
+    paths = {status: os.path.join(work_dir, f"{status}.jsonl") for status in ("to_create", "already_present", "changed")}
+    counts = {status: 0 for status in paths}
+    outputs = {status: open(path, "w", encoding="utf-8") for status, path in paths.items()}
+
+    try:
+        for status, source_record, dest_record in merge_join(source_runs, dest_runs):
+            record = {"source": source_record, "dest": dest_record} if status == "changed" else source_record
+            outputs[status].write(json.dumps(record, default=str))
+            outputs[status].write("\n")
+            counts[status] += 1
+    finally:
+        for output in outputs.values():
+            output.close()
+
+    logger.info(f"External diff results: {counts}")
+    return dict(paths, counts=counts)
+
+
+def diff_work_dir(work_dir: str = None) -> tuple:
+    """
+    Get the directory for a diff's run and result files.
+
+    Args:
+        work_dir (str): Directory chosen by the caller, or None for a temporary one.
+
+    Returns:
+        tuple: (directory path, the owning tempfile.TemporaryDirectory or None). A temporary directory
+        is removed with all its files when the TemporaryDirectory is cleaned up or released.
+    """
+    if work_dir:
+        os.makedirs(work_dir, exist_ok=True)
+        return work_dir, None
+    temp_dir = tempfile.TemporaryDirectory(prefix="syncro_diff_")
+    return temp_dir.name, temp_dir
+
+
+def iter_diff_result(result: Dict[str, Any], status: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream one result file of an external diff, e.g. 'to_create'.
+
+    Holds on to the result, so a temporary work directory is kept until the stream is done or dropped.
+    """
+    yield from iter_jsonl(result[status])
+
+
+def external_diff(source_records: Iterable[Dict[str, Any]], dest_records: Iterable[Dict[str, Any]],
+                  work_dir: str = None, max_records_in_memory: int = DIFF_MAX_RECORDS_IN_MEMORY) -> Dict[str, Any]:
+    """
+    Diff two streams of projected tickets using on-disk sorted runs.
+
+    Args:
+        source_records (Iterable[Dict[str, Any]]): Projected source tickets.
+        dest_records (Iterable[Dict[str, Any]]): Projected destination tickets.
+        work_dir (str): Directory for run and result files. A temporary directory is used if omitted.
+        max_records_in_memory (int): Maximum number of records buffered per run.
+
+    Returns:
+        Dict[str, Any]: See diff_sorted_runs. With a temporary directory, 'temp_dir' holds it; it is
+        removed once the result is released (or on temp_dir.cleanup()), so read the files before that.
+    """
+    work_dir, temp_dir = diff_work_dir(work_dir)
+    try:
+        source_runs = sort_to_runs(source_records, work_dir, "source", max_records_in_memory)
+        dest_runs = sort_to_runs(dest_records, work_dir, "dest", max_records_in_memory)
+        result = diff_sorted_runs(source_runs, dest_runs, work_dir)
+    except BaseException:
+        if temp_dir:
+            temp_dir.cleanup()
+        raise
+    if temp_dir:
+        result["temp_dir"] = temp_dir
+    return result
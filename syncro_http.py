@@ -0,0 +1,388 @@
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+from syncro_configs import (get_logger, HTTP_MAX_RETRIES, HTTP_BACKOFF_BASE, HTTP_BACKOFF_MAX, HTTP_TIMEOUT_SECONDS,
+                            HTTP_CIRCUIT_FAILURE_THRESHOLD, HTTP_CIRCUIT_RESET_SECONDS, IDEMPOTENCY_PATH, SYNCRO_MAX_WORKERS,
+                            HTTP_ADAPTIVE_CONCURRENCY, HTTP_CONCURRENCY_MAX, HTTP_LATENCY_SPIKE_FACTOR)
+from syncro_metrics import record_api_call, record_api_retry, normalize_endpoint
+from syncro_tracing import record_span
+
+'''
+HTTP layer shared by both syncro_api_call functions.
+
+Every attempt is recorded in the API metrics and the active trace. Retryable
+failures (429, 5xx, network errors) are retried with exponential backoff and
+full jitter, waiting at least as long as a Retry-After header asks. Each tenant
+has a circuit breaker that fails calls fast after repeated failures, so an
+unhealthy tenant is not hammered, and an adaptive concurrency limiter that
+finds the number of calls in flight the tenant sustains without throttling.
+
+GET/PUT/DELETE are retried freely. A POST is only retried when it certainly had
+no effect (429, connection refused) or when the caller passes a recover
+function that looks the record up first; if the earlier attempt did land,
+its result is returned instead of posting again. IdempotencyStore keeps the
+source-to-destination ID map of completed creates, so a retried or rerun
+create is skipped.
+'''
+
+logger = get_logger(__name__)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE", "OPTIONS"}
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling a tenant whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one tenant.
+
+    Closed: calls go through. After failure_threshold consecutive failures it
+    opens and rejects calls for reset_seconds; then one trial call is let
+    through (half-open), which closes it on success or reopens it on failure.
+    """
+
+    def __init__(self, failure_threshold: int = HTTP_CIRCUIT_FAILURE_THRESHOLD, reset_seconds: float = HTTP_CIRCUIT_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """'closed', 'open' or 'half_open'."""
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.reset_seconds else "open"
+
+    def allow(self) -> bool:
+        """Check whether a call may go through now."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+_breakers: Dict[str, CircuitBreaker] = {}  # Global tenant label -> circuit breaker
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(tenant: str) -> CircuitBreaker:
+    """Get the circuit breaker of a tenant, creating it on first use."""
+    with _breakers_lock:
+        breaker = _breakers.get(tenant)
+        if breaker is None:
+            breaker = _breakers[tenant] = CircuitBreaker()
+        return breaker
+
+
+class ConcurrencyLimiter:
+    """
+    AIMD limit on the API calls in flight to one tenant.
+
+    Each healthy response grows the limit by 1/limit, i.e. by one per round of
+    responses, as long as callers are actually using the whole limit. A 429 or
+    a latency spike (a response slower than spike_factor times the usual
+    latency of its endpoint) halves it. Responses to calls sent before the last
+    decrease do not decrease it again, so one burst of 429s halves it once.
+    A 429's Retry-After also holds back every new call to the tenant, not just
+    the retry of the throttled one, so the other workers do not spend the
+    retry window collecting more 429s.
+
+    Args:
+        initial (int): Starting limit.
+        maximum (int): Ceiling of the limit.
+        spike_factor (float): Latency over the endpoint's moving average that counts as a spike.
+    """
+
+    MIN_LATENCY_SAMPLES = 10  # Healthy responses of an endpoint before its spikes are acted on
+    LATENCY_SMOOTHING = 0.1  # Weight of a new response in the endpoint's moving average
+
+    def __init__(self, initial: int = SYNCRO_MAX_WORKERS, maximum: int = HTTP_CONCURRENCY_MAX,
+                 spike_factor: float = HTTP_LATENCY_SPIKE_FACTOR):
+        self.maximum = maximum
+        self.limit = float(min(max(initial, 1), maximum))
+        self.spike_factor = spike_factor
+        self.in_flight = 0
+        self._latency: Dict[str, list] = {}  # endpoint -> [moving average, samples]
+        self._last_decrease = 0.0
+        self._paused_until = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> float:
+        """
+        Wait for a free slot.
+
+        Returns:
+            float: The time the slot was taken, to pass to release().
+        """
+        with self._condition:
+            while True:
+                paused = self._paused_until - time.monotonic()
+                if paused <= 0 and self.in_flight < int(self.limit):
+                    break
+                self._condition.wait(paused if paused > 0 else None)
+            self.in_flight += 1
+            return time.monotonic()
+
+    def release(self, acquired_at: float, endpoint: str, status, duration: float, retry_after: float = None) -> None:
+        """
+        Free a slot and adjust the limit from the response.
+
+        Args:
+            acquired_at (float): The value acquire() returned.
+            endpoint (str): The normalized call, e.g. 'GET /tickets', whose latencies are compared.
+            status: The HTTP status, or 'error' for a network error.
+            duration (float): Seconds the call took.
+            retry_after (float): Seconds a 429 asked to wait (optional).
+        """
+        with self._condition:
+            saturated = self.in_flight >= int(self.limit)
+            self.in_flight -= 1
+            average, samples = self._latency.get(endpoint, [duration, 0])
+            spike = samples >= self.MIN_LATENCY_SAMPLES and duration > self.spike_factor * average
+
+            if status == 429 and retry_after:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            if status == 429 or spike:
+                if acquired_at >= self._last_decrease:
+                    previous, self.limit = self.limit, max(self.limit / 2, 1.0)
+                    self._last_decrease = time.monotonic()
+                    logger.info(f"Concurrency limit {previous:.1f} -> {self.limit:.1f} after "
+                                f"{'a 429' if status == 429 else f'a {duration:.2f}s {endpoint} (usual {average:.2f}s)'}")
+            elif isinstance(status, int) and status < 500:
+                self._latency[endpoint] = [average + self.LATENCY_SMOOTHING * (duration - average), samples + 1]
+                if saturated and self.limit < self.maximum:
+                    self.limit = min(self.limit + 1 / self.limit, float(self.maximum))
+            self._condition.notify_all()
+
+
+_limiters: Dict[str, ConcurrencyLimiter] = {}  # Global tenant label -> concurrency limiter
+_limiters_lock = threading.Lock()
+
+
+def get_concurrency_limiter(tenant: str) -> ConcurrencyLimiter:
+    """Get the concurrency limiter of a tenant, creating it on first use."""
+    with _limiters_lock:
+        limiter = _limiters.get(tenant)
+        if limiter is None:
+            limiter = _limiters[tenant] = ConcurrencyLimiter()
+        return limiter
+
+
+def parse_retry_after(value: str) -> Optional[float]:
+    """
+    Parse a Retry-After header.
+
+    Args:
+        value (str): Delay in seconds or an HTTP date.
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _never_sent(error: Exception) -> bool:
+    # Connection refused or connect timeout: the request never reached the server
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if isinstance(error, requests.ConnectionError) and error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def backoff_delay(attempt: int, retry_after: float = None, base: float = HTTP_BACKOFF_BASE, cap: float = HTTP_BACKOFF_MAX) -> float:
+    """
+    Delay before retry number attempt (0-based): full jitter over an exponentially growing window,
+    and never less than Retry-After.
+    """
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    return max(delay, retry_after) if retry_after is not None else delay
+
+
+def request_json(method: str, url: str, endpoint: str, tenant: str, headers: Dict[str, str], data: Any = None,
+                 params: dict = None, recover: Callable[[], Any] = None, max_retries: int = HTTP_MAX_RETRIES) -> Any:
+    """
+    Send an API request with retries, the tenant's circuit breaker and its adaptive concurrency limit.
+
+    Args:
+        method (str): HTTP method.
+        url (str): Full request URL.
+        endpoint (str): The endpoint, for metrics and spans.
+        tenant (str): Tenant label for metrics and the circuit breaker.
+        headers (Dict[str, str]): Request headers.
+        data (Any): JSON body (optional).
+        params (dict): Query parameters (optional).
+        recover (Callable): For non-idempotent calls: looks up whether a failed attempt took effect, returning
+            its result (used as this call's result) or None. Without it, a POST is only retried when it
+            certainly had no effect.
+        max_retries (int): Retries after the first attempt.
+
+    Returns:
+        Any: The decoded JSON response ({} for an empty body).
+
+    Raises:
+        CircuitOpenError: If the tenant's circuit breaker is open.
+        requests.HTTPError: For non-retryable error statuses, or when retries are exhausted.
+        requests.RequestException: For network errors when retries are exhausted.
+    """
+    method = method.upper()
+    breaker = get_circuit_breaker(tenant)
+    limiter = get_concurrency_limiter(tenant) if HTTP_ADAPTIVE_CONCURRENCY else None
+    span_name = f"{method} {normalize_endpoint(endpoint)}"
+    attempt = 0
+    while True:
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {tenant}; not calling {span_name}")
+
+        acquired_at = limiter.acquire() if limiter else None
+        started = time.perf_counter()
+        response, error = None, None
+        try:
+            response = requests.request(method, url, headers=headers, json=data, params=params, timeout=HTTP_TIMEOUT_SECONDS)
+        except requests.RequestException as e:
+            error = e
+        finally:
+            duration = time.perf_counter() - started
+            status = response.status_code if response is not None else "error"
+            retry_after = parse_retry_after(response.headers.get("Retry-After")) if response is not None else None
+            if limiter:
+                limiter.release(acquired_at, span_name, status, duration, retry_after)
+        record_api_call(tenant, method, endpoint, status, duration, len(response.content) if response is not None else 0)
+        record_span(span_name, started, duration, status=status, tenant=tenant, attempt=attempt)
+
+        if response is not None and response.status_code not in RETRYABLE_STATUS:
+            breaker.record_success()
+            response.raise_for_status()
+            return response.json() if response.content else {}
+
+        # A 429 shows the tenant is up (and ends a half-open trial); server and network errors count against it
+        if status == 429:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+        if attempt >= max_retries:
+            if error is not None:
+                raise error
+            response.raise_for_status()
+
+        # A POST that may have reached the server is only retried after checking it did not take effect
+        if method not in IDEMPOTENT_METHODS and status != 429 and not _never_sent(error):
+            if recover is None:
+                if error is not None:
+                    raise error
+                response.raise_for_status()
+            recovered = recover()
+            if recovered is not None:
+                logger.info(f"{span_name} on {tenant} took effect despite {error or status}; using the existing record.")
+                return recovered
+
+        delay = backoff_delay(attempt, retry_after)
+        logger.warning(f"{span_name} on {tenant} failed ({error or status}); retry {attempt + 1}/{max_retries} in {delay:.1f}s")
+        record_api_retry(tenant, method, endpoint)
+        time.sleep(delay)
+        attempt += 1
+
+
+class IdempotencyStore:
+    """
+    Append-only JSONL map from an idempotency key (e.g. 'ticket:<source host>:<source id>')
+    to the destination record it created.
+
+    A key is marked pending before the create is sent and done with the result
+    afterwards; a key left pending by an interrupted run means the create may
+    or may not have landed, and should be looked up before retrying.
+
+    Args:
+        path (str): The JSONL file.
+    """
+
+    def __init__(self, path: str = IDEMPOTENCY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._records: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Partly written last line
+                    self._records[record["key"]] = record
+            logger.info(f"Loaded {len(self._records)} idempotency records from {path}")
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._records[record["key"]] = record
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, default=str) + "\n")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get the record of a key: {'key', 'state': 'pending' | 'done', 'result'}, or None."""
+        with self._lock:
+            return self._records.get(key)
+
+    def result(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get the stored result of a completed create, or None."""
+        record = self.get(key)
+        return record["result"] if record and record["state"] == "done" else None
+
+    def begin(self, key: str) -> None:
+        """Mark a create as about to be sent."""
+        self._append({"key": key, "state": "pending", "result": None, "at": datetime.now(timezone.utc).isoformat()})
+
+    def complete(self, key: str, result: Dict[str, Any]) -> None:
+        """Record the destination record a create produced, e.g. {'id': 123}."""
+        self._append({"key": key, "state": "done", "result": result, "at": datetime.now(timezone.utc).isoformat()})
+
+
+_idempotency_store = None  # Global store, opened on first use
+_idempotency_lock = threading.Lock()
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    """Get the process-wide idempotency store at IDEMPOTENCY_PATH."""
+    global _idempotency_store
+    with _idempotency_lock:
+        if _idempotency_store is None:
+            _idempotency_store = IdempotencyStore()
+        return _idempotency_store
@@ -0,0 +1,252 @@
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlparse
+
+from syncro_configs import get_logger, LOG_DIR
+
+'''
+API metrics for a migration run.
+
+Every Syncro API call is recorded per tenant, endpoint and method: call counts
+by status code, a latency histogram, response bytes and retries. At the end of
+a run the registry is dumped to LOG_DIR as JSON and as Prometheus text
+exposition format, so it is clear where the API budget went.
+'''
+
+logger = get_logger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def normalize_endpoint(endpoint: str) -> str:
+    """
+    Reduce an endpoint to a low-cardinality label.
+
+    Query strings are dropped and numeric path segments become '{id}', so
+    'tickets/123/comment?x=1' and '/tickets/456/comment' share one label.
+
+    Args:
+        endpoint (str): The endpoint or full URL that was called.
+
+    Returns:
+        str: The normalized endpoint, e.g. '/tickets/{id}/comment'.
+    """
+    path = urlparse(endpoint).path if "://" in endpoint else endpoint.split("?", 1)[0]
+    path = re.sub(r"/api/v1(?=/|$)", "", path)
+    path = re.sub(r"/+", "/", "/" + path.strip("/"))
+    return re.sub(r"/\d+(?=/|$)", "/{id}", path)
+
+
+def tenant_label(base_url: str) -> str:
+    """Use the host of a tenant base URL as its label."""
+    return urlparse(base_url).netloc or base_url
+
+
+def escape_label_value(value) -> str:
+    """Escape a Prometheus label value: backslash, double quote and newline."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of per tenant/endpoint/method API call metrics.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self.started_at = datetime.now()
+
+    def _get_series(self, tenant: str, method: str, endpoint: str) -> Dict[str, Any]:
+        key = (tenant, method.upper(), normalize_endpoint(endpoint))
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = {
+                "count": 0,
+                "status_codes": {},
+                "latency_sum": 0.0,
+                "latency_buckets": [0] * (len(LATENCY_BUCKETS) + 1),
+                "response_bytes": 0,
+                "retries": 0,
+            }
+        return series
+
+    def record_call(self, tenant: str, method: str, endpoint: str, status, duration: float,
+                    response_bytes: int = 0) -> None:
+        """
+        Record one completed API call.
+
+        Args:
+            tenant (str): Tenant label, e.g. 'source', 'destination' or the tenant host.
+            method (str): HTTP method.
+            endpoint (str): The endpoint called (normalized with normalize_endpoint).
+            status (int | str): HTTP status code, or 'error' if no response was received.
+            duration (float): Wall time of the call in seconds.
+            response_bytes (int): Size of the response body.
+        """
+        bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS) if duration <= bound), len(LATENCY_BUCKETS))
+        with self._lock:
+            series = self._get_series(tenant, method, endpoint)
+            series["count"] += 1
+            series["status_codes"][str(status)] = series["status_codes"].get(str(status), 0) + 1
+            series["latency_sum"] += duration
+            series["latency_buckets"][bucket] += 1
+            series["response_bytes"] += response_bytes
+
+    def record_retry(self, tenant: str, method: str, endpoint: str) -> None:
+        """Record that a call is being retried."""
+        with self._lock:
+            self._get_series(tenant, method, endpoint)["retries"] += 1
+
+    def total_calls(self) -> int:
+        """Total number of API calls recorded."""
+        with self._lock:
+            return sum(series["count"] for series in self._series.values())
+
+    def calls_by_tenant(self) -> Dict[str, int]:
+        """Number of API calls recorded per tenant."""
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for (tenant, _, _), series in self._series.items():
+                counts[tenant] = counts.get(tenant, 0) + series["count"]
+        return counts
+
+    def reset(self) -> None:
+        """Forget all recorded metrics."""
+        with self._lock:
+            self._series.clear()
+            self.started_at = datetime.now()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get a JSON-serializable copy of the metrics.
+
+        Returns:
+            Dict[str, Any]: {'started_at', 'totals': {...}, 'series': [...]}, with series sorted by call count.
+        """
+        with self._lock:
+            series_list: List[Dict[str, Any]] = []
+            for (tenant, method, endpoint), series in self._series.items():
+                cumulative, buckets = 0, {}
+                for bound, count in zip([*LATENCY_BUCKETS, "+Inf"], series["latency_buckets"]):
+                    cumulative += count
+                    buckets[str(bound)] = cumulative
+                series_list.append({
+                    "tenant": tenant,
+                    "method": method,
+                    "endpoint": endpoint,
+                    "count": series["count"],
+                    "status_codes": dict(series["status_codes"]),
+                    "latency_seconds": {
+                        "sum": round(series["latency_sum"], 6),
+                        "avg": round(series["latency_sum"] / series["count"], 6) if series["count"] else None,
+                        "buckets": buckets,
+                    },
+                    "response_bytes": series["response_bytes"],
+                    "retries": series["retries"],
+                })
+
+        series_list.sort(key=lambda s: s["count"], reverse=True)
+        totals = {"calls": 0, "errors": 0, "response_bytes": 0, "retries": 0, "by_tenant": {}}
+        for s in series_list:
+            errors = sum(count for status, count in s["status_codes"].items() if not status.startswith(("2", "3")))
+            totals["calls"] += s["count"]
+            totals["errors"] += errors
+            totals["response_bytes"] += s["response_bytes"]
+            totals["retries"] += s["retries"]
+            totals["by_tenant"][s["tenant"]] = totals["by_tenant"].get(s["tenant"], 0) + s["count"]
+        return {"started_at": self.started_at.isoformat(timespec="seconds"), "totals": totals, "series": series_list}
+
+    def to_prometheus(self) -> str:
+        """
+        Render the metrics in Prometheus text exposition format.
+
+        Returns:
+            str: The exposition text.
+        """
+        def labels(s: Dict[str, Any], **extra) -> str:
+            values = {"tenant": s["tenant"], "method": s["method"], "endpoint": s["endpoint"], **extra}
+            return ",".join(f'{name}="{escape_label_value(value)}"' for name, value in values.items())
+
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP syncro_api_requests_total Syncro API calls by status code.",
+            "# TYPE syncro_api_requests_total counter",
+        ]
+        for s in snapshot["series"]:
+            for status, count in sorted(s["status_codes"].items()):
+                lines.append(f"syncro_api_requests_total{{{labels(s, status=status)}}} {count}")
+
+        lines += [
+            "# HELP syncro_api_request_duration_seconds Syncro API call latency.",
+            "# TYPE syncro_api_request_duration_seconds histogram",
+        ]
+        for s in snapshot["series"]:
+            for bound, count in s["latency_seconds"]["buckets"].items():
+                lines.append(f"syncro_api_request_duration_seconds_bucket{{{labels(s, le=bound)}}} {count}")
+            lines.append(f"syncro_api_request_duration_seconds_sum{{{labels(s)}}} {s['latency_seconds']['sum']}")
+            lines.append(f"syncro_api_request_duration_seconds_count{{{labels(s)}}} {s['count']}")
+
+        lines += [
+            "# HELP syncro_api_response_bytes_total Bytes received from the Syncro API.",
+            "# TYPE syncro_api_response_bytes_total counter",
+        ]
+        lines += [f"syncro_api_response_bytes_total{{{labels(s)}}} {s['response_bytes']}" for s in snapshot["series"]]
+
+        lines += [
+            "# HELP syncro_api_retries_total Retried Syncro API calls.",
+            "# TYPE syncro_api_retries_total counter",
+        ]
+        lines += [f"syncro_api_retries_total{{{labels(s)}}} {s['retries']}" for s in snapshot["series"]]
+        return "\n".join(lines) + "\n"
+
+    def dump(self, directory: str = LOG_DIR, formats=("json", "prometheus")) -> List[str]:
+        """
+        Write the metrics to files named metrics_<timestamp>.json / .prom.
+
+        Args:
+            directory (str): Output directory.
+            formats (Iterable[str]): Any of 'json' and 'prometheus'.
+
+        Returns:
+            List[str]: The written file paths.
+        """
+        os.makedirs(directory, exist_ok=True)
+        stem = os.path.join(directory, f"metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        paths = []
+        if "json" in formats:
+            with open(f"{stem}.json", "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(), f, indent=2)
+            paths.append(f"{stem}.json")
+        if "prometheus" in formats:
+            with open(f"{stem}.prom", "w", encoding="utf-8") as f:
+                f.write(self.to_prometheus())
+            paths.append(f"{stem}.prom")
+
+        totals = self.snapshot()["totals"]
+        logger.info(f"API metrics: {totals['calls']} calls, {totals['errors']} errors, {totals['retries']} retries, "
+                    f"{totals['response_bytes']} bytes; by tenant {totals['by_tenant']}. Written to {paths}")
+        return paths
+
+
+_registry = MetricsRegistry()  # Process-wide registry shared by both API clients
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get the process-wide metrics registry."""
+    return _registry
+
+
+def record_api_call(tenant: str, method: str, endpoint: str, status, duration: float, response_bytes: int = 0) -> None:
+    """Record one API call in the process-wide registry (see MetricsRegistry.record_call)."""
+    _registry.record_call(tenant, method, endpoint, status, duration, response_bytes)
+
+
+def record_api_retry(tenant: str, method: str, endpoint: str) -> None:
+    """Record a retried API call in the process-wide registry (see MetricsRegistry.record_retry)."""
+    _registry.record_retry(tenant, method, endpoint)
@@ -0,0 +1,174 @@
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+from syncro_configs import get_logger, LOG_DIR, SYNCRO_API_CALL_DELAY, SYNCRO_POOL_WORKERS, SYNCRO_RATE_LIMIT_PER_MINUTE
+
+'''
+Dry-run migration planning.
+
+A plan lists what a full migration would create or skip and, per stage, how
+many API calls it would make against each tenant. This module turns those
+call counts into wall-clock estimates under the per-tenant rate limit and the
+stage's concurrency, renders the plan, and caches the fetched tenant data so a
+plan can be recomputed without reading the tenants again.
+
+The plan itself is built by Syncro_To_Syncro.build_migration_plan, which uses
+the same matching code as the real run.
+'''
+
+logger = get_logger(__name__)
+
+
+def average_latency(metrics_snapshot: Dict[str, Any]) -> float:
+    """
+    Average API call latency in a metrics registry snapshot.
+
+    Args:
+        metrics_snapshot (Dict[str, Any]): Output of MetricsRegistry.snapshot().
+
+    Returns:
+        float: Mean seconds per call, or 0.0 if no calls were recorded.
+    """
+    calls = sum(series["count"] for series in metrics_snapshot["series"])
+    total = sum(series["latency_seconds"]["sum"] for series in metrics_snapshot["series"])
+    return total / calls if calls else 0.0
+
+
+def estimate_stage(calls: Dict[str, int], concurrency: int, avg_latency: float, call_delay: float = SYNCRO_API_CALL_DELAY,
+                   rate_limit_per_minute: int = SYNCRO_RATE_LIMIT_PER_MINUTE, tenants_in_parallel: bool = False) -> float:
+    """
+    Estimate the wall-clock seconds of one stage.
+
+    Each tenant's calls take the longer of their latency-bound time (calls x
+    (latency + delay) spread over the stage's workers) and their rate-limit-bound
+    time (calls / rate limit).
+
+    Args:
+        calls (Dict[str, int]): API calls per tenant, e.g. {'source': 10, 'destination': 250}.
+        concurrency (int): Calls in flight at once per tenant.
+        avg_latency (float): Mean seconds per API call.
+        call_delay (float): Delay after each call (SYNCRO_API_CALL_DELAY).
+        rate_limit_per_minute (int): Calls allowed per tenant per minute; 0 for no limit.
+        tenants_in_parallel (bool): True if the tenants are called at the same time, False if one after the other.
+
+    Returns:
+        float: Estimated seconds.
+    """
+    per_tenant = []
+    for count in calls.values():
+        latency_bound = count * (avg_latency + call_delay) / max(concurrency, 1)
+        rate_bound = count * 60 / rate_limit_per_minute if rate_limit_per_minute else 0.0
+        per_tenant.append(max(latency_bound, rate_bound))
+    if not per_tenant:
+        return 0.0
+    return max(per_tenant) if tenants_in_parallel else sum(per_tenant)
+
+
+def estimate_plan(plan: Dict[str, Any], avg_latency: float, workers: int = SYNCRO_POOL_WORKERS,
+                  call_delay: float = SYNCRO_API_CALL_DELAY, rate_limit_per_minute: int = SYNCRO_RATE_LIMIT_PER_MINUTE) -> Dict[str, Any]:
+    """
+    Add API call totals and time estimates to a plan.
+
+    Args:
+        plan (Dict[str, Any]): The plan; plan['stages'] maps stage names to {'calls': {...},
+            'parallel': bool (uses the worker pool), 'tenants_in_parallel': bool}.
+        avg_latency (float): Mean seconds per API call.
+        workers (int): Worker pool size of the parallel stages (SYNCRO_POOL_WORKERS).
+        call_delay (float): Delay after each call.
+        rate_limit_per_minute (int): Calls allowed per tenant per minute.
+
+    Returns:
+        Dict[str, Any]: The same plan, with an 'estimate' entry.
+    """
+    api_calls: Dict[str, int] = {}
+    stages = {}
+    for name, stage in plan["stages"].items():
+        for tenant, count in stage["calls"].items():
+            api_calls[tenant] = api_calls.get(tenant, 0) + count
+        seconds = estimate_stage(stage["calls"], workers if stage.get("parallel") else 1, avg_latency, call_delay,
+                                 rate_limit_per_minute, stage.get("tenants_in_parallel", False))
+        stages[name] = round(seconds, 1)
+
+    total_seconds = sum(stages.values())
+    plan["estimate"] = {
+        "api_calls": api_calls,
+        "total_api_calls": sum(api_calls.values()),
+        "stage_seconds": stages,
+        "total_seconds": round(total_seconds, 1),
+        "assumptions": {
+            "avg_latency_s": round(avg_latency, 4),
+            "call_delay_s": call_delay,
+            "workers": workers,
+            "rate_limit_per_minute": rate_limit_per_minute,
+        },
+    }
+    return plan
+
+
+def format_plan(plan: Dict[str, Any]) -> str:
+    """
+    Render a plan as text for the console.
+
+    Returns:
+        str: The counts, API calls per tenant and the time estimate per stage.
+    """
+    counts = plan["counts"]
+    estimate = plan["estimate"]
+    lines = [
+        "Migration plan (dry run, nothing was written):",
+        f"  Customers: {counts['customers_to_create']} to create of {counts['source_customers']}",
+        f"  Contacts:  {counts['contacts_to_create']} to create, {counts['contacts_matched']} matched of {counts['source_contacts']}",
+        f"  Tickets:   {counts['tickets_to_create']} to create, {counts['tickets_to_skip']} to skip of {counts['source_tickets']}",
+        f"  Comments:  {counts['comments_to_create']} to create",
+    ]
+    if counts.get("tickets_to_patch") is not None:
+        lines.append(f"  Patches:   {counts['tickets_to_patch']} tickets to update")
+    lines.append(f"  API calls: {estimate['total_api_calls']} "
+                 f"({', '.join(f'{tenant} {count}' for tenant, count in estimate['api_calls'].items())})")
+    for stage, seconds in estimate["stage_seconds"].items():
+        lines.append(f"    {stage:<16} {timedelta(seconds=round(seconds))}")
+    assumptions = estimate["assumptions"]
+    lines.append(f"  Estimated time: {timedelta(seconds=round(estimate['total_seconds']))} at "
+                 f"{assumptions['rate_limit_per_minute']} calls/min per tenant, {assumptions['workers']} workers, "
+                 f"{assumptions['avg_latency_s']}s latency + {assumptions['call_delay_s']}s delay per call")
+    return "\n".join(lines)
+
+
+def write_plan(plan: Dict[str, Any], directory: str = LOG_DIR) -> str:
+    """
+    Write a plan as JSON to plan_<timestamp>.json.
+
+    Returns:
+        str: The written path.
+    """
+    path = os.path.join(directory, f"plan_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(plan, f, indent=2, default=str)
+    logger.info(f"Migration plan written to {path}")
+    return path
+
+
+def save_plan_inputs(inputs: Dict[str, Any], path: str) -> None:
+    """Cache the tenant data a plan was computed from, so it can be replanned without API reads."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(inputs, f)
+    os.replace(temp_path, path)
+    logger.info(f"Plan inputs cached in {path}")
+
+
+def load_plan_inputs(path: str) -> Dict[str, Any]:
+    """
+    Load cached plan inputs.
+
+    Returns:
+        Dict[str, Any]: The inputs, or None if the cache file does not exist.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        inputs = json.load(f)
+    logger.info(f"Loaded plan inputs fetched at {inputs.get('fetched_at')} from {path}")
+    return inputs
@@ -0,0 +1,209 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict
+
+from syncro_configs import get_logger, PROGRESS_INTERVAL_SECONDS, PROGRESS_STATUS_PATH, SYNCRO_RATE_LIMIT_PER_MINUTE
+from syncro_metrics import get_metrics_registry
+
+'''
+Live progress and ETA reporting.
+
+Work is counted per kind (customers, tickets, comments) against totals known
+from the initial fetch. The hot loop only bumps counters; a background thread
+wakes every PROGRESS_INTERVAL_SECONDS to compute records per second, API calls
+per second, the remaining per-minute API budget and an ETA, prints a status
+line and rewrites a machine-readable status file.
+
+Calling the module-level helpers without an active reporter does nothing, so
+instrumented code can run with or without progress reporting.
+'''
+
+logger = get_logger(__name__)
+
+RATE_WINDOW_SECONDS = 30  # Recent window used for rates and the ETA
+
+
+class ProgressReporter:
+    """
+    Tracks totals and completed work, and reports progress from a background thread.
+
+    Args:
+        interval (float): Seconds between reports.
+        status_path (str): JSON status file rewritten on every report; None disables it.
+        stream: Console stream for the status line; None disables console output.
+        rate_limit_per_minute (int): API calls allowed per tenant per minute, for the remaining budget.
+    """
+
+    def __init__(self, interval: float = PROGRESS_INTERVAL_SECONDS, status_path: str = PROGRESS_STATUS_PATH,
+                 stream=sys.stdout, rate_limit_per_minute: int = SYNCRO_RATE_LIMIT_PER_MINUTE):
+        self.interval = interval
+        self.status_path = status_path
+        self.stream = stream
+        self.rate_limit_per_minute = rate_limit_per_minute
+        self.phase = None
+        self.totals: Dict[str, int] = {}
+        self.completed: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._started = None
+        self._samples = deque()  # (monotonic time, completed records, calls by tenant)
+
+    def set_phase(self, phase: str) -> None:
+        """Name the stage currently running, e.g. 'contacts'."""
+        self.phase = phase
+
+    def add_total(self, kind: str, count: int) -> None:
+        """Add to the expected number of records of a kind."""
+        with self._lock:
+            self.totals[kind] = self.totals.get(kind, 0) + count
+
+    def set_total(self, kind: str, count: int) -> None:
+        """Set the expected number of records of a kind."""
+        with self._lock:
+            self.totals[kind] = count
+
+    def advance(self, kind: str, count: int = 1) -> None:
+        """Count completed records of a kind."""
+        with self._lock:
+            self.completed[kind] = self.completed.get(kind, 0) + count
+
+    def start(self) -> "ProgressReporter":
+        """Start the background reporting thread."""
+        self._started = time.monotonic()
+        self._samples.clear()
+        self._samples.append((self._started, 0, get_metrics_registry().calls_by_tenant()))
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="syncro-progress", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Dict:
+        """
+        Stop reporting and write a final status.
+
+        Returns:
+            Dict: The final status.
+        """
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+        status = self.report(final=True)
+        logger.info(f"Final progress: {status}")
+        return status
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.report()
+            except Exception as e:
+                logger.error(f"Progress report failed: {e}")
+
+    def status(self) -> Dict:
+        """
+        Compute the current progress.
+
+        Returns:
+            Dict: Totals, completed counts, rates, remaining API budget and ETA.
+        """
+        now = time.monotonic()
+        with self._lock:
+            totals, completed = dict(self.totals), dict(self.completed)
+        calls_by_tenant = get_metrics_registry().calls_by_tenant()
+        done = sum(completed.get(kind, 0) for kind in totals)
+        remaining = sum(max(total - completed.get(kind, 0), 0) for kind, total in totals.items())
+
+        if not self._samples:
+            self._samples.append((now, 0, {}))
+        # Keep one sample at least a minute old as the baseline for the API budget
+        while len(self._samples) > 1 and now - self._samples[1][0] >= 60:
+            self._samples.popleft()
+        first = next((s for s in self._samples if now - s[0] <= RATE_WINDOW_SECONDS), self._samples[-1])
+        elapsed_window = now - first[0]
+        records_per_second = (done - first[1]) / elapsed_window if elapsed_window > 0 else 0.0
+        calls_per_second = (sum(calls_by_tenant.values()) - sum(first[2].values())) / elapsed_window if elapsed_window > 0 else 0.0
+        self._samples.append((now, done, calls_by_tenant))
+
+        # Calls made by the busiest tenant over the last minute, against the per-tenant limit
+        budget_remaining = None
+        if self.rate_limit_per_minute:
+            baseline = self._samples[0][2]
+            used = max([count - baseline.get(tenant, 0) for tenant, count in calls_by_tenant.items()] or [0])
+            budget_remaining = max(self.rate_limit_per_minute - used, 0)
+
+        eta_seconds = remaining / records_per_second if records_per_second > 0 else None
+        return {
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+            "phase": self.phase,
+            "elapsed_s": round(now - (self._started or now), 1),
+            "totals": totals,
+            "completed": completed,
+            "percent": round(100 * done / (done + remaining), 1) if done + remaining else None,
+            "records_per_second": round(records_per_second, 2),
+            "api_calls": sum(calls_by_tenant.values()),
+            "api_calls_per_second": round(calls_per_second, 2),
+            "api_budget_remaining": budget_remaining,
+            "rate_limit_per_minute": self.rate_limit_per_minute,
+            "eta_seconds": round(eta_seconds) if eta_seconds is not None else None,
+            "eta_at": (datetime.now() + timedelta(seconds=eta_seconds)).isoformat(timespec="seconds")
+                      if eta_seconds is not None else None,
+        }
+
+    def report(self, final: bool = False) -> Dict:
+        """Write the current status to the console and the status file."""
+        status = self.status()
+        if self.stream is not None:
+            counts = ", ".join(f"{kind} {status['completed'].get(kind, 0)}/{total}" for kind, total in status["totals"].items())
+            eta = f"{timedelta(seconds=status['eta_seconds'])}" if status["eta_seconds"] is not None else "--"
+            line = (f"[{status['phase'] or 'running'}] {counts} | {status['percent'] or 0}% | "
+                    f"{status['records_per_second']} rec/s | {status['api_calls_per_second']} calls/s | "
+                    f"budget {status['api_budget_remaining'] if status['api_budget_remaining'] is not None else '--'}/min | ETA {eta}")
+            interactive = hasattr(self.stream, "isatty") and self.stream.isatty()
+            self.stream.write(("\r" + line.ljust(120) + ("\n" if final else "")) if interactive else line + "\n")
+            self.stream.flush()
+        if self.status_path:
+            temp_path = f"{self.status_path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(dict(status, final=final), f, indent=2)
+            os.replace(temp_path, self.status_path)
+        return status
+
+
+_reporter = None  # Global active reporter, if any
+
+
+def start_progress(**kwargs) -> ProgressReporter:
+    """Create and start the process-wide progress reporter (see ProgressReporter for arguments)."""
+    global _reporter
+    _reporter = ProgressReporter(**kwargs).start()
+    return _reporter
+
+
+def stop_progress() -> Dict:
+    """Stop the process-wide progress reporter and return its final status, or None if none was running."""
+    global _reporter
+    reporter, _reporter = _reporter, None
+    return reporter.stop() if reporter else None
+
+
+def progress_phase(phase: str) -> None:
+    """Name the current stage on the active reporter, if any."""
+    if _reporter is not None:
+        _reporter.set_phase(phase)
+
+
+def progress_total(kind: str, count: int, add: bool = False) -> None:
+    """Set (or with add=True, increase) the expected records of a kind on the active reporter, if any."""
+    if _reporter is not None:
+        (_reporter.add_total if add else _reporter.set_total)(kind, count)
+
+
+def progress_advance(kind: str, count: int = 1) -> None:
+    """Count completed records of a kind on the active reporter, if any."""
+    if _reporter is not None:
+        _reporter.advance(kind, count)
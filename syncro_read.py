@@ -18,38 +18,30 @@ parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, parent_dir)
 
 # Import from syncro_config and utils
-from syncro_configs import SYNCRO_API_BASE_URL, SYNCRO_API_KEY, get_logger
-from syncro_utils import syncro_api_call
+from syncro_configs import SYNCRO_API_BASE_URL, SYNCRO_API_KEY, SYNCRO_API_CALL_DELAY, get_logger, LogPayload
+from syncro_utils import syncro_api_call, TicketNumberSet, timed_stage
+from syncro_metrics import get_metrics_registry
 
 # Get a logger for this module
 logger = get_logger(__name__)
 print(f"Handlers for {logger.name}: {logger.handlers}")
 print(f"Handlers for root logger: {logging.getLogger().handlers}")
 
-_api_call_count = 0
-
-def increment_api_call_count():
-    """Increment the global API call counter."""
-    global _api_call_count
-    _api_call_count += 1
-
 def get_api_call_count() -> int:
-    """Retrieve the total API call count."""
-    return _api_call_count
+    """Retrieve the total API call count (see syncro_metrics for the per-endpoint breakdown)."""
+    return get_metrics_registry().total_calls()
 
-def syncro_api_get(endpoint: str, params: dict = None):
+def syncro_api_iter_pages(endpoint: str, params: dict = None):
     """
-    Fetch paginated data from SyncroMSP API.
+    Iterate over the pages of a paginated SyncroMSP API endpoint.
 
     Args:
         endpoint (str): The API endpoint to call (e.g., '/customers', '/contacts').
         params (dict): Query parameters for the request.
 
-    Returns:
-        list: Aggregated data from all pages.
+    Yields:
+        list: The records returned on each page.
     """
-    increment_api_call_count()
-    all_data = []
     if params is None:
         params = {}
     current_page = 1
@@ -60,16 +52,16 @@ def syncro_api_get(endpoint: str, params: dict = None):
         params["page"] = current_page
 
         response = syncro_api_call("GET", endpoint, params=params)
-        time.sleep(0.5)
+        time.sleep(SYNCRO_API_CALL_DELAY)
         if not response:
             logger.error(f"Failed to fetch data from {endpoint}. Stopping pagination.")
             break
 
         key = endpoint.strip('/').lower()
         page_data = response.get(key, [])
-        all_data.extend(page_data)
 
         logger.info(f"Fetched {len(page_data)} records from page {current_page}.")
+        yield page_data
 
         meta = response.get("meta", {})
         if not meta.get("next_page"):
@@ -77,6 +69,22 @@ def syncro_api_get(endpoint: str, params: dict = None):
 
         current_page += 1
 
+@timed_stage()
+def syncro_api_get(endpoint: str, params: dict = None):
+    """
+    Fetch paginated data from SyncroMSP API.
+
+    Args:
+        endpoint (str): The API endpoint to call (e.g., '/customers', '/contacts').
+        params (dict): Query parameters for the request.
+
+    Returns:
+        list: Aggregated data from all pages.
+    """
+    all_data = []
+    for page_data in syncro_api_iter_pages(endpoint, params=params):
+        all_data.extend(page_data)
+
     logger.info(f"Finished fetching data from {endpoint}. Total records retrieved: {len(all_data)}.")
     return all_data
 
@@ -105,8 +113,9 @@ def syncro_get_ticket_data(ticket_id: int, key: str = None):
 def syncro_get_all_customers():
     """Fetch all customers from SyncroMSP API and log their business_name and id."""
     customers = syncro_api_get('/customers')
-    customer_info = [{"id": customer.get("id"), "business_name": customer.get("business_name")} for customer in customers]
-    logger.info(f"Retrieved {len(customers)} customers: {customer_info}")
+    logger.info("Retrieved %d customers", len(customers))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Customers: %s", [{"id": customer.get("id"), "business_name": customer.get("business_name")} for customer in customers])
     return customers
 
 def syncro_get_all_contacts():
@@ -117,6 +126,24 @@ def syncro_get_all_tickets():
     """Fetch all tickets from SyncroMSP API."""
     return syncro_api_get('/tickets')
 
+def syncro_get_all_ticket_numbers() -> TicketNumberSet:
+    """
+    Fetch the number of every ticket in the SyncroMSP tenant.
+
+    Pages through '/tickets' keeping only the ticket numbers, so the full
+    ticket bodies and comment threads are never held in memory.
+
+    Returns:
+        TicketNumberSet: Compact set of all existing ticket numbers.
+    """
+    ticket_numbers = TicketNumberSet()
+    for page_data in syncro_api_iter_pages('/tickets'):
+        for ticket in page_data:
+            ticket_numbers.add(ticket.get("number"))
+
+    logger.info(f"Prefetched {len(ticket_numbers)} ticket numbers.")
+    return ticket_numbers
+
 
 
 def get_syncro_ticket_by_number(ticket_number: str) -> dict:
@@ -148,7 +175,7 @@ def get_syncro_ticket_by_number(ticket_number: str) -> dict:
         # Handle the response
         if response and "tickets" in response and len(response["tickets"]) > 0:
             ticket = response["tickets"][0]
-            logger.info(f"Successfully retrieved ticket: {ticket}")
+            logger.info(f"Successfully retrieved ticket {ticket_number} with ID {ticket.get('id')} and {len(ticket.get('comments') or [])} comments")
             return ticket
 
         # Log a warning if no ticket is found
@@ -175,7 +202,8 @@ def syncro_get_all_techs():
         techs = syncro_api_get(endpoint)           
         
         # Log the retrieved tech details
-        logger.info(f"Retrieved {len(techs)} techs: {techs}")
+        logger.info("Retrieved %d techs: %s", len(techs), LogPayload(techs))
+        logger.debug("Techs: %s", techs)
         
         return techs
 
@@ -220,7 +248,8 @@ def syncro_get_contacts_by_customer_id(customer_id: int) -> dict:
         contact_dict = {contact["name"]: contact["id"] for contact in contacts if "name" in contact and "id" in contact}
 
         # Log the built dictionary
-        logger.info(f"Built contact dictionary for customer ID {customer_id}: {contact_dict}")
+        logger.info("Built contact dictionary for customer ID %s: %s", customer_id, LogPayload(contact_dict))
+        logger.debug("Contact dictionary for customer ID %s: %s", customer_id, contact_dict)
         return contact_dict
 
     except Exception as e:
@@ -258,7 +287,7 @@ def syncro_get_issue_types() -> list:
             return []
 
         # Log the retrieved issue types
-        logger.info(f"Retrieved issue types: {issue_types}")
+        logger.info("Retrieved issue types: %s", LogPayload(issue_types))
         return issue_types
 
     except Exception as e:
@@ -282,7 +311,7 @@ def syncro_get_ticket_statuses():
         # Check if response contains ticket statuses
         if response and "ticket_status_list" in response:
             ticket_status_list = response["ticket_status_list"]
-            logger.info(f"Retrieved ticket statuses: {ticket_status_list}")
+            logger.info("Retrieved ticket statuses: %s", LogPayload(ticket_status_list))
             return ticket_status_list
         else:
             logger.error(f"Failed to retrieve ticket statuses. Response: {response}")
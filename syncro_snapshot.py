@@ -0,0 +1,367 @@
+import gzip
+import json
+import mmap
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List
+
+from syncro_configs import get_logger, SNAPSHOT_DIR, SNAPSHOT_SEGMENT_BYTES
+from syncro_progress import progress_total, progress_advance
+
+'''
+Source tenant snapshot archive.
+
+A snapshot directory holds, per resource, gzip-compressed JSONL segment files
+(<resource>-00000.jsonl.gz, ...) and an index (<resource>.index.jsonl), plus a
+manifest.json tracking the export.
+
+Every API page is written as its own gzip member, so a segment is a valid gzip
+file for streaming and any page can also be decompressed on its own. Each
+index line is [id, customer_id, segment, block offset, block length, line in
+block], which gives random access to a record by ID or by customer.
+
+The manifest is rewritten after every page with the next page to fetch and the
+committed segment and index sizes, so an interrupted export resumes where it
+stopped, dropping any partly written page.
+
+SnapshotReader serves a finished snapshot: segments are memory-mapped and
+single blocks are decompressed on demand, so a migration can read one
+customer's tickets without loading the whole archive.
+'''
+
+logger = get_logger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+SNAPSHOT_VERSION = 1
+BLOCK_CACHE_SIZE = 64  # Decompressed blocks kept per reader
+
+# Resource name -> endpoint, key holding the records, and whether it is paginated
+SNAPSHOT_RESOURCES = {
+    "customers": {"endpoint": "customers", "key": "customers", "paged": True},
+    "contacts": {"endpoint": "contacts", "key": "contacts", "paged": True},
+    "techs": {"endpoint": "users", "key": "users", "paged": True},
+    "settings": {"endpoint": "settings", "key": None, "paged": False},
+    "ticket_settings": {"endpoint": "tickets/settings", "key": None, "paged": False},
+    "tickets": {"endpoint": "tickets", "key": "tickets", "paged": True},
+}
+
+
+def segment_name(resource: str, segment: int) -> str:
+    """File name of a resource's segment, e.g. 'tickets-00003.jsonl.gz'."""
+    return f"{resource}-{segment:05d}.jsonl.gz"
+
+
+def index_name(resource: str) -> str:
+    """File name of a resource's index."""
+    return f"{resource}.index.jsonl"
+
+
+def load_manifest(snapshot_dir: str) -> Dict[str, Any]:
+    """
+    Load a snapshot manifest.
+
+    Returns:
+        Dict[str, Any]: The manifest, or None if the directory holds no snapshot.
+    """
+    path = os.path.join(snapshot_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class _ManifestWriter:
+    """Serializes manifest updates from the per-resource export threads."""
+
+    def __init__(self, snapshot_dir: str, manifest: Dict[str, Any]):
+        self.path = os.path.join(snapshot_dir, MANIFEST_NAME)
+        self.manifest = manifest
+        self._lock = threading.Lock()
+
+    def update(self, resource: str = None, state: Dict[str, Any] = None, **fields) -> None:
+        with self._lock:
+            if resource is not None:
+                self.manifest["resources"][resource] = json.loads(json.dumps(state))
+            self.manifest.update(fields)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.manifest, f, indent=2)
+            os.replace(temp_path, self.path)
+
+
+def _truncate(path: str, size: int) -> None:
+    if os.path.exists(path):
+        with open(path, "r+b") as f:
+            f.truncate(size)
+
+
+def _ticket_with_comments(api_call: Callable, ticket: Dict[str, Any]) -> Dict[str, Any]:
+    # Ticket lists normally include comments; fetch the ticket itself if they are missing
+    if "comments" in ticket:
+        return ticket
+    return api_call(f"tickets/{ticket['id']}").get("ticket") or ticket
+
+
+def export_resource(api_call: Callable, snapshot_dir: str, resource: str, writer: _ManifestWriter,
+                    segment_bytes: int = SNAPSHOT_SEGMENT_BYTES) -> Dict[str, Any]:
+    """
+    Export one resource into segments and an index, resuming from its manifest state.
+
+    Args:
+        api_call (Callable): Function of an endpoint (e.g. 'tickets?page=2') returning the JSON response from the source tenant.
+        snapshot_dir (str): Snapshot directory.
+        resource (str): A key of SNAPSHOT_RESOURCES.
+        writer (_ManifestWriter): Shared manifest writer.
+        segment_bytes (int): Segment size at which a new segment file is started.
+
+    Returns:
+        Dict[str, Any]: The resource's final manifest state.
+    """
+    spec = SNAPSHOT_RESOURCES[resource]
+    state = writer.manifest["resources"].get(resource) or {
+        "complete": False, "next_page": 1, "records": 0, "segments": [], "index_bytes": 0,
+    }
+    if state["complete"]:
+        logger.info(f"Snapshot of {resource} already complete ({state['records']} records). Skipping.")
+        return state
+
+    # Drop anything written after the last committed page
+    index_path = os.path.join(snapshot_dir, index_name(resource))
+    _truncate(index_path, state["index_bytes"])
+    if state["segments"]:
+        last = state["segments"][-1]
+        _truncate(os.path.join(snapshot_dir, last["file"]), last["bytes"])
+    if state["next_page"] > 1:
+        logger.info(f"Resuming snapshot of {resource} at page {state['next_page']} ({state['records']} records so far).")
+
+    page = state["next_page"]
+    with open(index_path, "ab") as index_file:
+        while True:
+            endpoint = f"{spec['endpoint']}?page={page}" if spec["paged"] else spec["endpoint"]
+            response = api_call(endpoint)
+            records = response.get(spec["key"], []) if spec["key"] else [response]
+            meta = response.get("meta") or {}
+            if page == 1 and meta.get("total_entries") is not None:
+                progress_total(resource, meta["total_entries"])
+
+            if records:
+                if resource == "tickets":
+                    records = [_ticket_with_comments(api_call, ticket) for ticket in records]
+                if not state["segments"] or state["segments"][-1]["bytes"] >= segment_bytes:
+                    state["segments"].append({"file": segment_name(resource, len(state["segments"])), "bytes": 0, "records": 0})
+                segment = state["segments"][-1]
+                segment_number = len(state["segments"]) - 1
+
+                block = gzip.compress(
+                    b"".join(json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n" for record in records),
+                    mtime=0)
+                # A new segment may already exist, orphaned by a crash before its first page was committed
+                with open(os.path.join(snapshot_dir, segment["file"]), "ab" if segment["bytes"] else "wb") as segment_file:
+                    segment_file.write(block)
+                index_lines = b"".join(
+                    json.dumps([record.get("id"), record.get("customer_id"), segment_number, segment["bytes"], len(block), line],
+                               separators=(",", ":")).encode("utf-8") + b"\n"
+                    for line, record in enumerate(records))
+                index_file.write(index_lines)
+                index_file.flush()
+
+                segment["bytes"] += len(block)
+                segment["records"] += len(records)
+                state["records"] += len(records)
+                state["index_bytes"] += len(index_lines)
+                progress_advance(resource, len(records))
+
+            has_more = spec["paged"] and records and (not meta or meta.get("page", page) < meta.get("total_pages", page + 1))
+            state["next_page"] = page + 1
+            state["complete"] = not has_more
+            writer.update(resource, state)
+            if not has_more:
+                break
+            page += 1
+
+    logger.info(f"Snapshot of {resource}: {state['records']} records in {len(state['segments'])} segments.")
+    return state
+
+
+def export_snapshot(api_call: Callable, snapshot_dir: str = SNAPSHOT_DIR, resources: List[str] = None,
+                    source: str = None, max_workers: int = None) -> Dict[str, Any]:
+    """
+    Export the source tenant into a snapshot directory, one thread per resource.
+
+    Rerunning an interrupted export resumes it; completed resources are not fetched again.
+    Delete the directory to take a fresh snapshot.
+
+    Args:
+        api_call (Callable): Function of an endpoint returning the JSON response from the source tenant.
+        snapshot_dir (str): Snapshot directory, created if missing.
+        resources (List[str]): Resources to export; all of SNAPSHOT_RESOURCES by default.
+        source (str): Source tenant base URL, recorded in the manifest.
+        max_workers (int): Resources exported at the same time; all of them by default.
+
+    Returns:
+        Dict[str, Any]: The final manifest.
+    """
+    resources = resources or list(SNAPSHOT_RESOURCES)
+    os.makedirs(snapshot_dir, exist_ok=True)
+    manifest = load_manifest(snapshot_dir)
+    if manifest and source and manifest.get("source") not in (None, source):
+        raise ValueError(f"{snapshot_dir} holds a snapshot of {manifest['source']}, not {source}")
+    manifest = manifest or {
+        "version": SNAPSHOT_VERSION,
+        "source": source,
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "completed_at": None,
+        "resources": {},
+    }
+    writer = _ManifestWriter(snapshot_dir, manifest)
+    writer.update(completed_at=None)
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=max_workers or len(resources)) as executor:
+        futures = {executor.submit(export_resource, api_call, snapshot_dir, resource, writer): resource
+                   for resource in resources}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                failed.append(futures[future])
+                logger.error(f"Snapshot of {futures[future]} failed: {e}. Rerun the export to resume it.")
+
+    if failed:
+        raise RuntimeError(f"Snapshot export incomplete for {sorted(failed)}; rerun to resume.")
+    writer.update(completed_at=datetime.now(timezone.utc).isoformat())
+    logger.info(f"Snapshot written to {snapshot_dir}: "
+                f"{ {name: state['records'] for name, state in manifest['resources'].items()} }")
+    return manifest
+
+
+class SnapshotReader:
+    """
+    Random access to the records of a snapshot directory.
+
+    Indexes are loaded per resource on first use; segments are memory-mapped
+    and decompressed one block (API page) at a time, with a small LRU cache of
+    decompressed blocks. Safe to share between threads.
+
+    A migration from a partial snapshot, or one of another tenant, would skip
+    records for good once the watermarks are set, so both are refused.
+
+    Args:
+        snapshot_dir (str): Snapshot directory written by export_snapshot.
+        source (str): The configured source tenant base URL the snapshot must have been taken from (optional).
+
+    Raises:
+        FileNotFoundError: If the directory holds no snapshot.
+        ValueError: If a resource was not exported completely, or the snapshot is of another source tenant.
+    """
+
+    def __init__(self, snapshot_dir: str = SNAPSHOT_DIR, source: str = None):
+        self.snapshot_dir = snapshot_dir
+        self.manifest = load_manifest(snapshot_dir)
+        if self.manifest is None:
+            raise FileNotFoundError(f"No snapshot manifest in {snapshot_dir}")
+        resources = self.manifest["resources"]
+        incomplete = [name for name in SNAPSHOT_RESOURCES if not resources.get(name, {}).get("complete")]
+        if incomplete:
+            raise ValueError(f"Snapshot in {snapshot_dir} is incomplete for {incomplete}; rerun the export to finish it.")
+        self.source = self.manifest.get("source")
+        if source and self.source != source:
+            raise ValueError(f"Snapshot in {snapshot_dir} was taken from {self.source}, not {source}")
+        self._lock = threading.Lock()
+        self._indexes: Dict[str, Dict[str, Any]] = {}
+        self._maps: Dict[tuple, Any] = {}
+        self._files: List[Any] = []
+        self._blocks: OrderedDict = OrderedDict()
+
+    def __enter__(self) -> "SnapshotReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Unmap the segments and close their files."""
+        with self._lock:
+            for mapped in self._maps.values():
+                mapped.close()
+            for f in self._files:
+                f.close()
+            self._maps.clear()
+            self._files.clear()
+            self._blocks.clear()
+
+    def _index(self, resource: str) -> Dict[str, Any]:
+        with self._lock:
+            index = self._indexes.get(resource)
+            if index is None:
+                index = {"entries": [], "by_id": {}, "by_customer": {}}
+                path = os.path.join(self.snapshot_dir, index_name(resource))
+                if os.path.exists(path):
+                    with open(path, "r", encoding="utf-8") as f:
+                        for line in f:
+                            record_id, customer_id, segment, offset, length, position = json.loads(line)
+                            entry = (segment, offset, length, position)
+                            index["entries"].append(entry)
+                            if record_id is not None:
+                                index["by_id"][record_id] = entry
+                            if customer_id is not None:
+                                index["by_customer"].setdefault(customer_id, []).append(entry)
+                self._indexes[resource] = index
+            return index
+
+    def _block(self, resource: str, segment: int, offset: int, length: int) -> List[Dict[str, Any]]:
+        key = (resource, segment, offset)
+        with self._lock:
+            records = self._blocks.get(key)
+            if records is not None:
+                self._blocks.move_to_end(key)
+                return records
+            mapped = self._maps.get((resource, segment))
+            if mapped is None:
+                f = open(os.path.join(self.snapshot_dir, segment_name(resource, segment)), "rb")
+                self._files.append(f)
+                mapped = self._maps[(resource, segment)] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            data = zlib.decompress(mapped[offset:offset + length], wbits=31)
+        records = [json.loads(line) for line in data.splitlines()]
+        with self._lock:
+            self._blocks[key] = records
+            if len(self._blocks) > BLOCK_CACHE_SIZE:
+                self._blocks.popitem(last=False)
+        return records
+
+    def _read(self, resource: str, entries) -> List[Dict[str, Any]]:
+        return [self._block(resource, segment, offset, length)[position] for segment, offset, length, position in entries]
+
+    def count(self, resource: str) -> int:
+        """Number of records of a resource."""
+        return len(self._index(resource)["entries"])
+
+    def get(self, resource: str, record_id) -> Dict[str, Any]:
+        """
+        Get one record by ID.
+
+        Returns:
+            Dict[str, Any]: The record, or None if the snapshot has no record with that ID.
+        """
+        entry = self._index(resource)["by_id"].get(record_id)
+        return self._read(resource, [entry])[0] if entry else None
+
+    def for_customer(self, resource: str, customer_id) -> List[Dict[str, Any]]:
+        """Get the records of a resource (e.g. 'tickets', 'contacts') that belong to a customer."""
+        return self._read(resource, self._index(resource)["by_customer"].get(customer_id, []))
+
+    def iter_records(self, resource: str) -> Iterator[Dict[str, Any]]:
+        """Stream every record of a resource in export order."""
+        state = self.manifest["resources"].get(resource) or {"segments": []}
+        for segment in state["segments"]:
+            with gzip.open(os.path.join(self.snapshot_dir, segment["file"]), "rb") as f:
+                for line in f:
+                    yield json.loads(line)
+
+    def records(self, resource: str) -> List[Dict[str, Any]]:
+        """Get every record of a resource."""
+        return list(self.iter_records(resource))
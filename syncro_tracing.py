@@ -0,0 +1,238 @@
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from functools import wraps
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List
+
+from syncro_configs import get_logger, LOG_DIR
+
+'''
+Local span tracing for migrations.
+
+Each customer or ticket migration runs inside a trace with its own trace ID;
+every API call made while it is active is recorded as a child span with its
+timing and status. Finished traces are appended to a JSONL file in LOG_DIR,
+and the slowest ones can be summarized at the end of a run.
+
+Tracing is off until enable_tracing() is called. The active trace lives in a
+context variable, so concurrent threads each see their own.
+'''
+
+logger = get_logger(__name__)
+
+SLOWEST_TRACES_KEPT = 20  # Per trace name, for the end-of-run summary
+
+_current_trace: ContextVar = ContextVar("syncro_current_trace", default=None)
+_tracing_enabled = False
+_trace_file = None
+_trace_path = None
+_trace_lock = threading.Lock()
+_slowest: Dict[str, List[tuple]] = {}  # Global trace name -> min-heap of (duration, seq, summary)
+_sequence = itertools.count()
+
+
+def enable_tracing(path: str = None) -> str:
+    """
+    Start recording traces.
+
+    Args:
+        path (str): JSONL output path; defaults to LOG_DIR/traces_<timestamp>.jsonl.
+
+    Returns:
+        str: The path traces are written to.
+    """
+    global _tracing_enabled, _trace_file, _trace_path
+    with _trace_lock:
+        if _trace_file is None:
+            _trace_path = path or os.path.join(LOG_DIR, f"traces_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+            _trace_file = open(_trace_path, "a", encoding="utf-8")
+        _tracing_enabled = True
+    logger.info(f"Tracing enabled, writing to {_trace_path}")
+    return _trace_path
+
+
+def close_tracing() -> None:
+    """Stop recording traces and close the trace file."""
+    global _tracing_enabled, _trace_file
+    with _trace_lock:
+        _tracing_enabled = False
+        if _trace_file is not None:
+            _trace_file.close()
+            _trace_file = None
+
+
+def current_trace_id() -> str:
+    """Get the ID of the active trace, or None."""
+    active = _current_trace.get()
+    return active["trace_id"] if active else None
+
+
+@contextmanager
+def trace(name: str, **attributes):
+    """
+    Run a block as a trace, e.g. one ticket migration.
+
+    A trace started while another is active records the outer one as its parent.
+
+    Args:
+        name (str): Trace name, e.g. 'customer' or 'ticket'.
+        **attributes: Identifying details such as ticket_id or subject.
+
+    Yields:
+        dict: The trace record (None when tracing is disabled); attributes may be added to it.
+    """
+    if not _tracing_enabled:
+        yield None
+        return
+
+    parent = _current_trace.get()
+    record = {
+        "trace_id": uuid.uuid4().hex[:16],
+        "parent_id": parent["trace_id"] if parent else None,
+        "name": name,
+        "attributes": attributes,
+        "started_at": datetime.now().isoformat(timespec="milliseconds"),
+        "status": "ok",
+        "spans": [],
+    }
+    started = time.perf_counter()
+    record["_started"] = started
+    token = _current_trace.set(record)
+    try:
+        yield record
+    except BaseException as e:
+        record["status"] = "error"
+        record["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_trace.reset(token)
+        record["duration_s"] = round(time.perf_counter() - started, 6)
+        del record["_started"]
+        _finish_trace(record)
+
+
+def traced(name: str, attributes=None):
+    """
+    Decorator that runs every call of a function as a trace.
+
+    Args:
+        name (str): Trace name.
+        attributes (Callable): Optional function of the call's arguments returning trace attributes.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _tracing_enabled:
+                return func(*args, **kwargs)
+            with trace(name, **(attributes(*args, **kwargs) if attributes else {})):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def mark_trace_error(message: str) -> None:
+    """Mark the active trace as failed, for code paths that handle their own exceptions."""
+    active = _current_trace.get()
+    if active is not None:
+        active["status"] = "error"
+        active["error"] = message
+
+
+def record_span(name: str, started: float, duration: float, **attributes) -> None:
+    """
+    Record a child span in the active trace, if any.
+
+    Args:
+        name (str): Span name, e.g. 'POST /tickets/{id}/comment'.
+        started (float): perf_counter() value when the span started.
+        duration (float): Span duration in seconds.
+        **attributes: Details such as status or tenant.
+    """
+    active = _current_trace.get()
+    if active is None:
+        return
+    active["spans"].append({
+        "name": name,
+        "offset_s": round(started - active["_started"], 6),
+        "duration_s": round(duration, 6),
+        **attributes,
+    })
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time a block as a child span of the active trace."""
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        record_span(name, started, time.perf_counter() - started, status=status, **attributes)
+
+
+def _finish_trace(record: Dict[str, Any]) -> None:
+    summary = {key: record[key] for key in ("trace_id", "name", "attributes", "status", "duration_s")}
+    summary["spans"] = _span_breakdown(record["spans"])
+    line = json.dumps(record, default=str)
+    with _trace_lock:
+        if _trace_file is not None:
+            _trace_file.write(line + "\n")
+            _trace_file.flush()
+        heap = _slowest.setdefault(record["name"], [])
+        entry = (record["duration_s"], next(_sequence), summary)
+        if len(heap) < SLOWEST_TRACES_KEPT:
+            heapq.heappush(heap, entry)
+        elif entry[0] > heap[0][0]:
+            heapq.heapreplace(heap, entry)
+
+
+def _span_breakdown(spans: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    breakdown: Dict[str, Dict[str, float]] = {}
+    for s in spans:
+        entry = breakdown.setdefault(s["name"], {"count": 0, "duration_s": 0.0})
+        entry["count"] += 1
+        entry["duration_s"] = round(entry["duration_s"] + s["duration_s"], 6)
+    return breakdown
+
+
+def slowest_traces(name: str = "ticket", limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Get the slowest finished traces with a given name.
+
+    Args:
+        name (str): Trace name.
+        limit (int): Maximum number of traces (at most SLOWEST_TRACES_KEPT).
+
+    Returns:
+        List[Dict[str, Any]]: Trace summaries with a per-span-name breakdown, slowest first.
+    """
+    with _trace_lock:
+        entries = sorted(_slowest.get(name, []), key=lambda entry: entry[0], reverse=True)
+    return [summary for _, _, summary in entries[:limit]]
+
+
+def format_slowest_traces(name: str = "ticket", limit: int = 10) -> str:
+    """
+    Render the slowest traces as text, with where their time went.
+
+    Returns:
+        str: One block per trace, e.g. '12.3s ticket 1a2b... {'subject': ...}' followed by its spans.
+    """
+    lines = [f"Slowest {name} traces:"]
+    for summary in slowest_traces(name, limit):
+        lines.append(f"  {summary['duration_s']:.3f}s {summary['trace_id']} {summary['status']} {summary['attributes']}")
+        for span_name, entry in sorted(summary["spans"].items(), key=lambda item: item[1]["duration_s"], reverse=True):
+            lines.append(f"      {entry['duration_s']:.3f}s  {entry['count']} x {span_name}")
+    if len(lines) == 1:
+        lines.append("  (none)")
+    return "\n".join(lines)
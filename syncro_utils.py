@@ -4,12 +4,18 @@ import time
 from datetime import datetime
 import json
 from functools import wraps
+from contextlib import contextmanager
+import threading
 import requests
 import logging
 import time
 from typing import Any, Dict, List
 import csv
-from syncro_configs import SYNCRO_API_BASE_URL, SYNCRO_API_KEY, get_logger, TEMP_FILE_PATH
+import hashlib
+import unicodedata
+from syncro_configs import SYNCRO_API_BASE_URL, SYNCRO_API_KEY, SYNCRO_API_CALL_DELAY, get_logger, TEMP_FILE_PATH
+from syncro_metrics import tenant_label
+from syncro_http import request_json
 
 import logging
 
@@ -94,6 +100,108 @@ logger = get_logger(__name__)
 print(f"Handlers for {logger.name}: {logger.handlers}")
 print(f"Handlers for root logger: {logging.getLogger().handlers}")
 
+_stage_timing_enabled = False  # Opt-in; see enable_stage_timing
+_stage_timings = {}  # Global stage name -> accumulated timing
+_stage_timings_lock = threading.Lock()
+
+
+def enable_stage_timing(enabled: bool = True) -> None:
+    """
+    Turn stage timing on or off. While off, timed stages cost a single flag check.
+
+    Args:
+        enabled (bool): Whether timed_stage and stage_timer record timings.
+    """
+    global _stage_timing_enabled
+    _stage_timing_enabled = enabled
+
+
+def record_stage_timing(name: str, wall_seconds: float, cpu_seconds: float) -> None:
+    """Add one run of a stage to the accumulated stage timings."""
+    with _stage_timings_lock:
+        timing = _stage_timings.setdefault(name, {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "max_wall_s": 0.0})
+        timing["calls"] += 1
+        timing["wall_s"] += wall_seconds
+        timing["cpu_s"] += cpu_seconds
+        timing["max_wall_s"] = max(timing["max_wall_s"], wall_seconds)
+
+
+@contextmanager
+def stage_timer(name: str):
+    """
+    Time a block as a named stage, if stage timing is enabled.
+
+    Wall time uses perf_counter; CPU time is the current thread's, so stages
+    running in worker threads are measured correctly.
+
+    Args:
+        name (str): Stage name, e.g. 'myfunction.customer'.
+    """
+    if not _stage_timing_enabled:
+        yield
+        return
+    wall_started, cpu_started = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        record_stage_timing(name, time.perf_counter() - wall_started, time.thread_time() - cpu_started)
+
+
+def timed_stage(name: str = None):
+    """
+    Decorator that times every call of a function as a stage (see stage_timer).
+
+    Args:
+        name (str): Stage name; defaults to the function name.
+    """
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _stage_timing_enabled:
+                return func(*args, **kwargs)
+            with stage_timer(stage_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def get_stage_timings() -> Dict[str, Dict[str, float]]:
+    """
+    Get the accumulated stage timings.
+
+    Returns:
+        Dict[str, Dict[str, float]]: {stage: {'calls', 'wall_s', 'cpu_s', 'max_wall_s', 'avg_wall_s'}},
+        sorted by total wall time.
+    """
+    with _stage_timings_lock:
+        timings = {name: dict(timing, avg_wall_s=timing["wall_s"] / timing["calls"])
+                   for name, timing in _stage_timings.items()}
+    return dict(sorted(timings.items(), key=lambda item: item[1]["wall_s"], reverse=True))
+
+
+def reset_stage_timings() -> None:
+    """Forget all accumulated stage timings."""
+    with _stage_timings_lock:
+        _stage_timings.clear()
+
+
+def write_stage_timings(path: str) -> None:
+    """
+    Write the accumulated stage timings to a JSON file and log a summary.
+
+    Args:
+        path (str): Output file path.
+    """
+    timings = get_stage_timings()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(timings, f, indent=2)
+    for stage_name, timing in timings.items():
+        logger.info(f"Stage {stage_name}: {timing['calls']} calls, {timing['wall_s']:.3f}s wall, {timing['cpu_s']:.3f}s CPU")
+    logger.info(f"Stage timings written to {path}")
+
+
 def get_customer_id_by_name(customer_name: str):#, logger: logging.Logger) -> int:
     """
     Retrieve customer ID from temp data based on matching customer name.
@@ -141,21 +249,22 @@ def get_customer_id_by_name(customer_name: str):#, logger: logging.Logger) -> in
         logger.error(f"An unexpected error occurred in get_customer_id_by_name: {e}")
         return None
   
-def syncro_api_call(method: str, endpoint: str, data: dict = None, params: dict = None):
+def syncro_api_call(method: str, endpoint: str, data: dict = None, params: dict = None, recover=None):
     """
     Generic API call to SyncroMSP.
 
+    Retryable errors are retried with backoff (see syncro_http.request_json).
+
     Args:
         method (str): HTTP method (e.g., 'POST', 'PUT', 'GET').
         endpoint (str): API endpoint.
         data (dict): JSON payload for the request (optional).
         params (dict): Query parameters for the request (optional).
+        recover (Callable): For POSTs, looks up whether a failed attempt took effect before it is retried (optional).
 
     Returns:
         dict: JSON response from the API.
     """
-    from syncro_read import increment_api_call_count
-    increment_api_call_count()
     url = f"{SYNCRO_API_BASE_URL}{endpoint}"
     headers = {
         "Authorization": f"Bearer {SYNCRO_API_KEY}",
@@ -164,16 +273,16 @@ def syncro_api_call(method: str, endpoint: str, data: dict = None, params: dict
     }
 
     try:
-        response = requests.request(method, url, headers=headers, json=data, params=params)
-        time.sleep(0.5)
-        response.raise_for_status()  # Raise HTTPError for bad responses
-        return response.json() if response.content else {}
+        return request_json(method, url, endpoint, tenant_label(SYNCRO_API_BASE_URL), headers,
+                            data=data, params=params, recover=recover)
     except requests.HTTPError as http_err:
         logger.error(f"HTTP error occurred: {http_err}")
         raise
     except requests.RequestException as req_err:
         logger.error(f"Request error occurred: {req_err}")
         raise
+    finally:
+        time.sleep(SYNCRO_API_CALL_DELAY)
 
 def check_duplicate_customer(customer_name: str, logger: logging.Logger) -> bool:
     """
@@ -206,8 +315,8 @@ def check_duplicate_customer(customer_name: str, logger: logging.Logger) -> bool
         # Extract and normalize business names from customers
         business_names = [customer.get("business_name", "").strip().lower() for customer in customers]
 
-        logger.info(f"Retrieved normalized business names: {business_names}")
-        logger.info(f"Checking for duplicate customer: {customer_name}")
+        logger.debug("Normalized business names: %s", business_names)
+        logger.info("Checking for duplicate customer: %s", customer_name)
 
         # Check for duplicate
         if normalized_customer_name in business_names:
@@ -224,13 +333,112 @@ def check_duplicate_customer(customer_name: str, logger: logging.Logger) -> bool
     except Exception as e:
         logger.error(f"An unexpected error occurred in check_duplicate_customer: {e}")
         return False
-def check_duplicate_contact(contact_name: str, logger: logging.Logger) -> bool:
+def normalize_contact_name(name: str) -> str:
+    """
+    Normalize a contact name for comparison: case-folded with whitespace collapsed.
+
+    Args:
+        name (str): The contact name.
+
+    Returns:
+        str: The normalized name, or an empty string if no name is given.
+    """
+    return " ".join(str(name or "").split()).casefold()
+
+def _contact_name(contact: dict) -> str:
+    """Return a contact's full name, falling back to first_name and last_name."""
+    name = contact.get("name")
+    if not name:
+        name = f"{contact.get('first_name') or ''} {contact.get('last_name') or ''}"
+    return normalize_contact_name(name)
+
+def _contact_customer_key(customer_id):
+    """Return the customer ID as a string so int and str IDs compare equal."""
+    return str(customer_id) if customer_id is not None else None
+
+def build_contact_index(contacts: List[Dict[str, Any]]) -> dict:
+    """
+    Build hash indexes over a list of contacts for O(1) duplicate checks.
+
+    Args:
+        contacts (List[Dict[str, Any]]): Contacts as returned by the Syncro API.
+
+    Returns:
+        dict: {"by_email": {(customer_id, email): contact_id}, "by_name": {(customer_id, name): contact_id}}.
+              Every name is also indexed under customer_id None for lookups across all customers.
+    """
+    contact_index = {"by_email": {}, "by_name": {}}
+    for contact in contacts:
+        add_contact_to_index(contact_index, contact)
+    return contact_index
+
+def add_contact_to_index(contact_index: dict, contact: dict) -> None:
+    """
+    Add a single contact to an index built by build_contact_index.
+
+    Args:
+        contact_index (dict): The index to update.
+        contact (dict): Contact details, as returned by the Syncro API or as sent to it.
+    """
+    customer_key = _contact_customer_key(contact.get("customer_id"))
+    contact_id = contact.get("id")
+
+    email = str(contact.get("email") or "").strip().lower()
+    if email:
+        contact_index["by_email"].setdefault((customer_key, email), contact_id)
+
+    name = _contact_name(contact)
+    if name:
+        contact_index["by_name"].setdefault((customer_key, name), contact_id)
+        contact_index["by_name"].setdefault((None, name), contact_id)
+
+_contact_index = None  # Contact index for duplicate checks, built once per run
+
+def get_contact_index(logger: logging.Logger, force_refresh: bool = False) -> dict:
     """
-    Check if a contact with the given name already exists using temp data.
+    Return the contact index, downloading the tenant's contacts only on first use.
+
+    Args:
+        logger (logging.Logger): Logger instance for logging.
+        force_refresh (bool): If True, discards the index and downloads the contacts again.
+
+    Returns:
+        dict: The contact index (see build_contact_index).
+    """
+    global _contact_index
+
+    if _contact_index is None or force_refresh:
+        from syncro_read import syncro_get_all_contacts
+
+        contacts = syncro_get_all_contacts()
+        _contact_index = build_contact_index(contacts)
+        logger.info(f"Built contact index from {len(contacts)} contacts.")
+
+    return _contact_index
+
+def register_contact(contact: dict, logger: logging.Logger) -> None:
+    """
+    Record a newly created contact in the contact index.
+
+    Args:
+        contact (dict): The created contact, ideally taken from the API response.
+        logger (logging.Logger): Logger instance for logging.
+    """
+    add_contact_to_index(get_contact_index(logger), contact)
+
+def check_duplicate_contact(contact_name: str, logger: logging.Logger, customer_id=None, email: str = None) -> bool:
+    """
+    Check if a contact already exists using the in-memory contact index.
+
+    A contact is a duplicate if the same customer already has a contact with the
+    same email, or with the same normalized name. Without a customer_id the name
+    is checked across all customers.
 
     Args:
         contact_name (str): Name of the contact to check.
         logger (logging.Logger): Logger instance for logging.
+        customer_id (int, optional): Customer the contact belongs to.
+        email (str, optional): Email address of the contact.
 
     Returns:
         bool: True if the contact exists, False otherwise.
@@ -241,39 +449,42 @@ def check_duplicate_contact(contact_name: str, logger: logging.Logger) -> bool:
         - Error if any issue occurs during execution.
     """
     try:
-        # Load temp data
-        temp_data = load_or_fetch_temp_data(logger, force_refresh=False)
-        contacts = temp_data.get("contacts", [])
+        contact_index = get_contact_index(logger)
+        customer_key = _contact_customer_key(customer_id)
 
-        if not contacts:
-            logger.warning("No contact data available. Ensure temp data is correctly loaded.")
-            return False
-
-        # Normalize input for case-insensitive comparison
-        normalized_contact_name = contact_name.strip().lower()
-
-        # Extract and normalize contact names
-        contact_names = [contact.get("name", "").strip().lower() for contact in contacts]
-
-        logger.info(f"Retrieved normalized contact names: {contact_names}")
-        logger.info(f"Checking for duplicate contact: {contact_name}")
+        normalized_email = str(email or "").strip().lower()
+        if normalized_email and (customer_key, normalized_email) in contact_index["by_email"]:
+            logger.warning(f"Duplicate contact found by email: {email} (customer ID {customer_id})")
+            return True
 
-        # Check for duplicate
-        if normalized_contact_name in contact_names:
-            logger.warning(f"Duplicate contact found: {contact_name}")
+        normalized_contact_name = normalize_contact_name(contact_name)
+        if normalized_contact_name and (customer_key, normalized_contact_name) in contact_index["by_name"]:
+            logger.warning(f"Duplicate contact found: {contact_name} (customer ID {customer_id})")
             return True
 
         logger.info(f"No duplicate found for contact: {contact_name}")
         return False
 
-    except KeyError as e:
-        logger.error(f"Key error while accessing contact data: {e}")
-        return False
-
     except Exception as e:
         logger.error(f"An unexpected error occurred in check_duplicate_contact: {e}")
         return False
 
+def comment_body_digest(body: str) -> str:
+    """
+    Build a digest of a comment body for duplicate detection.
+
+    The body is Unicode-normalized and its whitespace collapsed before hashing,
+    so re-wrapped or re-indented copies of the same comment produce the same digest.
+
+    Args:
+        body (str): The comment body.
+
+    Returns:
+        str: Hex SHA-1 digest of the normalized body.
+    """
+    normalized_body = " ".join(unicodedata.normalize("NFC", body or "").split())
+    return hashlib.sha1(normalized_body.encode("utf-8")).hexdigest()
+
 def extract_nested_key(data: dict, key_path: str):
     """
     Extract a nested key from a dictionary using dot notation.
@@ -378,6 +589,63 @@ def get_syncro_ticket_number(ticketNumber: str) -> str:
         logger.error(f"Error processing ticket number '{ticketNumber}': {e}")
         raise
 
+class TicketNumberSet:
+    """
+    Compact set of ticket numbers used for local collision checks.
+
+    Numeric ticket numbers are stored as bits in a bytearray, so membership
+    checks and inserts are O(1) and a tenant with a million tickets costs
+    roughly 125 KB. Numbers that are not purely numeric, or that are larger
+    than MAX_BITMAP_NUMBER, are kept in a regular set instead.
+    """
+
+    MAX_BITMAP_NUMBER = 64_000_000
+
+    def __init__(self, numbers=None):
+        self._bits = bytearray()
+        self._overflow = set()
+        self._count = 0
+        for number in numbers or []:
+            self.add(number)
+
+    @staticmethod
+    def _as_int(number):
+        text = str(number).strip() if number is not None else ""
+        if text.isdigit() and int(text) <= TicketNumberSet.MAX_BITMAP_NUMBER:
+            return int(text)
+        return None
+
+    def add(self, number) -> None:
+        """Add a ticket number to the set. None and blank numbers are ignored."""
+        if number is None or not str(number).strip():
+            return
+        value = self._as_int(number)
+        if value is None:
+            key = str(number).strip()
+            if key not in self._overflow:
+                self._overflow.add(key)
+                self._count += 1
+            return
+
+        byte_index, bit = divmod(value, 8)
+        if byte_index >= len(self._bits):
+            self._bits.extend(bytes(byte_index - len(self._bits) + 1))
+        if not self._bits[byte_index] & (1 << bit):
+            self._bits[byte_index] |= 1 << bit
+            self._count += 1
+
+    def __contains__(self, number) -> bool:
+        if number is None:
+            return False
+        value = self._as_int(number)
+        if value is None:
+            return str(number).strip() in self._overflow
+        byte_index, bit = divmod(value, 8)
+        return byte_index < len(self._bits) and bool(self._bits[byte_index] & (1 << bit))
+
+    def __len__(self) -> int:
+        return self._count
+
 def get_syncro_tech(tech_name: str):
     """
     Get the ID of a technician by name (case-insensitive).
@@ -829,6 +1097,7 @@ def syncro_get_all_comments_from_csv(logger: logging.Logger = None) -> List[Dict
         logger.error(f"An unexpected error occurred while loading comments: {e}")
         raise
 
+@timed_stage()
 def syncro_prepare_ticket_json(ticket):
     """
     Extract ticket data into variables and create a JSON package for Syncro ticket creation.
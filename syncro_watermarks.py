@@ -0,0 +1,157 @@
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable
+
+from syncro_configs import get_logger, WATERMARKS_PATH
+
+'''
+High-water marks for delta syncs.
+
+Stores, per tenant and per resource (customers, tickets, ...), the latest
+updated_at value that has been fully processed, so the next run only needs
+to look at records changed since then.
+'''
+
+logger = get_logger(__name__)
+
+_watermarks_lock = threading.Lock()
+
+
+def parse_timestamp(value: str):
+    """
+    Parse a Syncro ISO 8601 timestamp.
+
+    Args:
+        value (str): Timestamp such as '2024-12-21T09:00:00.000-05:00' or '2024-12-21T14:00:00Z'.
+
+    Returns:
+        datetime: The parsed timestamp, or None if the value is empty or unparseable.
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        logger.warning(f"Unrecognized timestamp: {value}")
+        return None
+    # Treat timestamps without an offset as UTC so they compare with offset-aware ones
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def load_watermarks(path: str = WATERMARKS_PATH) -> Dict[str, Dict[str, str]]:
+    """
+    Load all stored watermarks.
+
+    Args:
+        path (str): Path to the watermark file.
+
+    Returns:
+        Dict[str, Dict[str, str]]: {tenant: {resource: updated_at}}.
+    """
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.error(f"Failed to load watermarks from {path}: {e}")
+        return {}
+
+
+def get_watermark(tenant: str, resource: str, path: str = WATERMARKS_PATH) -> str:
+    """
+    Get the stored watermark for a tenant resource.
+
+    Args:
+        tenant (str): Tenant identifier (its base URL).
+        resource (str): Resource name, e.g. 'customers' or 'tickets'.
+        path (str): Path to the watermark file.
+
+    Returns:
+        str: The stored updated_at value, or None if the resource has never been synced.
+    """
+    return load_watermarks(path).get(tenant, {}).get(resource)
+
+
+def set_watermark(tenant: str, resource: str, value: str, path: str = WATERMARKS_PATH) -> None:
+    """
+    Store the watermark for a tenant resource. The file is replaced atomically.
+
+    Args:
+        tenant (str): Tenant identifier (its base URL).
+        resource (str): Resource name, e.g. 'customers' or 'tickets'.
+        value (str): The latest processed updated_at value.
+        path (str): Path to the watermark file.
+    """
+    with _watermarks_lock:
+        watermarks = load_watermarks(path)
+        watermarks.setdefault(tenant, {})[resource] = value
+
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(watermarks, f, indent=2)
+        os.replace(temp_path, path)
+
+    logger.info(f"Watermark for {tenant} {resource} set to {value}")
+
+
+def is_newer(record: Dict[str, Any], watermark: str) -> bool:
+    """
+    Check whether a record was updated after the watermark.
+
+    Records without a parseable updated_at are treated as changed.
+
+    Args:
+        record (Dict[str, Any]): A Syncro record with an updated_at field.
+        watermark (str): The watermark, or None to accept every record.
+
+    Returns:
+        bool: True if the record is newer than the watermark.
+    """
+    since = parse_timestamp(watermark)
+    updated_at = parse_timestamp(record.get("updated_at"))
+    if since is None or updated_at is None:
+        return True
+    return updated_at > since
+
+
+def latest_updated_at(records: Iterable[Dict[str, Any]], current: str = None) -> str:
+    """
+    Find the newest updated_at value among some records.
+
+    Args:
+        records (Iterable[Dict[str, Any]]): Records with an updated_at field.
+        current (str): The current watermark, returned if no record is newer.
+
+    Returns:
+        str: The newest updated_at value.
+    """
+    latest, latest_parsed = current, parse_timestamp(current)
+    for record in records:
+        parsed = parse_timestamp(record.get("updated_at"))
+        if parsed is not None and (latest_parsed is None or parsed > latest_parsed):
+            latest, latest_parsed = record.get("updated_at"), parsed
+    return latest
+
+
+def hold_back_watermark(watermark: str, failed: Iterable[Dict[str, Any]]) -> str:
+    """
+    Keep a new watermark below the oldest record that failed to sync, so the next delta run retries it.
+
+    Args:
+        watermark (str): The watermark the run would set.
+        failed (Iterable[Dict[str, Any]]): Records that failed, with an updated_at field.
+
+    Returns:
+        str: The watermark, or just before the oldest failed updated_at if that is not newer.
+    """
+    oldest = min((parsed for parsed in (parse_timestamp(record.get("updated_at")) for record in failed) if parsed is not None),
+                 default=None)
+    current = parse_timestamp(watermark)
+    if oldest is None or (current is not None and oldest > current):
+        return watermark
+    held = (oldest - timedelta(microseconds=1)).isoformat()
+    logger.warning(f"Holding the watermark at {held} instead of {watermark}, before the oldest failed record")
+    return held
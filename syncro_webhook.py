@@ -0,0 +1,293 @@
+import argparse
+import glob
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List
+
+import requests
+
+from syncro_configs import get_logger, WEBHOOK_HOST, WEBHOOK_PORT, WEBHOOK_COALESCE_SECONDS
+
+'''
+Event-driven continuous sync.
+
+A small HTTP receiver accepts Syncro ticket and comment webhook payloads,
+queues them, coalesces bursts for the same ticket, and hands each ticket to a
+replicate callback once it has been quiet for WEBHOOK_COALESCE_SECONDS. A
+backstop callback (normally a delta sync) runs periodically to catch anything
+the webhooks missed.
+
+Recorded payloads can be replayed against a running receiver with:
+    python syncro_webhook.py send http://127.0.0.1:8765 "Test Data Webhooks/*.json"
+'''
+
+logger = get_logger(__name__)
+
+
+def extract_ticket_id(payload: Dict[str, Any]):
+    """
+    Find the ticket a webhook payload refers to.
+
+    Accepts Syncro-style payloads wrapped in 'attributes', 'ticket' or 'comment',
+    or a bare record. Comment payloads are recognised by their 'ticket_id'; a record's
+    own 'id' is only used for tickets, never for a 'comment' payload.
+
+    Args:
+        payload (Dict[str, Any]): The decoded webhook body.
+
+    Returns:
+        int: The source ticket ID, or None if the payload does not refer to a ticket.
+    """
+    if not isinstance(payload, dict):
+        return None
+    for wrapper in ("attributes", "ticket", "comment"):
+        if isinstance(payload.get(wrapper), dict):
+            record = payload[wrapper]
+            break
+    else:
+        wrapper, record = None, payload
+
+    ticket_id = record.get("ticket_id")
+    if ticket_id is None and wrapper != "comment":
+        ticket_id = record.get("id")
+    try:
+        return int(ticket_id) if ticket_id is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class CoalescingQueue:
+    """
+    Queue of ticket IDs where repeated events for the same ticket are merged.
+
+    A ticket becomes due once no new event has arrived for it for coalesce_seconds,
+    so a burst of comment notifications results in a single replication.
+    """
+
+    def __init__(self, coalesce_seconds: float = WEBHOOK_COALESCE_SECONDS):
+        self.coalesce_seconds = coalesce_seconds
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._condition = threading.Condition()
+
+    def put(self, ticket_id: int, payload: Dict[str, Any]) -> None:
+        """Queue an event for a ticket, merging it with any pending event for the same ticket."""
+        with self._condition:
+            entry = self._pending.setdefault(ticket_id, {"events": 0})
+            entry["events"] += 1
+            entry["payload"] = payload
+            entry["due"] = time.monotonic() + self.coalesce_seconds
+            self._condition.notify()
+
+    def get(self, timeout: float = None):
+        """
+        Wait for the next due ticket.
+
+        Args:
+            timeout (float): Maximum time to wait in seconds, or None to wait indefinitely.
+
+        Returns:
+            tuple: (ticket_id, latest payload, number of coalesced events), or None on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                if self._pending:
+                    ticket_id, entry = min(self._pending.items(), key=lambda item: item[1]["due"])
+                    if entry["due"] <= now:
+                        del self._pending[ticket_id]
+                        return ticket_id, entry["payload"], entry["events"]
+                    wait = entry["due"] - now
+                else:
+                    wait = None
+
+                if deadline is not None:
+                    if now >= deadline:
+                        return None
+                    wait = deadline - now if wait is None else min(wait, deadline - now)
+                self._condition.wait(wait)
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._pending)
+
+
+class WebhookSync:
+    """
+    Runs the webhook receiver, the replication worker and the polling backstop.
+
+    Args:
+        replicate (Callable[[int], Any]): Replicates one source ticket (by ID) into the destination.
+        backstop (Callable[[], Any]): Periodic catch-up sync, e.g. a delta sync. Optional.
+        backstop_interval (float): Seconds between backstop runs.
+        coalesce_seconds (float): Quiet period before a ticket with pending events is replicated.
+    """
+
+    def __init__(self, replicate: Callable[[int], Any], backstop: Callable[[], Any] = None,
+                 backstop_interval: float = 3600, coalesce_seconds: float = WEBHOOK_COALESCE_SECONDS):
+        self.replicate = replicate
+        self.backstop = backstop
+        self.backstop_interval = backstop_interval
+        self.queue = CoalescingQueue(coalesce_seconds)
+        self.stats = {"received": 0, "ignored": 0, "replicated": 0, "failed": 0, "backstop_runs": 0}
+        self._sync_lock = threading.Lock()  # Replication and backstop never run at the same time
+        self._stats_lock = threading.Lock()  # Counters are updated from the receiver and worker threads
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._server = None
+
+    def enqueue_payload(self, payload: Dict[str, Any]) -> bool:
+        """
+        Queue a decoded webhook payload.
+
+        Returns:
+            bool: True if the payload referred to a ticket and was queued.
+        """
+        self._count("received")
+        ticket_id = extract_ticket_id(payload)
+        if ticket_id is None:
+            self._count("ignored")
+            logger.warning("Ignoring webhook payload without a ticket ID.")
+            return False
+        self.queue.put(ticket_id, payload)
+        return True
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def stats_snapshot(self) -> Dict[str, int]:
+        """Get a consistent copy of the counters."""
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def _worker(self) -> None:
+        while not self._stop.is_set():
+            item = self.queue.get(timeout=1)
+            if item is None:
+                continue
+            ticket_id, _payload, events = item
+            logger.info(f"Replicating ticket {ticket_id} ({events} coalesced events)")
+            with self._sync_lock:
+                try:
+                    self.replicate(ticket_id)
+                    self._count("replicated")
+                except Exception as e:
+                    self._count("failed")
+                    logger.error(f"Failed to replicate ticket {ticket_id}: {e}")
+
+    def _backstop_loop(self) -> None:
+        while not self._stop.wait(self.backstop_interval):
+            logger.info("Running polling backstop...")
+            with self._sync_lock:
+                try:
+                    self.backstop()
+                    self._count("backstop_runs")
+                except Exception as e:
+                    logger.error(f"Polling backstop failed: {e}")
+
+    def _make_handler(self):
+        sync = self
+
+        class WebhookHandler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    self.send_response(400)
+                    self.end_headers()
+                    return
+                queued = sync.enqueue_payload(payload)
+                self.send_response(202 if queued else 200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(json.dumps({"queued": queued}).encode("utf-8"))
+
+            def do_GET(self):
+                body = json.dumps(dict(sync.stats_snapshot(), pending=len(sync.queue))).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.info(f"Webhook {self.address_string()} - {format % args}")
+
+        return WebhookHandler
+
+    def start(self, host: str = WEBHOOK_HOST, port: int = WEBHOOK_PORT) -> int:
+        """
+        Start the receiver, the worker and (if configured) the backstop in background threads.
+
+        Returns:
+            int: The port the receiver is listening on (useful when port 0 is requested).
+        """
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        targets = [self._server.serve_forever, self._worker]
+        if self.backstop:
+            targets.append(self._backstop_loop)
+        for target in targets:
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        port = self._server.server_address[1]
+        logger.info(f"Webhook receiver listening on {host}:{port}")
+        return port
+
+    def stop(self) -> None:
+        """Stop the receiver and background threads."""
+        self._stop.set()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+    def run_forever(self, host: str = WEBHOOK_HOST, port: int = WEBHOOK_PORT) -> None:
+        """Start the receiver and block until interrupted."""
+        self.start(host, port)
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            logger.info("Stopping webhook receiver...")
+        finally:
+            self.stop()
+
+
+def post_recorded_payloads(url: str, paths: List[str]) -> List[int]:
+    """
+    Send recorded webhook payloads to a running receiver.
+
+    Args:
+        url (str): The receiver URL, e.g. 'http://127.0.0.1:8765'.
+        paths (List[str]): JSON files, each holding one payload or a list of payloads.
+
+    Returns:
+        List[int]: The HTTP status of each request.
+    """
+    statuses = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            recorded = json.load(f)
+        for payload in recorded if isinstance(recorded, list) else [recorded]:
+            response = requests.post(url, json=payload, timeout=10)
+            statuses.append(response.status_code)
+            logger.info(f"Sent recorded payload from {path}: HTTP {response.status_code}")
+    return statuses
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded Syncro webhook payloads against a running receiver.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    send_parser = subparsers.add_parser("send", help="Post recorded payload files to a receiver.")
+    send_parser.add_argument("url", help="Receiver URL, e.g. http://127.0.0.1:8765")
+    send_parser.add_argument("patterns", nargs="+", help="Payload files or glob patterns.")
+    args = parser.parse_args()
+
+    files = sorted(path for pattern in args.patterns for path in glob.glob(pattern))
+    print(post_recorded_payloads(args.url, files))
@@ -1,9 +1,11 @@
 import os
 import logging
 import sys
-from syncro_utils import syncro_api_call, check_duplicate_customer, check_duplicate_contact
-from syncro_configs import get_logger
-from syncro_read import syncro_get_all_contacts
+from syncro_utils import syncro_api_call, check_duplicate_customer, check_duplicate_contact, comment_body_digest, register_contact, timed_stage
+from syncro_configs import get_logger, LogPayload
+from syncro_tracing import traced
+from syncro_progress import progress_advance
+from syncro_deadletter import dead_letter
 import requests
 
 
@@ -16,6 +18,75 @@ logger = get_logger(__name__)
 print(f"Handlers for {logger.name}: {logger.handlers}")
 print(f"Handlers for root logger: {logging.getLogger().handlers}")
 
+_dest_ticket_numbers = None  # Prefetched destination ticket numbers for collision checks
+_ticket_comment_digests = {}  # ticket number -> {"id": ticket ID, "digests": set of comment body digests}
+
+def load_dest_ticket_numbers(force_refresh: bool = False):
+    """
+    Prefetch every ticket number in the destination tenant, once per run.
+
+    Args:
+        force_refresh (bool): If True, discards the cached numbers and fetches them again.
+
+    Returns:
+        TicketNumberSet: Ticket numbers already taken in the destination tenant.
+    """
+    from syncro_read import syncro_get_all_ticket_numbers
+    global _dest_ticket_numbers
+
+    if _dest_ticket_numbers is None or force_refresh:
+        logger.info("Prefetching destination ticket numbers for collision checks...")
+        _dest_ticket_numbers = syncro_get_all_ticket_numbers()
+
+    return _dest_ticket_numbers
+
+def _find_ticket_response(ticket_number: str) -> dict:
+    # Shape an existing ticket like a create response, or None if there is none with that number
+    from syncro_read import get_syncro_ticket_by_number
+
+    ticket = get_syncro_ticket_by_number(ticket_number)
+    return {"ticket": ticket} if ticket else None
+
+
+def _find_comment_response(ticket_number: str, body_digest: str) -> dict:
+    # Shape an existing comment like a create response, or None if the ticket has no comment with that body
+    from syncro_read import get_syncro_ticket_by_number
+
+    ticket = get_syncro_ticket_by_number(ticket_number) or {}
+    comment = next((comment for comment in ticket.get("comments") or []
+                    if comment_body_digest(comment.get("body")) == body_digest), None)
+    return {"comment": comment} if comment else None
+
+
+def load_ticket_comment_digests(ticket_number: str) -> dict:
+    """
+    Look up a destination ticket and the digests of its existing comments, once per ticket.
+
+    Args:
+        ticket_number (str): The number of the ticket.
+
+    Returns:
+        dict: {"id": ticket ID, "digests": set of comment body digests}, or None if the ticket is not found.
+    """
+    from syncro_read import get_syncro_ticket_by_number
+
+    cached = _ticket_comment_digests.get(ticket_number)
+    if cached is not None:
+        return cached
+
+    existing_ticket = get_syncro_ticket_by_number(ticket_number)
+    if existing_ticket is None:
+        return None
+
+    existing_comments = existing_ticket.get("comments") or []
+    cached = {
+        "id": existing_ticket.get("id"),
+        "digests": {comment_body_digest(comment.get("body")) for comment in existing_comments},
+    }
+    logger.info(f"Indexed {len(cached['digests'])} existing comment digests for ticket number '{ticket_number}'")
+    _ticket_comment_digests[ticket_number] = cached
+    return cached
+
 def syncro_create_customer(customer_data: dict):
     """
     Create a new customer in SyncroMSP.
@@ -58,18 +129,26 @@ def syncro_create_contact(contact_data: dict):
         dict: Response data from the API, or None if an error occurs.
     """
     endpoint = "/contacts"
-    existing_contacts = syncro_get_all_contacts()
-    duplicate = check_duplicate_contact(existing_contacts, contact_data, "email", customer_id=contact_data.get("customer_id"))
+    contact_name = contact_data.get("name") or f"{contact_data.get('first_name') or ''} {contact_data.get('last_name') or ''}"
+    duplicate = check_duplicate_contact(
+        contact_name,
+        logger,
+        customer_id=contact_data.get("customer_id"),
+        email=contact_data.get("email"),
+    )
     if duplicate:
-        logger.warning(f"Duplicate contact found under customer ID {contact_data.get('customer_id')}: {duplicate}")
+        logger.warning(f"Duplicate contact found under customer ID {contact_data.get('customer_id')}: {contact_name.strip()}")
         return None
     response = syncro_api_call("POST", endpoint, data=contact_data)
     if response:
+        register_contact(response.get("contact") or contact_data, logger)
         logger.info(f"Successfully created contact: {response.get('contact', {}).get('first_name', 'Unknown')} {response.get('contact', {}).get('last_name', '')}")
     else:
         logger.error("Failed to create contact.")
     return response
 
+@timed_stage()
+@traced("ticket", lambda ticket_data, *args, **kwargs: {"number": ticket_data.get("number"), "subject": ticket_data.get("subject")})
 def syncro_create_ticket(ticket_data: dict) -> dict:
     """
     Create a new ticket in SyncroMSP using the specified fields.
@@ -80,8 +159,6 @@ def syncro_create_ticket(ticket_data: dict) -> dict:
     Returns:
         dict: Response data from the API, or None if an error occurs.
     """
-    from syncro_read import get_syncro_ticket_by_number, increment_api_call_count
-
     endpoint = "/tickets"
     try:
         # Extract the ticket number from the payload
@@ -90,9 +167,9 @@ def syncro_create_ticket(ticket_data: dict) -> dict:
             logger.error("Ticket number is missing from the payload.")
             return None
 
-        # Check if the ticket number already exists
-        existing_ticket = get_syncro_ticket_by_number(ticket_number)
-        if existing_ticket:
+        # Check if the ticket number already exists (local lookup, no API call)
+        taken_numbers = load_dest_ticket_numbers()
+        if ticket_number in taken_numbers:
             logger.warning(f"Ticket number '{ticket_number}' already taken. Skipping ticket creation.")
             return None
 
@@ -100,18 +177,22 @@ def syncro_create_ticket(ticket_data: dict) -> dict:
         payload = ticket_data        
 
         # Log the prepared payload
-        logger.info(f"Creating a ticket with payload: {payload}")
+        logger.info("Creating ticket number %s with payload: %s", ticket_number, LogPayload(payload))
+        logger.debug("Full ticket payload: %s", payload)
 
-        # Send the API call
-        increment_api_call_count()
-        response = syncro_api_call("POST", endpoint, data=payload)
+        # Send the API call; before a retry, check whether the ticket number now exists
+        response = syncro_api_call("POST", endpoint, data=payload, recover=lambda: _find_ticket_response(ticket_number))
 
         # Handle the response
         if response and "error" not in response:
-            logger.info(f"Successfully created ticket: {response.get('ticket', {}).get('number', 'Unknown')}")
+            created_number = response.get('ticket', {}).get('number', ticket_number)
+            taken_numbers.add(created_number)
+            logger.info(f"Successfully created ticket: {created_number}")
+            progress_advance("tickets")
             return response
         else:
             logger.error(f"Failed to create ticket. Response: {response}")
+            dead_letter("csv_ticket", ticket_data, f"Error response: {response}")
             return None
 
     except requests.exceptions.HTTPError as http_err:
@@ -119,11 +200,13 @@ def syncro_create_ticket(ticket_data: dict) -> dict:
         logger.error(f"HTTP error occurred: {http_err}")
         if hasattr(http_err, 'response') and http_err.response is not None:
             logger.error(f"Response content: {http_err.response.text}")
+        dead_letter("csv_ticket", ticket_data, http_err)
         return None
 
     except Exception as e:
         # Log unexpected errors
         logger.error(f"Unexpected error occurred while creating ticket: {e}")
+        dead_letter("csv_ticket", ticket_data, e)
         return None
 
 
@@ -137,7 +220,6 @@ def syncro_create_comment(comment_data: dict) -> dict:
     Returns:
         dict: Response data from the API, or None if an error occurs.
     """
-    from syncro_read import get_syncro_ticket_by_number, increment_api_call_count
     from pprint import pprint
 
     try:
@@ -147,49 +229,45 @@ def syncro_create_comment(comment_data: dict) -> dict:
             logger.error("Ticket number is missing from the payload.")
             return None
 
-        # Check if the ticket number already exists
-        existing_ticket = get_syncro_ticket_by_number(ticket_number)
-        if existing_ticket is None:
+        # Look up the ticket and its comment digests (fetched once per ticket)
+        ticket_comments = load_ticket_comment_digests(ticket_number)
+        if ticket_comments is None:
             logger.warning(f"Ticket number '{ticket_number}' is not found. Skipping comment creation.")
             return None
 
         # Extract ticket ID
-        ticket_id = existing_ticket.get("id")
+        ticket_id = ticket_comments.get("id")
         if not ticket_id:
             logger.error(f"Failed to retrieve ticket ID for ticket number '{ticket_number}'.")
             return None
-        
-        existing_comments = existing_ticket.get("comments", [])
-        if existing_comments is not None:
-            logger.info(f"Found Existing {len(existing_comments)} comments for ticket number '{ticket_number}' ")
-            for comment in existing_comments:
-                logger.info(f"Comparing existing comment body: {comment.get('body')} with new comment body: {comment_data.get('body')}")
-                if comment.get("body") == comment_data.get("body"):
-                    logger.warning(f"Comment already exists for ticket number '{ticket_number}'. Skipping comment creation.")
-                    return None  # Move to the next comment 
-        else:
-            logger.info(f"No existing comments for ticket number '{ticket_number}'.")
-            
+
+        body_digest = comment_body_digest(comment_data.get("body"))
+        if body_digest in ticket_comments["digests"]:
+            logger.warning(f"Comment {body_digest} already exists for ticket number '{ticket_number}'. Skipping comment creation.")
+            return None
 
         endpoint = f"/tickets/{ticket_id}/comment"
         
         # Prepare the ticket payload using the provided fields
         payload = comment_data
 
-        # Log the prepared payload
-        logger.info(f"Creating a ticket with payload: {payload}")
+        # Log the comment digest rather than the full body
+        logger.info(f"Creating comment {body_digest} on ticket number '{ticket_number}'")
 
         # Send the API call
-        increment_api_call_count()
         #pprint(payload)
-        response = syncro_api_call("POST", endpoint, data=payload)
+        response = syncro_api_call("POST", endpoint, data=payload,
+                                   recover=lambda: _find_comment_response(ticket_number, body_digest))
         
         # Handle the response
         if response and "error" not in response:
-            logger.info(f"Successfully created ticket: {response.get('ticket', {}).get('number', 'Unknown')}")
+            ticket_comments["digests"].add(body_digest)
+            logger.info(f"Successfully created comment {body_digest} on ticket number '{ticket_number}'")
+            progress_advance("comments")
             return response
         else:
             logger.error(f"Failed to create ticket. Response: {response}")
+            dead_letter("csv_comment", comment_data, f"Error response: {response}")
             return None
         
     except requests.exceptions.HTTPError as http_err:
@@ -197,11 +275,13 @@ def syncro_create_comment(comment_data: dict) -> dict:
         logger.error(f"HTTP error occurred: {http_err}")
         if hasattr(http_err, 'response') and http_err.response is not None:
             logger.error(f"Response content: {http_err.response.text}")
+        dead_letter("csv_comment", comment_data, http_err)
         return None
 
     except Exception as e:
         # Log unexpected errors
         logger.error(f"Unexpected error occurred while creating ticket: {e}")
+        dead_letter("csv_comment", comment_data, e)
         return None
 
 
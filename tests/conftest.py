@@ -0,0 +1,57 @@
+import json
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The modules live at the repository root; the mock Syncro server lives in benchmarks/
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+# Keep the stores syncro_configs opens at import time out of the working tree, and use a
+# placeholder tenant config so importing Syncro_To_Syncro doesn't prompt for one
+_work_dir = tempfile.mkdtemp(prefix="syncro_tests_")
+_tenants_config = os.path.join(_work_dir, "syncro_tenants.json")
+with open(_tenants_config, "w", encoding="utf-8") as f:
+    json.dump({"source": {"api_key": "test", "base_url": "http://source.invalid/api/v1"},
+               "destination": {"api_key": "test", "base_url": "http://destination.invalid/api/v1"}}, f)
+os.environ.setdefault("SYNCRO_TENANTS_CONFIG", _tenants_config)
+os.environ.setdefault("SYNCRO_IDEMPOTENCY_PATH", os.path.join(_work_dir, "syncro_idempotency.jsonl"))
+os.environ.setdefault("SYNCRO_DEAD_LETTER_PATH", os.path.join(_work_dir, "syncro_dead_letters.jsonl"))
+os.environ.setdefault("SYNCRO_API_CALL_DELAY", "0")
+
+
+@pytest.fixture
+def migration(monkeypatch, tmp_path):
+    """The Syncro_To_Syncro module, run from a temporary directory so watermarks and contact maps stay there."""
+    monkeypatch.chdir(tmp_path)
+    import Syncro_To_Syncro
+    return Syncro_To_Syncro
+
+
+@pytest.fixture
+def mock_tenants(migration, monkeypatch):
+    """
+    Start mock source and destination servers and point the migration at them.
+
+    Returns a function taking the source and destination seed data and returning both MockSyncroTenants.
+    """
+    from mock_syncro_server import MockSyncroServer, MockSyncroTenant
+
+    servers = []
+
+    def start(source_seed, dest_seed):
+        tenants = []
+        for role, seed_data in (("source", source_seed), ("dest", dest_seed)):
+            tenant = MockSyncroTenant(seed_data)
+            server = MockSyncroServer(tenant)
+            servers.append(server)
+            monkeypatch.setattr(migration, f"syncro_tenant_{role}_base_url", server.start())
+            tenants.append(tenant)
+        return tuple(tenants)
+
+    yield start
+    for server in servers:
+        server.stop()
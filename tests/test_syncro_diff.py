@@ -0,0 +1,65 @@
+import os
+
+from syncro_diff import diff_sorted_runs, external_diff, iter_jsonl, merge_join, merge_runs, sort_to_runs
+
+
+def ticket(ticket_id, subject, customer="Acme LLC", content_hash="a"):
+    return {"id": ticket_id, "subject": subject, "customer_business": customer, "content_hash": content_hash}
+
+
+def join(tmp_path, source, dest, max_records_in_memory=2):
+    source_runs = sort_to_runs(source, str(tmp_path), "source", max_records_in_memory)
+    dest_runs = sort_to_runs(dest, str(tmp_path), "dest", max_records_in_memory)
+    return sorted((status, source_record["id"], dest_record and dest_record["id"])
+                  for status, source_record, dest_record in merge_join(source_runs, dest_runs))
+
+
+def test_merge_join_matches_duplicate_keys_on_both_sides(tmp_path):
+    source = [ticket(1, "Printer"), ticket(2, "Printer", content_hash="b"), ticket(3, "Email")]
+    dest = [ticket(10, "Printer", content_hash="b"), ticket(11, "Printer", content_hash="c")]
+
+    assert join(tmp_path, source, dest) == [
+        ("already_present", 2, 10),
+        ("changed", 1, 10),
+        ("to_create", 3, None),
+    ]
+
+
+def test_merge_join_with_empty_destination_creates_everything(tmp_path):
+    source = [ticket(1, "Printer"), ticket(2, "Printer"), ticket(3, "Email")]
+
+    assert join(tmp_path, source, []) == [("to_create", 1, None), ("to_create", 2, None), ("to_create", 3, None)]
+
+
+def test_merge_join_with_empty_source_yields_nothing(tmp_path):
+    assert join(tmp_path, [], [ticket(10, "Printer"), ticket(11, "Email")]) == []
+
+
+def test_merge_runs_caps_the_fan_in_and_keeps_the_order(tmp_path):
+    records = [ticket(ticket_id, f"Ticket {ticket_id}") for ticket_id in range(20)]
+    runs = sort_to_runs(records, str(tmp_path), "source", max_records_in_memory=2)
+    assert len(runs) == 10
+
+    merged = merge_runs(runs, str(tmp_path), "source", max_fan_in=3)
+
+    assert len(merged) <= 3
+    assert not any(os.path.exists(path) for path in runs if path not in merged)
+    merged_records = [record for path in merged for record in iter_jsonl(path)]
+    assert sorted(record["id"] for record in merged_records) == list(range(20))
+    for path in merged:
+        keys = [record["key"] for record in iter_jsonl(path)]
+        assert keys == sorted(keys)
+
+
+def test_diff_sorted_runs_gives_the_same_result_with_multi_pass_merging(tmp_path):
+    source = [ticket(ticket_id, f"Ticket {ticket_id % 7}", content_hash=str(ticket_id % 2)) for ticket_id in range(30)]
+    dest = [ticket(100 + ticket_id, f"Ticket {ticket_id}") for ticket_id in range(4)]
+
+    single_pass = external_diff(source, dest, str(tmp_path / "single"), max_records_in_memory=1000)
+    source_runs = sort_to_runs(source, str(tmp_path), "source", max_records_in_memory=2)
+    dest_runs = sort_to_runs(dest, str(tmp_path), "dest", max_records_in_memory=1)
+    multi_pass = diff_sorted_runs(source_runs, dest_runs, str(tmp_path), max_fan_in=2)
+
+    assert multi_pass["counts"] == single_pass["counts"]
+    for status in ("to_create", "already_present", "changed"):
+        assert sorted(map(str, iter_jsonl(multi_pass[status]))) == sorted(map(str, iter_jsonl(single_pass[status])))
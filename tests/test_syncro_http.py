@@ -0,0 +1,206 @@
+import itertools
+import time
+
+import pytest
+import requests
+
+import syncro_http
+from syncro_http import CircuitBreaker, CircuitOpenError, IdempotencyStore, backoff_delay, parse_retry_after, request_json
+
+_tenants = itertools.count()
+
+
+def make_response(status: int, body: bytes = b"{}", headers: dict = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers.update(headers or {})
+    return response
+
+
+@pytest.fixture
+def tenant():
+    """A fresh tenant label, so each test gets its own circuit breaker and concurrency limiter."""
+    return f"test-tenant-{next(_tenants)}"
+
+
+class FakeClock:
+    """Stands in for the time module in syncro_http: monotonic time only moves when sleep() is called."""
+
+    perf_counter = staticmethod(time.perf_counter)
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace syncro_http's clock, so backoff sleeps are recorded and breaker resets need no waiting."""
+    fake = FakeClock()
+    monkeypatch.setattr(syncro_http, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def responses(monkeypatch):
+    """Queue responses (or exceptions) for requests.request; records the methods called."""
+    queue, calls = [], []
+
+    def fake_request(method, url, **kwargs):
+        calls.append(method)
+        outcome = queue.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(syncro_http.requests, "request", fake_request)
+    return queue, calls
+
+
+def call(tenant, method="GET", **kwargs):
+    return request_json(method, "http://syncro.test/api/v1/tickets", "tickets", tenant, {}, **kwargs)
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold_and_rejects(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_seconds=60)
+        for _ in range(2):
+            breaker.record_failure()
+        assert breaker.state == "closed" and breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert not breaker.allow()
+
+    def test_half_open_allows_one_trial(self, clock):
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+        breaker.record_failure()
+        clock.now += 31
+        assert breaker.state == "half_open"
+        assert breaker.allow()
+        assert not breaker.allow()
+
+    def test_trial_success_closes(self, clock):
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+        breaker.record_failure()
+        clock.now += 31
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == "closed" and breaker.allow()
+
+    def test_trial_failure_reopens(self, clock):
+        breaker = CircuitBreaker(failure_threshold=5, reset_seconds=30)
+        for _ in range(5):
+            breaker.record_failure()
+        clock.now += 31
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert not breaker.allow()
+
+
+class TestRequestJson:
+    def test_retries_server_errors(self, tenant, responses, clock):
+        queue, calls = responses
+        queue += [make_response(503), make_response(200, b'{"ok": true}')]
+        assert call(tenant) == {"ok": True}
+        assert len(calls) == 2 and len(clock.sleeps) == 1
+
+    def test_raises_after_max_retries(self, tenant, responses, clock):
+        queue, calls = responses
+        queue += [make_response(500)] * 3
+        with pytest.raises(requests.HTTPError):
+            call(tenant, max_retries=2)
+        assert len(calls) == 3
+
+    def test_non_retryable_status_raises_immediately(self, tenant, responses, clock):
+        queue, calls = responses
+        queue.append(make_response(422))
+        with pytest.raises(requests.HTTPError):
+            call(tenant, method="POST")
+        assert len(calls) == 1 and not clock.sleeps
+
+    def test_429_waits_at_least_retry_after(self, tenant, responses, clock):
+        queue, _ = responses
+        queue += [make_response(429, headers={"Retry-After": "7"}), make_response(200)]
+        assert call(tenant) == {}
+        assert clock.sleeps[0] >= 7
+
+    def test_429_on_half_open_trial_does_not_wedge_breaker(self, tenant, responses, clock):
+        queue, calls = responses
+        breaker = syncro_http.get_circuit_breaker(tenant)
+
+        queue += [make_response(503)] * breaker.failure_threshold
+        with pytest.raises(requests.HTTPError):
+            call(tenant, max_retries=breaker.failure_threshold - 1)
+        assert breaker.state == "open"
+        with pytest.raises(CircuitOpenError):
+            call(tenant)
+
+        clock.now += breaker.reset_seconds + 1
+        queue += [make_response(429, headers={"Retry-After": "1"}), make_response(200)]
+        assert call(tenant) == {}
+        assert breaker.state == "closed"
+        queue += [make_response(200)] * 3
+        for _ in range(3):
+            assert call(tenant) == {}
+
+    def test_post_without_recover_is_not_retried(self, tenant, responses, clock):
+        queue, calls = responses
+        queue.append(make_response(502))
+        with pytest.raises(requests.HTTPError):
+            call(tenant, method="POST", data={"subject": "x"})
+        assert len(calls) == 1
+
+    def test_post_returns_recovered_record(self, tenant, responses, clock):
+        queue, calls = responses
+        queue.append(make_response(502))
+        assert call(tenant, method="POST", recover=lambda: {"ticket": {"id": 5}}) == {"ticket": {"id": 5}}
+        assert len(calls) == 1
+
+    def test_post_retried_when_recover_finds_nothing(self, tenant, responses, clock):
+        queue, calls = responses
+        queue += [requests.ReadTimeout("read timed out"), make_response(201, b'{"ticket": {"id": 6}}')]
+        recovered = []
+        assert call(tenant, method="POST", recover=lambda: recovered.append(1)) == {"ticket": {"id": 6}}
+        assert len(calls) == 2 and recovered == [1]
+
+    def test_post_429_is_retried_without_recover(self, tenant, responses, clock):
+        queue, calls = responses
+        queue += [make_response(429), make_response(201, b'{"id": 7}')]
+        assert call(tenant, method="POST") == {"id": 7}
+        assert len(calls) == 2
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("12") == 12.0
+    assert parse_retry_after("-3") == 0.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0  # In the past
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_backoff_delay_is_capped_and_honours_retry_after():
+    for attempt in range(10):
+        assert 0 <= backoff_delay(attempt, base=1.0, cap=8.0) <= 8.0
+    assert backoff_delay(0, retry_after=30.0, base=1.0, cap=8.0) == 30.0
+
+
+def test_idempotency_store_reloads_state(tmp_path):
+    path = str(tmp_path / "idempotency.jsonl")
+    store = IdempotencyStore(path)
+    store.begin("ticket:a:1")
+    store.begin("ticket:a:2")
+    store.complete("ticket:a:2", {"id": 20})
+
+    reloaded = IdempotencyStore(path)
+    assert reloaded.get("ticket:a:1")["state"] == "pending"
+    assert reloaded.result("ticket:a:1") is None
+    assert reloaded.result("ticket:a:2") == {"id": 20}
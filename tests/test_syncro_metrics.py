@@ -0,0 +1,16 @@
+from syncro_metrics import MetricsRegistry, escape_label_value
+
+
+def test_escape_label_value():
+    assert escape_label_value('a\\b"c\nd') == 'a\\\\b\\"c\\nd'
+    assert escape_label_value(429) == "429"
+
+
+def test_prometheus_labels_are_escaped():
+    registry = MetricsRegistry()
+    registry.record_call('tenant"x', "GET", "/tickets\\{id}\n", 200, 0.1)
+    text = registry.to_prometheus()
+    assert 'tenant="tenant\\"x"' in text
+    assert 'endpoint="/tickets\\\\{id}\\n"' in text
+    # A raw newline in a label would split a sample over two lines
+    assert all(line.startswith(("#", "syncro_")) for line in text.splitlines() if line)
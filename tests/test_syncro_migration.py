@@ -0,0 +1,110 @@
+import copy
+
+from mock_syncro_server import build_seed
+from syncro_watermarks import get_watermark, parse_timestamp
+
+
+def tickets_of(seed_data, customer_id):
+    return [ticket for ticket in seed_data["tickets"] if ticket["customer_id"] == customer_id]
+
+
+def test_myfunction_reports_tickets_of_missing_customers_as_failed(migration, mock_tenants):
+    seed_data = build_seed(customers=2, contacts_per_customer=1, tickets_per_customer=2, comments_per_ticket=1)
+    present, missing = seed_data["customers"]
+    _, dest = mock_tenants(seed_data, {"customers": [copy.deepcopy(present)]})
+
+    tickets_to_create = [migration.project_ticket(ticket) for ticket in seed_data["tickets"]]
+
+    failed = migration.myfunction(seed_data["customers"], [present], tickets_to_create, {})
+
+    assert {ticket["id"] for ticket in failed} == {ticket["id"] for ticket in tickets_of(seed_data, missing["id"])}
+    assert sorted(ticket["subject"] for ticket in dest.tickets.values()) == \
+        sorted(ticket["subject"] for ticket in tickets_of(seed_data, present["id"]))
+
+
+def test_full_sync_creates_projected_tickets_with_their_comments(migration, mock_tenants):
+    seed_data = build_seed(customers=2, contacts_per_customer=1, tickets_per_customer=3, comments_per_ticket=2)
+    _, dest = mock_tenants(seed_data, {})
+
+    migration.run_full_sync()
+
+    assert sorted((ticket["subject"], len(ticket["comments"])) for ticket in dest.tickets.values()) == \
+        sorted((ticket["subject"], len(ticket["comments"])) for ticket in seed_data["tickets"])
+
+
+def test_full_sync_holds_the_ticket_watermark_before_a_missing_customers_tickets(migration, mock_tenants):
+    seed_data = build_seed(customers=2, contacts_per_customer=1, tickets_per_customer=2, comments_per_ticket=1)
+    _, dest = mock_tenants(seed_data, {})
+    missing = seed_data["customers"][1]
+
+    # Creating the second customer fails, so its tickets can't be migrated this run
+    route = dest._route
+    def reject_customer(method, path, query, body):
+        if method == "POST" and path == "/customers" and body.get("business_name") == missing["business_name"]:
+            return 422, {"error": "Business name is invalid"}
+        return route(method, path, query, body)
+    dest._route = reject_customer
+
+    migration.run_full_sync()
+
+    source = migration.syncro_tenant_source_base_url
+    oldest_failed = min(parse_timestamp(ticket["updated_at"]) for ticket in tickets_of(seed_data, missing["id"]))
+    assert parse_timestamp(get_watermark(source, "tickets")) < oldest_failed
+    assert parse_timestamp(get_watermark(source, "tickets")) < parse_timestamp(get_watermark(source, "customers"))
+    assert len(dest.tickets) == len(tickets_of(seed_data, seed_data["customers"][0]["id"]))
+
+
+def test_full_sync_with_external_sort_counts_comments_and_removes_its_work_directory(migration, mock_tenants,
+                                                                                     monkeypatch, tmp_path):
+    import tempfile
+    import syncro_progress
+
+    seed_data = build_seed(customers=2, contacts_per_customer=1, tickets_per_customer=3, comments_per_ticket=2)
+    _, dest = mock_tenants(seed_data, {})
+    temp_root = tmp_path / "tmp"
+    temp_root.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(temp_root))
+    reporter = syncro_progress.ProgressReporter(status_path=None, stream=None)
+    monkeypatch.setattr(syncro_progress, "_reporter", reporter)
+
+    migration.run_full_sync(external_sort=True)
+
+    assert len(dest.tickets) == len(seed_data["tickets"])
+    assert reporter.totals["comments"] == reporter.completed["comments"] == 12
+    assert list(temp_root.iterdir()) == []
+
+
+def test_migration_plan_estimates_ticket_creation_with_the_run_pool_size(migration):
+    from syncro_configs import SYNCRO_POOL_WORKERS
+
+    seed_data = build_seed(customers=2, contacts_per_customer=1, tickets_per_customer=3, comments_per_ticket=2)
+    inputs = {
+        "read_calls": {"source": 3, "destination": 3},
+        "avg_latency_s": 0.1,
+        "source_customers": seed_data["customers"],
+        "dest_customers": [],
+        "source_contacts": seed_data["contacts"],
+        "dest_contacts": [],
+        "source_tickets": [migration.project_ticket(ticket) for ticket in seed_data["tickets"]],
+        "dest_tickets": [],
+    }
+
+    plan = migration.build_migration_plan(inputs)
+
+    assert plan["stages"]["migrate_tickets"]["parallel"]
+    assert plan["stages"]["migrate_tickets"]["calls"] == {"source": 6, "destination": 6 + 12}
+    assert plan["estimate"]["assumptions"]["workers"] == SYNCRO_POOL_WORKERS
+
+
+def test_match_contacts_creates_contacts_without_email_or_name_separately(migration):
+    source_contacts = [
+        {"id": 1, "customer_id": 7, "name": "Ann Lee", "email": "ann@example.com"},
+        {"id": 2, "customer_id": 7, "name": "ann  lee", "email": "ANN@example.com "},
+        {"id": 3, "customer_id": 7, "name": "", "email": None, "phone": "555-0100"},
+        {"id": 4, "customer_id": 7, "name": None, "email": "", "phone": "555-0199"},
+    ]
+
+    contact_map, contacts_to_create = migration.match_contacts(source_contacts, [], {7: 70})
+
+    assert contact_map == {}
+    assert sorted(sorted(contact["id"] for contact in group) for group in contacts_to_create.values()) == [[1, 2], [3], [4]]
@@ -0,0 +1,32 @@
+import gzip
+import json
+
+from syncro_snapshot import _ManifestWriter, export_resource, segment_name
+
+
+def paged_customers(pages):
+    def api_call(endpoint):
+        page = int(endpoint.split("page=")[1])
+        return {"customers": pages[page - 1], "meta": {"page": page, "total_pages": len(pages)}}
+    return api_call
+
+
+def read_segment(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_export_resource_overwrites_a_segment_orphaned_by_a_crash(tmp_path):
+    pages = [[{"id": 1, "business_name": "Acme LLC"}], [{"id": 2, "business_name": "Globex LLC"}]]
+    writer = _ManifestWriter(str(tmp_path), {"resources": {}})
+    export_resource(paged_customers(pages[:1]), str(tmp_path), "customers", writer, segment_bytes=1)
+    # Crash after the second segment got its page, but before the page was committed to the manifest
+    writer.manifest["resources"]["customers"].update(complete=False, next_page=2)
+    orphan = tmp_path / segment_name("customers", 1)
+    orphan.write_bytes(gzip.compress(b'{"id":2,"business_name":"Globex LLC"}\n'))
+
+    state = export_resource(paged_customers(pages), str(tmp_path), "customers", writer, segment_bytes=1)
+
+    assert state["complete"] and state["records"] == 2
+    assert read_segment(tmp_path / segment_name("customers", 0)) == pages[0]
+    assert read_segment(orphan) == pages[1]
@@ -0,0 +1,38 @@
+import threading
+
+import pytest
+
+from syncro_webhook import WebhookSync, extract_ticket_id
+
+
+@pytest.mark.parametrize("payload, expected", [
+    ({"attributes": {"id": 1001, "subject": "Password Reset Needed"}}, 1001),
+    ({"attributes": {"id": 5001, "ticket_id": 1001, "body": "Update"}}, 1001),
+    ({"ticket": {"id": 1001}}, 1001),
+    ({"comment": {"id": 5001, "ticket_id": "1001"}}, 1001),
+    ({"comment": {"id": 5001, "body": "No ticket reference"}}, None),
+    ({"id": 1001, "subject": "Bare ticket"}, 1001),
+    ({"id": 5001, "ticket_id": 1001}, 1001),
+    ({"event": "ping"}, None),
+    (["not", "a", "dict"], None),
+])
+def test_extract_ticket_id(payload, expected):
+    assert extract_ticket_id(payload) == expected
+
+
+def test_enqueue_payload_counts_every_event_from_concurrent_receivers():
+    sync = WebhookSync(replicate=lambda ticket_id: None)
+    payloads = [{"attributes": {"id": 5000 + n, "ticket_id": 1000 + n % 10}} for n in range(200)] + [{"event": "ping"}] * 50
+
+    def receive(batch):
+        for payload in batch:
+            sync.enqueue_payload(payload)
+
+    threads = [threading.Thread(target=receive, args=(payloads[n::8],)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sync.stats_snapshot() == {"received": 250, "ignored": 50, "replicated": 0, "failed": 0, "backstop_runs": 0}
+    assert len(sync.queue) == 10